@@ -0,0 +1,73 @@
+"""Native async version of the login endpoint.
+
+Verifying a password is the most expensive part of a login and would hold
+the single thread Django runs sync views on under ASGI. This view checks
+passwords in the hashing pool of core.hashers instead, so logins hash in
+parallel while the event loop keeps serving requests. Everything else is
+shared with LoginView: its serializer, throttles and the authentication
+backend of authentication.backends.
+
+Served at /api/auth/login/ with TASK_API_ASYNC=1, see
+``task_project.async_urls``.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from authentication.authentication import StatelessJWTAuthentication
+from authentication.backends import aauthenticate
+from authentication.serializers import ClaimsTokenObtainPairSerializer
+from authentication.views import LoginView
+from core.throttling import BucketThrottle
+from tasks.async_views import database_sync_to_async, error_response, render
+
+
+async def check_throttles(request):
+    """Apply the throttles of LoginView"""
+    drf_request = Request(request)
+    throttle = BucketThrottle()
+    # the store may be remote
+    allowed = await sync_to_async(
+        throttle.allow_request, thread_sensitive=False
+    )(drf_request, LoginView)
+    if not allowed:
+        raise exceptions.Throttled(throttle.wait())
+
+
+async def obtain_token_pair(request):
+    """Take the steps of ClaimsTokenObtainPairSerializer.validate,
+    authenticating asynchronously"""
+    drf_request = Request(
+        request,
+        parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    )
+    serializer = ClaimsTokenObtainPairSerializer(
+        context={'request': drf_request}
+    )
+    # only the fields; validate() would authenticate synchronously
+    attrs = serializer.to_internal_value(drf_request.data)
+
+    user = serializer.check_user(
+        await aauthenticate(**serializer.get_authenticate_kwargs(attrs))
+    )
+    data = await database_sync_to_async(serializer.get_token_pair)(user)
+    return render(data, status.HTTP_200_OK)
+
+
+async def login(request):
+    """Log a user in, issuing tokens with the user claims embedded"""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    try:
+        await check_throttles(request)
+        return await obtain_token_pair(request)
+    except exceptions.APIException as exc:
+        # sets the same WWW-Authenticate header as LoginView
+        return error_response(exc, StatelessJWTAuthentication())
+
+
+# Django 3.1's csrf_exempt decorator hides that a view is async
+login.csrf_exempt = True
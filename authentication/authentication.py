@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+
+# User fields embedded in the tokens issued at login
+CLAIM_FIELDS = ('is_superuser', 'is_active')
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def add_user_claims(token, user):
+    """Embed the claims needed for stateless authentication in a token"""
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    token[TOKEN_VERSION_CLAIM] = settings.JWT_CLAIMS_VERSION
+    return token
+
+
+def lazy_user(user_id, claims):
+    """Build a user from token claims without querying the database.
+
+    The instance only has its id and the claimed fields loaded; any other
+    field is fetched from the database the first time it is accessed.
+    """
+    user_model = get_user_model()
+    loaded = dict(claims)
+    loaded[api_settings.USER_ID_FIELD] = user_id
+    field_names = [
+        field.attname for field in user_model._meta.concrete_fields
+        if field.attname in loaded
+    ]
+    return user_model.from_db(
+        router.db_for_read(user_model),
+        field_names,
+        [loaded[name] for name in field_names]
+    )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts the user claims signed into the token.
+
+    Tokens issued by the login view carry ``is_superuser``, ``is_active``
+    and a claims version, so the user is rebuilt from the token instead of
+    being loaded on every request. Tokens without current claims, e.g.
+    issued before JWT_CLAIMS_VERSION was bumped, fall back to the database
+    lookup of JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        user = self.get_stateless_user(validated_token)
+        if user is None:
+            return super().get_user(validated_token)
+        return user
+
+    def get_stateless_user(self, validated_token):
+        """Return a lazy user built from the token, or None if it can't be"""
+        if validated_token.get(TOKEN_VERSION_CLAIM) != settings.JWT_CLAIMS_VERSION:
+            return None
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            claims = {field: validated_token[field] for field in CLAIM_FIELDS}
+        except KeyError:
+            return None
+
+        if not claims['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return lazy_user(user_id, claims)
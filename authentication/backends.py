@@ -0,0 +1,91 @@
+"""Authentication backend shared by the sync and the async logins.
+
+The sync login authenticates through ``django.contrib.auth.authenticate``
+and the async one through ``aauthenticate`` below; both end up in the
+same methods of PasswordBackend to look the user up, refuse inactive
+users and upgrade outdated hashes.
+"""
+from django.contrib.auth import get_backends, get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+
+from core.hashers import acheck_password, amake_password
+from tasks.async_views import database_sync_to_async
+
+
+class PasswordBackend(ModelBackend):
+    """ModelBackend whose passwords can also be checked from async code,
+    in the hashing pool of core.hashers"""
+
+    def get_username(self, username, kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        return username
+
+    def get_user_by_username(self, username):
+        user_model = get_user_model()
+        try:
+            return user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            return None
+
+    def save_password(self, user, encoded):
+        """Store a password rehashed with the preferred hasher"""
+        user.password = encoded
+        user.save(update_fields=['password'])
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        username = self.get_username(username, kwargs)
+        if username is None or password is None:
+            return None
+        user = self.get_user_by_username(username)
+        if user is None:
+            # unknown users cost a hash too, so they can't be told apart
+            # by the response time
+            make_password(password)
+            return None
+        valid = check_password(
+            password,
+            user.password,
+            lambda raw: self.save_password(user, make_password(raw))
+        )
+        if valid and self.user_can_authenticate(user):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None,
+                            **kwargs):
+        username = self.get_username(username, kwargs)
+        if username is None or password is None:
+            return None
+        user = await database_sync_to_async(self.get_user_by_username)(
+            username
+        )
+        if user is None:
+            await amake_password(password)
+            return None
+        valid, new_encoded = await acheck_password(password, user.password)
+        if not valid:
+            return None
+        if new_encoded is not None:
+            await database_sync_to_async(self.save_password)(
+                user, new_encoded
+            )
+        if self.user_can_authenticate(user):
+            return user
+        return None
+
+
+async def aauthenticate(request=None, **credentials):
+    """Return the user of the credentials, or None, trying each backend in
+    turn like ``django.contrib.auth.authenticate``"""
+    for backend in get_backends():
+        if hasattr(backend, 'aauthenticate'):
+            user = await backend.aauthenticate(request, **credentials)
+        else:
+            user = await database_sync_to_async(backend.authenticate)(
+                request, **credentials
+            )
+        if user is not None:
+            return user
+    return None
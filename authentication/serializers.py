@@ -1,7 +1,17 @@
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.models import update_last_login
 from django.utils.translation import ugettext_lazy as _
 
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import add_user_claims
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -25,4 +35,68 @@ class UserSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
 
-        return user
\ No newline at end of file
+        return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue token pairs carrying the claims for stateless authentication.
+
+    Split into steps the async login in authentication.async_views takes
+    too, only authenticating asynchronously.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+    def get_authenticate_kwargs(self, attrs):
+        kwargs = {
+            self.username_field: attrs[self.username_field],
+            'password': attrs['password'],
+        }
+        if 'request' in self.context:
+            kwargs['request'] = self.context['request']
+        return kwargs
+
+    def check_user(self, user):
+        """Return the authenticated user, if it may log in"""
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+        return user
+
+    def get_token_pair(self, user):
+        """Return the tokens of a user logging in"""
+        refresh = self.get_token(user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+    def validate(self, attrs):
+        self.user = self.check_user(
+            authenticate(**self.get_authenticate_kwargs(attrs))
+        )
+        return self.get_token_pair(self.user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh access tokens with claims read from the current user"""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+
+        user = get_user_model()._default_manager.filter(**{
+            api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]
+        }).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                _('No active account found for this token'),
+                code='user_inactive'
+            )
+
+        data['access'] = str(add_user_claims(access, user))
+        return data
+
@@ -0,0 +1,140 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication import async_views
+
+
+LOGIN_URL = '/api/auth/login/'
+SCRYPT = 'core.hashers.ScryptPasswordHasher'
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+FAST_SCRYPT = {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1}
+
+
+@override_settings(
+    TASK_ASYNC_DB_THREAD_SENSITIVE=True,
+    PASSWORD_HASHERS=[SCRYPT, PBKDF2],
+    SCRYPT_PARAMETERS=FAST_SCRYPT,
+)
+class AsyncLoginTests(TestCase):
+    """Test the native async login view"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email='test@testing.com',
+            password='testpass',
+            first_name='Test',
+            last_name='User'
+        )
+
+    def post(self, payload):
+        return self.factory.post(
+            LOGIN_URL, json.dumps(payload), content_type='application/json'
+        )
+
+    async def test_login(self):
+        """Test valid credentials return tokens carrying the user claims"""
+        res = await async_views.login(
+            self.post({'email': 'test@testing.com', 'password': 'testpass'})
+        )
+
+        self.assertEqual(res.status_code, 200)
+        data = json.loads(res.content)
+        self.assertIn('refresh', data)
+        access = AccessToken(data['access'])
+        self.assertEqual(access['user_id'], self.user.id)
+        self.assertFalse(access['is_superuser'])
+
+    async def test_wrong_password(self):
+        """Test wrong passwords and unknown users are refused alike"""
+        for payload in (
+            {'email': 'test@testing.com', 'password': 'wrong'},
+            {'email': 'missing@testing.com', 'password': 'testpass'},
+        ):
+            res = await async_views.login(self.post(payload))
+
+            self.assertEqual(res.status_code, 401)
+            self.assertEqual(
+                json.loads(res.content)['detail'],
+                'No active account found with the given credentials'
+            )
+            self.assertEqual(res['WWW-Authenticate'], 'Bearer realm="api"')
+
+    def test_inactive_user(self):
+        """Test inactive users can't log in"""
+        self.user.is_active = False
+        self.user.save()
+
+        res = async_to_sync(async_views.login)(
+            self.post({'email': 'test@testing.com', 'password': 'testpass'})
+        )
+
+        self.assertEqual(res.status_code, 401)
+
+    async def test_missing_fields(self):
+        """Test the credentials are required"""
+        res = await async_views.login(self.post({'email': 'test@testing.com'}))
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('password', json.loads(res.content))
+
+    def test_rehash_on_login(self):
+        """Test hashes from an older hasher are upgraded on login"""
+        with override_settings(PASSWORD_HASHERS=[PBKDF2]):
+            self.user.set_password('testpass')
+            self.user.save()
+
+        res = async_to_sync(async_views.login)(
+            self.post({'email': 'test@testing.com', 'password': 'testpass'})
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    @override_settings(AUTHENTICATION_BACKENDS=[
+        'django.contrib.auth.backends.ModelBackend'
+    ])
+    async def test_sync_backend(self):
+        """Test backends without an async method are used like in the sync
+        login"""
+        res = await async_views.login(
+            self.post({'email': 'test@testing.com', 'password': 'testpass'})
+        )
+
+        self.assertEqual(res.status_code, 200)
+
+    async def test_get_not_allowed(self):
+        """Test only POST is allowed"""
+        res = await async_views.login(self.factory.get(LOGIN_URL))
+
+        self.assertEqual(res.status_code, 405)
+
+
+@override_settings(
+    THROTTLE_RATES={'login': '1/m'},
+    THROTTLE_STORE='core.throttling.LocMemThrottleStore',
+    THROTTLE_STORE_OPTIONS={},
+)
+class AsyncLoginThrottleTests(TestCase):
+    """Test the async login applies the login throttle"""
+
+    async def test_throttled(self):
+        """Test logins over the budget are refused"""
+        factory = RequestFactory()
+
+        responses = []
+        for _ in range(2):
+            request = factory.post(
+                LOGIN_URL,
+                json.dumps({'email': 'test@testing.com', 'password': 'x'}),
+                content_type='application/json'
+            )
+            responses.append(await async_views.login(request))
+
+        self.assertEqual(responses[0].status_code, 401)
+        self.assertEqual(responses[1].status_code, 429)
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+LOGIN_URL = reverse('auth:token_obtain_pair')
+REFRESH_URL = reverse('auth:token_refresh')
+UPDATE_URL = reverse('auth:update')
+TASK_URL = reverse('task:task-list')
+
+
+def user_queries(queries):
+    """Return the captured queries that read the user table"""
+    return [q for q in queries if 'core_user' in q['sql']]
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    """Test authenticating from the claims embedded in the token"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@testing.com',
+            password='testpass',
+            first_name='Test',
+            last_name='User'
+        )
+        self.client = APIClient()
+
+    def login(self):
+        payload = {'email': 'test@testing.com', 'password': 'testpass'}
+        return self.client.post(LOGIN_URL, payload).data
+
+    def test_login_embeds_claims(self):
+        """Test the issued access token carries the user claims"""
+        token = AccessToken(self.login()['access'])
+
+        self.assertEqual(token['user_id'], self.user.id)
+        self.assertFalse(token['is_superuser'])
+        self.assertTrue(token['is_active'])
+        self.assertIn('token_version', token)
+
+    def test_request_without_user_query(self):
+        """Test an authenticated request doesn't load the user"""
+        access = self.login()['access']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(user_queries(ctx.captured_queries), [])
+
+    def test_token_without_claims_falls_back(self):
+        """Test tokens without claims still authenticate through the DB"""
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % access)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(user_queries(ctx.captured_queries)), 1)
+
+    def test_old_claims_version_falls_back(self):
+        """Test bumping the claims version makes tokens hit the DB again"""
+        access = self.login()['access']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+
+        with override_settings(JWT_CLAIMS_VERSION=2):
+            self.user.is_active = False
+            self.user.save()
+            res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_claim_rejected(self):
+        """Test a token claiming an inactive user is rejected"""
+        access = AccessToken(self.login()['access'])
+        access['is_active'] = False
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % access)
+
+        res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_with_stateless_user(self):
+        """Test updating the profile loads the full user once"""
+        access = self.login()['access']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+
+        res = self.client.patch(UPDATE_URL, {'first_name': 'Changed'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Changed')
+        self.assertEqual(self.user.last_name, 'User')
+
+    def test_refresh_updates_claims(self):
+        """Test refreshed access tokens reflect the current user"""
+        refresh = self.login()['refresh']
+        self.user.is_superuser = True
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(res.data['access'])['is_superuser'])
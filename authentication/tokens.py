@@ -0,0 +1,34 @@
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+
+# Expiry of the access token a stream token was issued for
+SESSION_EXP_CLAIM = 'session_exp'
+
+
+class StreamToken(Token):
+    """Short-lived token opening a task event stream.
+
+    EventSource and WebSocket clients can't set the Authorization header,
+    so they pass this token in the query string or as a WebSocket
+    subprotocol instead of their access token. It is only good for
+    TASK_EVENTS_TOKEN_LIFETIME, and the stream it opens still ends when
+    the access token it was issued for expires.
+    """
+    token_type = 'stream'
+
+    @property
+    def lifetime(self):
+        return settings.TASK_EVENTS_TOKEN_LIFETIME
+
+    @classmethod
+    def for_access_token(cls, access_token):
+        token = cls()
+        token[api_settings.USER_ID_CLAIM] = access_token[api_settings.USER_ID_CLAIM]
+        token[SESSION_EXP_CLAIM] = access_token['exp']
+        return token
+
+    def get_session_exp(self):
+        """Return the timestamp at which the stream must end"""
+        return self.get(SESSION_EXP_CLAIM, self['exp'])
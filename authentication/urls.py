@@ -1,8 +1,4 @@
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView
-)
 
 from authentication import views
 
@@ -10,6 +6,6 @@ app_name = 'auth'
 urlpatterns = [
     path('register/', views.RegisterUserView.as_view(), name='register'),
     path('update/', views.UpdateUserView.as_view(), name='update'),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('login/', views.LoginView.as_view(), name='token_obtain_pair'),
+    path('refresh/', views.RefreshView.as_view(), name='token_refresh'),
 ]
\ No newline at end of file
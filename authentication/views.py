@@ -1,21 +1,46 @@
 from rest_framework import generics
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.permissions import IsAuthenticated
 
-from authentication.serializers import UserSerializer
+from authentication.authentication import StatelessJWTAuthentication
+from core.throttling import BucketThrottle
+from authentication.serializers import (
+    ClaimsTokenObtainPairSerializer,
+    ClaimsTokenRefreshSerializer,
+    UserSerializer
+)
 
 
 class RegisterUserView(generics.CreateAPIView):
     """Register a new user in the system"""
     serializer_class = UserSerializer
+    throttle_classes = (BucketThrottle,)
+    throttle_scope = 'register'
 
 
 class UpdateUserView(generics.RetrieveUpdateAPIView):
     """Update the details of user in the system"""
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (StatelessJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         """Retreive and return authenticated user"""
-        return self.request.user
+        user = self.request.user
+        # users authenticated from token claims only have a few fields loaded
+        deferred_fields = user.get_deferred_fields()
+        if deferred_fields:
+            user.refresh_from_db(fields=deferred_fields)
+        return user
+
+
+class LoginView(TokenObtainPairView):
+    """Log a user in, issuing tokens with the user claims embedded"""
+    serializer_class = ClaimsTokenObtainPairSerializer
+    throttle_classes = (BucketThrottle,)
+    throttle_scope = 'login'
+
+
+class RefreshView(TokenRefreshView):
+    """Issue a new access token with up to date user claims"""
+    serializer_class = ClaimsTokenRefreshSerializer
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext as _
 from core import models
+from core.jobs import enqueue
 
 
 class UserAdmin(BaseUserAdmin):
@@ -23,6 +24,40 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    def delete_model(self, request, obj):
+        """Deactivate the user and delete them in the background, as
+        deleting their tasks can take a while"""
+        obj.is_active = False
+        obj.save(update_fields=['is_active'])
+        enqueue('users.delete', user=request.user, user_id=obj.pk)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_model(request, obj)
+
+    def get_deleted_objects(self, objs, request):
+        """Count the tasks of the users to delete, instead of collecting
+        and listing every one of them on the confirmation page"""
+        objs = list(objs)
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(models.User._meta.verbose_name)
+        model_count = {models.User._meta.verbose_name_plural: len(objs)}
+
+        tasks = models.Task.objects.filter(user__in=objs).count()
+        if tasks:
+            model_count[models.Task._meta.verbose_name_plural] = tasks
+            if not request.user.has_perm('core.delete_task'):
+                perms_needed.add(models.Task._meta.verbose_name)
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'created_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['result', 'error']
+
 
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Task)
+admin.site.register(models.Job, JobAdmin)
@@ -0,0 +1,111 @@
+"""PostgreSQL backend borrowing its connections from a per-process pool.
+
+Django opens a connection per thread and, with CONN_MAX_AGE=0, closes it
+at the end of every request. With this backend closing hands the
+connection back to a psycopg2 ThreadedConnectionPool shared by all the
+threads of the process (WSGI worker threads as well as the threads ASGI
+runs sync code and database_sync_to_async calls in), so requests reuse
+open connections while their number stays bounded by the pool size.
+
+Configure it with ``OPTIONS['pool'] = {'min_size': 1, 'max_size': 10}``.
+When every connection is in use, a thread waits up to ``timeout`` seconds
+(default 10) for one to be handed back before an OperationalError is
+raised.
+
+Connections handed out by the pool are checked with a ``SELECT 1`` first:
+one closed by the server while it sat in the pool, after a restart or an
+idle timeout, is discarded and another one is taken.
+"""
+import os
+import threading
+
+import psycopg2
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+from core.db.backends.postgresql_pool.blocking import BlockingPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool_options(self):
+        options = self.settings_dict['OPTIONS'].get('pool', {})
+        return (
+            options.get('min_size', 1),
+            options.get('max_size', 10),
+            options.get('timeout', 10),
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_pool(self, conn_params):
+        """Return the pool of this database, creating it on first use"""
+        # keyed on the pid so a forked worker never shares its parent's
+        # sockets
+        key = (self.alias, os.getpid())
+        with _pools_lock:
+            if key not in _pools:
+                min_size, max_size, timeout = self.get_pool_options()
+                _pools[key] = BlockingPool(
+                    pool.ThreadedConnectionPool(
+                        min_size, max_size, **conn_params
+                    ),
+                    max_size,
+                    timeout
+                )
+            return _pools[key]
+
+    def is_pooled_connection_usable(self, connection):
+        """Return whether a connection from the pool still works"""
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool(conn_params)
+        # every pooled connection may be broken, plus a new one
+        for _ in range(connection_pool.max_size + 1):
+            connection = connection_pool.getconn()
+            if self.is_pooled_connection_usable(connection):
+                break
+            # dropped while it sat in the pool
+            connection_pool.putconn(connection, close=True)
+        else:
+            raise OperationalError(
+                'No usable connection could be taken from the pool.'
+            )
+
+        # as in the parent class
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # the pool rolls back an open transaction, and discards the
+            # connection if it is broken
+            self.get_pool(self.get_connection_params()).putconn(
+                self.connection, close=bool(self.connection.closed)
+            )
@@ -0,0 +1,38 @@
+import threading
+
+from django.db import OperationalError
+
+
+class BlockingPool:
+    """Hand out the connections of a pool, waiting for one to be put back
+    when they are all in use.
+
+    psycopg2's pools raise PoolError as soon as max_size connections are
+    out, so a burst of requests fails instead of queuing for a moment. A
+    semaphore holding a slot per connection makes getconn() wait up to
+    ``timeout`` seconds for a free one, then raise an OperationalError.
+    """
+
+    def __init__(self, connection_pool, max_size, timeout):
+        self.pool = connection_pool
+        self.max_size = max_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                'No database connection was put back in the pool within '
+                '%s seconds; all %d are in use.' % (self.timeout, self.max_size)
+            )
+        try:
+            return self.pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self.pool.putconn(connection, close=close)
+        finally:
+            self._slots.release()
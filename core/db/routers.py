@@ -0,0 +1,80 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+PRIMARY = 'default'
+
+# The database the reads of the current request or thread of work go to:
+# the primary once it is pinned, so the reads see its own writes instead of
+# a lagging replica, or else one replica picked for the whole context, so
+# its reads agree with each other
+_read_database = ContextVar('read_database', default=None)
+
+
+def choose_replica():
+    """Return a random replica, or None without replicas"""
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+def get_read_database():
+    """Return the database of the reads of this context, picking a replica
+    on the first read of a context that wasn't set, or whose replica was
+    removed from the settings"""
+    database = _read_database.get()
+    if database != PRIMARY and database not in settings.DATABASE_REPLICAS:
+        database = choose_replica()
+        _read_database.set(database)
+    return database or PRIMARY
+
+
+def pin_to_primary():
+    """Send the following reads of this context to the primary"""
+    return _read_database.set(PRIMARY)
+
+
+def is_pinned():
+    return _read_database.get() == PRIMARY
+
+
+def set_pinned(pinned):
+    """Send the reads of this context to the primary, or to one replica,
+    return a token to reset it"""
+    return _read_database.set(PRIMARY if pinned else choose_replica())
+
+
+def reset_pinned(token):
+    _read_database.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the DATABASE_REPLICAS and writes to the primary.
+
+    All the reads of a context go to the same database, so a version and
+    the body it was computed from can't come from replicas lagging by
+    different amounts. PrimaryPinMiddleware pins requests with unsafe
+    methods to the primary and gives the others a replica; code writing
+    outside of such a request pins its context itself with
+    pin_to_primary() before reading back what it wrote. Writes don't pin
+    implicitly. Without replicas everything goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return PRIMARY
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,161 @@
+import asyncio
+import base64
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    BasePasswordHasher,
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+    mask_hash,
+)
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """Secure password hashing using the scrypt algorithm.
+
+    The cost parameters come from the SCRYPT_PARAMETERS setting; hashes
+    made with other parameters are upgraded the next time the user logs
+    in. The encoded format is the one later Django versions use, so the
+    hashes stay valid after an upgrade.
+    """
+    algorithm = 'scrypt'
+
+    def params(self):
+        params = settings.SCRYPT_PARAMETERS
+        return params['work_factor'], params['block_size'], params['parallelism']
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        default_n, default_r, default_p = self.params()
+        n = n or default_n
+        r = r or default_r
+        p = p or default_p
+        hash_ = hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            # allow twice the memory the parameters need
+            maxmem=256 * n * r * p,
+            dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+    def decode(self, encoded):
+        algorithm, n, salt, r, p, hash_ = encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'hash': hash_,
+            'work_factor': int(n),
+            'salt': salt,
+            'block_size': int(r),
+            'parallelism': int(p),
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password,
+            decoded['salt'],
+            decoded['work_factor'],
+            decoded['block_size'],
+            decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): mask_hash(decoded['salt']),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        stored = (
+            decoded['work_factor'], decoded['block_size'], decoded['parallelism']
+        )
+        return stored != self.params()
+
+    def harden_runtime(self, password, encoded):
+        # The runtime for scrypt is too complicated to emulate
+        pass
+
+
+_executor = None
+
+
+def get_hashing_executor():
+    """Return the bounded thread pool used to hash passwords off the loop.
+
+    hashlib releases the GIL while hashing, so the pool hashes up to
+    PASSWORD_HASHING_WORKERS passwords in parallel without blocking the
+    event loop of the ASGI server.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS,
+            thread_name_prefix='password-hashing',
+        )
+    return _executor
+
+
+@receiver(setting_changed)
+def reset_hashing_executor(*, setting, **kwargs):
+    global _executor
+    if setting == 'PASSWORD_HASHING_WORKERS' and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+async def _run_in_executor(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hashing_executor(), functools.partial(func, *args)
+    )
+
+
+async def amake_password(password):
+    """Hash a password in the hashing pool"""
+    return await _run_in_executor(make_password, password)
+
+
+async def acheck_password(password, encoded):
+    """Check a password in the hashing pool.
+
+    Return a ``(valid, new_encoded)`` pair where ``new_encoded`` is the
+    password hashed with the preferred hasher when the stored hash is
+    outdated, so the caller can save it; it is None otherwise.
+    """
+    valid = await _run_in_executor(check_password, password, encoded)
+    if not valid or not needs_rehash(encoded):
+        return valid, None
+    return valid, await amake_password(password)
+
+
+def needs_rehash(encoded):
+    """Return True if a hash wasn't made with the preferred hasher"""
+    preferred = get_hasher('default')
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or hasher.must_update(encoded)
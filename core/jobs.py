@@ -0,0 +1,124 @@
+"""Database backed queue of background jobs.
+
+Heavy operations are queued as Job rows and run by ``manage.py
+run_worker``, off the request path. A job is a function registered with
+the ``job`` decorator in the ``jobs`` module of an app; it is called with
+the payload of the job as keyword arguments, and what it returns, which
+must be JSON serializable, is saved as the result.
+
+Failed jobs are retried up to JOBS_MAX_ATTEMPTS times, waiting
+JOBS_RETRY_DELAY seconds, doubled after each attempt. Jobs running for
+longer than JOBS_TIMEOUT are deemed lost with their worker and queued
+again. With JOBS_EAGER, jobs run as soon as they are queued, in the
+process queuing them.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Job
+
+
+_registry = {}
+
+
+def job(kind):
+    """Register a function as the job of the given kind"""
+    def register(func):
+        _registry[kind] = func
+        return func
+    return register
+
+
+def get_job_function(kind):
+    return _registry[kind]
+
+
+def enqueue(kind, user=None, max_attempts=None, **payload):
+    """Queue a job and return it, or run it right away with JOBS_EAGER"""
+    get_job_function(kind)
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload,
+        user=user,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_EAGER:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.running,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1
+        )
+        run_job(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def claim_jobs(limit):
+    """Mark up to limit queued jobs due to run as running, return their ids.
+
+    Rows locked by a concurrent worker are skipped, so workers never run
+    the same job.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job_ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.queued, run_at__lte=now)
+            .order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+        )
+        Job.objects.filter(id__in=job_ids).update(
+            status=Job.running, started_at=now, attempts=F('attempts') + 1
+        )
+    return job_ids
+
+
+def requeue_lost_jobs():
+    """Queue the jobs running for longer than JOBS_TIMEOUT again, or fail
+    them when they're out of attempts"""
+    now = timezone.now()
+    lost = Job.objects.filter(
+        status=Job.running,
+        started_at__lt=now - timedelta(seconds=settings.JOBS_TIMEOUT)
+    )
+    lost.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.failed, finished_at=now, error='Timed out'
+    )
+    lost.update(status=Job.queued, run_at=now)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run_job(job_id):
+    """Run a claimed job, record how it went and return its new status"""
+    # a replica may not have the claim yet
+    job = Job.objects.using(router.db_for_write(Job)).get(pk=job_id)
+    try:
+        result = get_job_function(job.kind)(**job.payload)
+    except Exception:
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            status, run_at = Job.queued, now + retry_delay(job.attempts)
+        else:
+            status, run_at = Job.failed, job.run_at
+        Job.objects.filter(pk=job.pk).update(
+            status=status,
+            run_at=run_at,
+            finished_at=now if status == Job.failed else None,
+            error=traceback.format_exc()
+        )
+        return status
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.succeeded,
+        finished_at=timezone.now(),
+        result=result,
+        error=''
+    )
+    return Job.succeeded
@@ -0,0 +1,315 @@
+import json
+import random
+import socket
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from http.client import HTTPConnection
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.test.testcases import QuietWSGIRequestHandler
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    teardown_databases,
+)
+from django.urls import reverse
+
+from core.models import Task
+from core.seeding import (
+    create_tasks,
+    create_users,
+    generate_tasks,
+    generate_users,
+)
+
+
+SCENARIOS = ('list', 'retrieve', 'create', 'update', 'login', 'refresh')
+PASSWORD = 'bench-password'
+
+
+def percentile(values, fraction):
+    """Return the value below which the fraction of sorted values fall"""
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+class TestClientTransport:
+    """Send requests through the Django test client, without a server"""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None, token=None):
+        extra = {}
+        if token:
+            extra['HTTP_AUTHORIZATION'] = 'Bearer %s' % token
+        response = self.client.generic(
+            method,
+            path,
+            json.dumps(data) if data is not None else '',
+            content_type='application/json',
+            **extra
+        )
+        return response.status_code, response.content
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """Send requests to a server over one keep-alive connection"""
+
+    def __init__(self, host, port):
+        self.connection = HTTPConnection(host, port)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = 'Bearer %s' % token
+        body = json.dumps(data) if data is not None else None
+        self.connection.request(method, path, body, headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        self.connection.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class BenchWSGIServer(ThreadedWSGIServer):
+
+    def get_request(self):
+        sock, address = super().get_request()
+        # responses are written in several parts; without this, Nagle's
+        # algorithm and delayed ACKs add 40ms to every request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, address
+
+
+@contextmanager
+def wsgi_server():
+    """Serve the project with Django's threaded WSGI server"""
+    server = BenchWSGIServer(
+        ('127.0.0.1', 0), QuietWSGIRequestHandler, allow_reuse_address=False
+    )
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def asgi_server():
+    """Serve the project with uvicorn"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise CommandError('--server asgi requires the uvicorn package')
+    from django.core.asgi import get_asgi_application
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        get_asgi_application(), host='127.0.0.1', port=port,
+        log_level='warning'
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield '127.0.0.1', port
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+SERVERS = {'wsgi': wsgi_server, 'asgi': asgi_server}
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the task and auth APIs.
+
+    Users and tasks are seeded into throwaway test databases, then each
+    scenario is timed request by request, through the test client or a
+    real server. The results are printed as JSON to compare commits.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--tasks', type=int, default=1000, help='Tasks per user'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Requests timed per scenario'
+        )
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help='Comma separated scenarios: %s' % ', '.join(SCENARIOS)
+        )
+        parser.add_argument(
+            '--server', choices=sorted(SERVERS),
+            help='Benchmark through a real server instead of the test client'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Also write the JSON to a file')
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                'Unknown scenarios: %s' % ', '.join(sorted(unknown))
+            )
+
+        hosts = list(settings.ALLOWED_HOSTS) + ['testserver', '127.0.0.1']
+        # the benchmark measures the views, not the throttles
+        with self.test_databases(), override_settings(
+            ALLOWED_HOSTS=hosts, THROTTLE_RATES={}
+        ):
+            self.seed(options['users'], options['tasks'])
+            with self.transport(options['server']) as transport:
+                results = self.run(transport, scenarios, options)
+
+        output = json.dumps({
+            'commit': self.commit(),
+            'config': {
+                name: options[name]
+                for name in ('users', 'tasks', 'requests', 'server', 'seed')
+            },
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
+        self.stdout.write(output)
+
+    @contextmanager
+    def test_databases(self):
+        """Create throwaway test databases, never touching the real ones"""
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    @contextmanager
+    def transport(self, server):
+        if server is None:
+            yield TestClientTransport()
+            return
+        with SERVERS[server]() as (host, port):
+            transport = HTTPTransport(host, port)
+            try:
+                yield transport
+            finally:
+                transport.close()
+
+    def seed(self, users, tasks_per_user):
+        """Create the users and their tasks"""
+        for user_ids in create_users(generate_users(users, 'bench'), PASSWORD):
+            create_tasks(generate_tasks(user_ids, tasks_per_user))
+
+    def commit(self):
+        """Return the checked out git commit, if any"""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def run(self, transport, scenarios, options):
+        """Time every scenario and return their statistics"""
+        rng = random.Random(options['seed'])
+        user = get_user_model().objects.order_by('id').first()
+        if user is None:
+            raise CommandError('--users must be at least 1')
+        credentials = {'email': user.email, 'password': PASSWORD}
+        status, body = transport.request(
+            'POST', reverse('auth:token_obtain_pair'), credentials
+        )
+        if status != 200:
+            raise CommandError('Login failed with status %s' % status)
+        tokens = json.loads(body)
+        task_ids = list(
+            Task.objects.filter(user=user).values_list('task_id', flat=True)
+        )
+        if not task_ids:
+            raise CommandError('--tasks must be at least 1')
+
+        list_url = reverse('task:task-list')
+
+        def detail_url():
+            return reverse(
+                'task:task-detail', args=[rng.choice(task_ids)]
+            )
+
+        requests = {
+            'list': lambda: ('GET', list_url, None, tokens['access']),
+            'retrieve': lambda: ('GET', detail_url(), None, tokens['access']),
+            'create': lambda: (
+                'POST', list_url,
+                {'title': 'New task', 'description': 'Benchmark'},
+                tokens['access'],
+            ),
+            'update': lambda: (
+                'PATCH', detail_url(),
+                {'title': 'Updated %d' % rng.randrange(10 ** 6)},
+                tokens['access'],
+            ),
+            'login': lambda: (
+                'POST', reverse('auth:token_obtain_pair'), credentials, None
+            ),
+            'refresh': lambda: (
+                'POST', reverse('auth:token_refresh'),
+                {'refresh': tokens['refresh']}, None
+            ),
+        }
+        return {
+            name: self.measure(transport, requests[name], options['requests'])
+            for name in scenarios
+        }
+
+    def measure(self, transport, make_request, count):
+        """Send count requests and return throughput and latencies"""
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(count):
+            method, path, data, token = make_request()
+            start = time.perf_counter()
+            status, _ = transport.request(method, path, data, token)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': count,
+            'errors': errors,
+            'requests_per_second': round(count / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        }
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.hashers import acheck_password
+
+
+HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+
+
+class Command(BaseCommand):
+    """Django command to compare the password verification throughput of
+    the available hashers, which bounds the throughput of logins"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hashers', default='pbkdf2,scrypt',
+            help='Comma separated hashers to compare: %s' % ', '.join(HASHERS)
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument(
+            '--workers', type=int, default=settings.PASSWORD_HASHING_WORKERS,
+            help='Threads of the hashing pool, see PASSWORD_HASHING_WORKERS'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        names = [name for name in options['hashers'].split(',') if name]
+        unknown = set(names) - set(HASHERS)
+        if unknown:
+            raise CommandError('Unknown hashers: %s' % ', '.join(sorted(unknown)))
+
+        results = {}
+        for name in names:
+            with override_settings(
+                PASSWORD_HASHERS=[HASHERS[name]],
+                PASSWORD_HASHING_WORKERS=options['workers'],
+            ):
+                try:
+                    results[name] = self.measure(
+                        options['iterations'], options['workers']
+                    )
+                except ValueError as exc:
+                    # e.g. argon2 without the argon2-cffi package
+                    results[name] = {'error': str(exc)}
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def measure(self, iterations, workers):
+        """Time hashing and verifying a password with the current hasher"""
+        password = 'benchmark-password'
+
+        start = time.perf_counter()
+        encoded = make_password(password)
+        hash_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            check_password(password, encoded)
+        serial = iterations / (time.perf_counter() - start)
+
+        # concurrent checks in the hashing pool, as done by the async login
+        async def check_all():
+            await asyncio.gather(*[
+                acheck_password(password, encoded) for _ in range(iterations)
+            ])
+
+        start = time.perf_counter()
+        asyncio.run(check_all())
+        parallel = iterations / (time.perf_counter() - start)
+
+        return {
+            'hash_ms': round(hash_seconds * 1000, 2),
+            'verify_per_second': round(serial, 2),
+            'verify_per_second_parallel': round(parallel, 2),
+            'workers': workers,
+        }
@@ -0,0 +1,98 @@
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import worker
+from core.jobs import claim_jobs, requeue_lost_jobs, run_job
+from core.models import Job
+
+
+class Command(BaseCommand):
+    """Django command to run the queued background jobs.
+
+    Due jobs are claimed from the database and run in a pool of processes,
+    the queue being polled while every process is busy or nothing is due.
+    SIGTERM and SIGINT stop claiming jobs and wait for the running ones.
+    Several workers can run side by side.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOBS_WORKER_PROCESSES,
+            help='Jobs run in parallel; 0 runs them one by one in this '
+                 'process'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1,
+            help='Seconds between two looks at the queue'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Stop once no job is due instead of waiting for more'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        processes = options['processes']
+        if processes < 0:
+            raise CommandError('--processes must be at least 0')
+
+        self.stopping = False
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        executor = None
+        if processes:
+            executor = ProcessPoolExecutor(
+                processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=worker.setup
+            )
+        try:
+            self.run(executor, processes or 1, options)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self, executor, slots, options):
+        running = {}
+        while not self.stopping:
+            requeue_lost_jobs()
+            job_ids = claim_jobs(slots - len(running))
+            for job_id in job_ids:
+                if executor is None:
+                    self.report(job_id, run_job(job_id))
+                else:
+                    running[executor.submit(worker.execute, job_id)] = job_id
+
+            if running:
+                done, _ = wait(
+                    running, timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        self.report(job_id, future.result())
+                    except Exception as exc:
+                        # the job is queued again once it times out
+                        self.stderr.write('Job %s crashed: %r' % (job_id, exc))
+            elif not job_ids:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+    def report(self, job_id, status):
+        self.stdout.write(
+            'Job %s: %s' % (job_id, dict(Job.STATUS_CHOICES)[status])
+        )
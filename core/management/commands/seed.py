@@ -0,0 +1,108 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import seeding
+from core.db.routers import pin_to_primary
+
+
+FORMATS = ('csv', 'ndjson')
+
+
+class Command(BaseCommand):
+    """Django command to create users and tasks in bulk.
+
+    Users and tasks are generated, or imported from CSV or NDJSON files
+    such as the task export. Files are streamed and written in batches,
+    and all users share a single password hash.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=0, help='Users to generate'
+        )
+        parser.add_argument(
+            '--tasks', type=int, default=0,
+            help='Tasks to generate per created user'
+        )
+        parser.add_argument(
+            '--users-file',
+            help='CSV or NDJSON file of users: email, first_name, last_name'
+        )
+        parser.add_argument(
+            '--tasks-file',
+            help='CSV or NDJSON file of tasks: title, description, '
+                 'task_status, user (an id)'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Format of the files, guessed from their extension'
+        )
+        parser.add_argument(
+            '--password',
+            help='Password of every created user, hashed once. Without it '
+                 'the users have no usable password.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASK_BULK_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--no-copy', action='store_false', dest='copy',
+            help='Use bulk_create instead of COPY on PostgreSQL'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        # the ids of the users created are read back
+        pin_to_primary()
+        user_rows = []
+        if options['users_file']:
+            user_rows = self.read(options['users_file'], options['format'])
+        user_rows = self.chain(
+            user_rows, seeding.generate_users(options['users'])
+        )
+
+        user_count = task_count = 0
+        for user_ids in seeding.create_users(
+            user_rows, options['password'], options['batch_size']
+        ):
+            user_count += len(user_ids)
+            if options['tasks']:
+                task_count += self.create_tasks(
+                    seeding.generate_tasks(user_ids, options['tasks']), options
+                )
+
+        if options['tasks_file']:
+            task_count += self.create_tasks(
+                self.read(options['tasks_file'], options['format']), options
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Created %d users and %d tasks' % (user_count, task_count)
+        ))
+
+    def chain(self, *iterables):
+        for iterable in iterables:
+            yield from iterable
+
+    def read(self, path, input_format):
+        """Yield the rows of a file, reading it line by line"""
+        if input_format is None:
+            input_format = os.path.splitext(path)[1].lstrip('.').lower()
+            if input_format == 'json':
+                input_format = 'ndjson'
+        if input_format not in FORMATS:
+            raise CommandError(
+                'Unknown format of %s, set --format to one of: %s'
+                % (path, ', '.join(FORMATS))
+            )
+        with open(path, newline='', encoding='utf-8') as lines:
+            yield from seeding.read_rows(lines, input_format)
+
+    def create_tasks(self, rows, options):
+        return seeding.create_tasks(
+            rows,
+            options['batch_size'],
+            use_copy=None if options['copy'] else False
+        )
@@ -1,22 +1,72 @@
 import time
 
+from django.conf import settings
 from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
-    """Django command to pause execution until the database is avaialable"""
+    """Django command to pause execution until the database is avaialable.
+
+    Each database is probed with a real query, retrying with exponential
+    backoff until it answers or the timeout runs out.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Alias of a database to wait for, can be repeated. '
+                 'Defaults to every configured database.'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds to wait for all the databases before failing'
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=5,
+            help='Longest pause in seconds between two attempts'
+        )
 
     def handle(self, *args, **options):
         """Handle the command"""
+        aliases = options['databases'] or list(settings.DATABASES)
+        unknown = set(aliases) - set(settings.DATABASES)
+        if unknown:
+            raise CommandError(
+                'Unknown databases: %s' % ', '.join(sorted(unknown))
+            )
+
         self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
+        deadline = time.monotonic() + options['timeout']
+        for alias in aliases:
+            self.wait_for(alias, deadline, options['max_delay'])
+        self.stdout.write(self.style.SUCCESS('Database Available!'))
+
+    def probe(self, alias):
+        """Open a connection to the database and run a query on it"""
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+
+    def wait_for(self, alias, deadline, max_delay):
+        """Probe a database until it answers or the deadline passes"""
+        delay = 0.1
+        while True:
             try:
-                db_conn = connections['default']
+                self.probe(alias)
+                return
             except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+                # drop the failed connection so the next attempt reconnects
+                connections[alias].close()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CommandError('Database %s unavailable' % alias)
+            delay = min(delay * 2, max_delay, remaining)
+            self.stdout.write(
+                'Database %s unavailable, waiting %.1f seconds...'
+                % (alias, delay)
+            )
+            time.sleep(delay)
 
-        self.stdout.write(self.style.SUCCESS('Database Available!'))
@@ -0,0 +1,153 @@
+"""Request metrics of this process, rendered in the Prometheus text format.
+
+Each worker process keeps its own counters; Prometheus adds them up
+across the scraped processes.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+# timer of the current request; the threads its ORM calls are sent to by
+# sync_to_async copy the context, so they add their queries to it as well
+_query_timer = ContextVar('query_timer', default=None)
+
+
+class QueryTimer:
+    """Count and time the queries run while active, on any thread"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, duration):
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+
+    @contextmanager
+    def activate(self):
+        token = _query_timer.set(self)
+        try:
+            yield self
+        finally:
+            _query_timer.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding queries to the active QueryTimer.
+
+    Installed on every connection as it is opened, see core.signals.
+    """
+    timer = _query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.add(time.perf_counter() - start)
+
+
+class Histogram:
+    """Counts of observed values per bucket, plus their sum"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # the last count is for values above every bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        """Yield the lines of the histogram, with cumulative buckets"""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield '%s_bucket{%s,le="%s"} %s' % (name, labels, bound, total)
+        yield '%s_sum{%s} %s' % (name, labels, self.sum)
+        yield '%s_count{%s} %s' % (name, labels, total)
+
+
+def format_labels(**labels):
+    return ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', r'\\')
+                     .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels.items()
+    )
+
+
+class RequestMetrics:
+    """Latency, database and response size metrics per view and method"""
+
+    histograms = (
+        ('http_request_duration_seconds', 'Request latency', LATENCY_BUCKETS),
+        ('http_request_db_queries', 'Database queries per request',
+         QUERY_BUCKETS),
+        ('http_request_db_duration_seconds', 'Database time per request',
+         LATENCY_BUCKETS),
+        ('http_response_size_bytes', 'Response body size', SIZE_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.values = {
+                name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+                for name, _, buckets in self.histograms
+            }
+
+    def observe(self, view, method, status, duration, queries,
+                query_duration, size=None):
+        """Record a served request; size is None for streamed responses"""
+        key = (view, method)
+        with self._lock:
+            self.requests[key + (status,)] += 1
+            self.values['http_request_duration_seconds'][key].observe(duration)
+            self.values['http_request_db_queries'][key].observe(queries)
+            self.values['http_request_db_duration_seconds'][key].observe(
+                query_duration
+            )
+            if size is not None:
+                self.values['http_response_size_bytes'][key].observe(size)
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP http_requests_total Requests served',
+            '# TYPE http_requests_total counter',
+        ]
+        with self._lock:
+            for (view, method, status), count in sorted(self.requests.items()):
+                labels = format_labels(view=view, method=method, status=status)
+                lines.append('http_requests_total{%s} %s' % (labels, count))
+
+            for name, help_text, _ in self.histograms:
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s histogram' % name)
+                for (view, method), histogram in sorted(
+                    self.values[name].items()
+                ):
+                    lines.extend(histogram.samples(
+                        name, format_labels(view=view, method=method)
+                    ))
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+from core.db.routers import reset_pinned, set_pinned
+from core.metrics import QueryTimer, request_metrics
+
+
+class PrimaryPinMiddleware:
+    """Decide per request whether reads may go to the read replicas.
+
+    Requests with unsafe methods read from the primary throughout, so
+    the lookups before a write and the response after it see current
+    data. Safe requests read from a single replica, picked at the start,
+    so their reads are consistent with each other.
+
+    Under ASGI the middleware runs on the event loop, so async views
+    aren't pushed onto Django's single thread for sync code.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # tells Django this instance is called as a coroutine
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = set_pinned(request.method not in SAFE_METHODS)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_pinned(token)
+
+    async def __acall__(self, request):
+        token = set_pinned(request.method not in SAFE_METHODS)
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_pinned(token)
+
+
+class RequestMetricsMiddleware:
+    """Record the latency, queries and response size of each view.
+
+    The metrics are served on /metrics and, with
+    REQUEST_METRICS_SERVER_TIMING, summed up in a Server-Timing header.
+    Unless REQUEST_METRICS_ENABLED is set, Django leaves the middleware out
+    of the chain at startup, so it costs nothing.
+
+    Queries are counted on every thread, including the worker threads the
+    async views send their ORM calls to.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with QueryTimer().activate() as timer:
+            response = self.get_response(request)
+        return self.observe(request, response, timer, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with QueryTimer().activate() as timer:
+            response = await self.get_response(request)
+        return self.observe(request, response, timer, start)
+
+    def observe(self, request, response, timer, start):
+        """Record the metrics of a response and return it"""
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        if match is None:
+            return response
+
+        request_metrics.observe(
+            match.view_name,
+            request.method,
+            response.status_code,
+            duration,
+            timer.count,
+            timer.duration,
+            None if response.streaming else len(response.content)
+        )
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                'app;dur=%.1f, db;dur=%.1f;desc="%d queries"'
+                % (duration * 1000, timer.duration * 1000, timer.count)
+            )
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_task'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='task_id',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_task_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
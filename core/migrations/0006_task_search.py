@@ -0,0 +1,104 @@
+from django.db import migrations
+
+
+# The search index lives outside of the model: Django never reads or
+# writes it, triggers keep it current for every insert and update,
+# including bulk inserts and COPY.
+POSTGRESQL_FORWARDS = [
+    'ALTER TABLE core_task ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION core_task_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_task_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON core_task
+    FOR EACH ROW EXECUTE PROCEDURE core_task_search_vector_update()
+    """,
+    # fills the column of the existing rows through the trigger
+    'UPDATE core_task SET title = title',
+    'CREATE INDEX core_task_search_vector_idx ON core_task '
+    'USING gin (search_vector)',
+]
+POSTGRESQL_BACKWARDS = [
+    'DROP TRIGGER core_task_search_vector_trigger ON core_task',
+    'DROP FUNCTION core_task_search_vector_update()',
+    'ALTER TABLE core_task DROP COLUMN search_vector',
+]
+
+# FTS5 index reading its content from core_task, for local development
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE core_task_search USING fts5(
+        title, description, content='core_task', content_rowid='task_id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_task_search_insert AFTER INSERT ON core_task BEGIN
+        INSERT INTO core_task_search (rowid, title, description)
+        VALUES (new.task_id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_task_search_delete AFTER DELETE ON core_task BEGIN
+        INSERT INTO core_task_search (core_task_search, rowid, title, description)
+        VALUES ('delete', old.task_id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_task_search_update
+    AFTER UPDATE OF title, description ON core_task BEGIN
+        INSERT INTO core_task_search (core_task_search, rowid, title, description)
+        VALUES ('delete', old.task_id, old.title, old.description);
+        INSERT INTO core_task_search (rowid, title, description)
+        VALUES (new.task_id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO core_task_search (core_task_search) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    'DROP TRIGGER core_task_search_insert',
+    'DROP TRIGGER core_task_search_delete',
+    'DROP TRIGGER core_task_search_update',
+    'DROP TABLE core_task_search',
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARDS, POSTGRESQL_BACKWARDS),
+    'sqlite': (SQLITE_FORWARDS, SQLITE_BACKWARDS),
+}
+
+
+def run_statements(schema_editor, backwards):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        # other databases fall back to a scan, see core.search
+        return
+    for statement in statements[backwards]:
+        schema_editor.execute(statement, params=None)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, backwards=False)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, backwards=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_task_modified_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
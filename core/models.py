@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 # base classes required to overwrite default django user models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 
@@ -74,7 +75,7 @@ class Task(models.Model):
         (declined, 'Declined') ,
     ]
 
-    task_id = models.IntegerField(primary_key=True)
+    task_id = models.BigAutoField(primary_key=True)
     title = models.CharField(max_length=255)
     description = models.TextField()
     task_status = models.CharField(
@@ -84,8 +85,114 @@ class Task(models.Model):
     )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # covered by the composite index below, which leads with user_id
+        db_index=False
     )
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'task_status', 'task_id'],
+                name='task_user_status_idx'
+            ),
+            # partial indexes for the statuses dashboards poll the most
+            models.Index(
+                fields=['user', 'task_id'],
+                name='task_user_assigned_idx',
+                condition=models.Q(task_status='A')
+            ),
+            models.Index(
+                fields=['user', 'task_id'],
+                name='task_user_pending_idx',
+                condition=models.Q(task_status='P')
+            ),
+        ]
+
+    # owner of the task when it was loaded, so a reassignment can be
+    # reported to the previous owner as well
+    loaded_user_id = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_user_id = instance.__dict__.get('user_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.loaded_user_id = self.user_id
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class TaskChange(models.Model):
+    """A write to a task, numbered in the order of the change feed"""
+    seq = models.BigAutoField(primary_key=True)
+    task_id = models.BigIntegerField()
+    # no constraint: the tombstones of the tasks of a deleted user are
+    # kept for the feed of everyone, and deleting a user doesn't have to
+    # collect its changes
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        # covered by the index below, which leads with user_id
+        db_index=False
+    )
+    # tombstone of a task deleted or moved to another user
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'seq'], name='taskchange_user_seq_idx'),
+        ]
+
+
+class Job(models.Model):
+    """Operation run in the background by ``manage.py run_worker``"""
+    queued = 'Q'
+    running = 'R'
+    succeeded = 'S'
+    failed = 'F'
+    STATUS_CHOICES = [
+        (queued, 'Queued'),
+        (running, 'Running'),
+        (succeeded, 'Succeeded'),
+        (failed, 'Failed'),
+    ]
+
+    # name of the job function, see core.jobs
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default=queued,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    # queued jobs aren't run before this time, to space out the retries
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return '%s #%s' % (self.kind, self.pk)
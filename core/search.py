@@ -0,0 +1,72 @@
+"""Full-text search over the title and description of tasks.
+
+The index is created by the 0006_task_search migration and kept current
+by triggers, so it isn't part of the Task model. PostgreSQL matches a
+weighted ``tsvector`` column through a GIN index, SQLite matches an FTS5
+table. Other databases fall back to scanning the text.
+
+SQLite rebuilds a table to alter its columns, dropping its triggers: a
+migration altering core_task there has to create them again.
+"""
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from core.models import Task
+
+
+def search_terms(query):
+    """Split a search into its words"""
+    return query.split()
+
+
+def fts5_query(terms):
+    """Quote the terms so FTS5 matches all of them, as plain words"""
+    return ' '.join('"%s"' % term.replace('"', '""') for term in terms)
+
+
+def search_tasks(queryset, query):
+    """Filter tasks matching every word of the query, best matches first.
+
+    The rank of each task is annotated as ``search_rank``, higher for
+    better matches.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(Task._meta.db_table)
+    if connection.vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('english', %s)"
+        params = (' '.join(terms),)
+        match = RawSQL(
+            '%s.search_vector @@ %s' % (table, tsquery), params,
+            output_field=BooleanField()
+        )
+        rank = RawSQL(
+            'ts_rank(%s.search_vector, %s)' % (table, tsquery), params,
+            output_field=FloatField()
+        )
+    elif connection.vendor == 'sqlite':
+        params = (fts5_query(terms),)
+        match = RawSQL(
+            '%s.task_id IN (SELECT rowid FROM core_task_search '
+            'WHERE core_task_search MATCH %%s)' % table, params,
+            output_field=BooleanField()
+        )
+        # FTS5 ranks with bm25, lower for better matches
+        rank = RawSQL(
+            '(SELECT -rank FROM core_task_search WHERE core_task_search '
+            'MATCH %%s AND rowid = %s.task_id)' % table, params,
+            output_field=FloatField()
+        )
+    else:
+        match = Q()
+        for term in terms:
+            match &= Q(title__icontains=term) | Q(description__icontains=term)
+        rank = Value(0.0, output_field=FloatField())
+
+    return queryset.filter(match).annotate(search_rank=rank).order_by(
+        '-search_rank', '-task_id'
+    )
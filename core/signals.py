@@ -0,0 +1,33 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import time_query
+
+
+@receiver(request_started)
+def check_persistent_connections(**kwargs):
+    """Close persistent connections that stopped working between requests.
+
+    Django 3.1 only checks a connection it is about to reuse after an error
+    was seen on it, so a connection dropped by the server while idle would
+    fail the next request. Databases with CONN_HEALTH_CHECKS get a check
+    at the start of every request, like the setting of later Django versions.
+    """
+    for conn in connections.all():
+        if (
+            conn.connection is not None
+            and conn.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not conn.in_atomic_block
+            and not conn.is_usable()
+        ):
+            conn.close()
+
+
+@receiver(connection_created)
+def install_query_timer(connection, **kwargs):
+    """Time the queries of every connection, whichever thread opened it"""
+    if time_query not in connection.execute_wrappers:
+        # first, so execute_wrapper() blocks still pop their own wrapper
+        connection.execute_wrappers.insert(0, time_query)
@@ -0,0 +1,28 @@
+import unittest
+
+from django.test.runner import DiscoverRunner
+
+from core.throttling import reset_throttle_store
+
+
+def iter_tests(suite):
+    # parallel suites keep their tests in subsuites
+    for test in getattr(suite, 'subsuites', suite):
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+class TestRunner(DiscoverRunner):
+    """Run each test with a new throttle store.
+
+    The store lives as long as the process, so without this the requests
+    of earlier tests would count against the budgets of later ones.
+    """
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in iter_tests(suite):
+            test.addCleanup(reset_throttle_store)
+        return suite
@@ -1,23 +1,93 @@
+import json
+from contextlib import nullcontext
+from io import StringIO
 from unittest.mock import patch
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import TestCase
 
+from core.management.commands import bench
+from core.management.commands.wait_for_db import Command
 
+
+@patch.object(Command, 'probe')
 class CommandTests(TestCase):
 
-    def test_wait_for_db_ready(self):
+    def test_wait_for_db_ready(self, probe):
         """Testing waiting for db when db is available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        call_command('wait_for_db')
+        probe.assert_called_once_with('default')
 
     @patch('time.sleep', return_value=None)
-    def test_wait_for_db(self, ts):
+    def test_wait_for_db(self, ts, probe):
         """Testing waiting for db"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
\ No newline at end of file
+        probe.side_effect = [OperationalError] * 5 + [None]
+        call_command('wait_for_db')
+        self.assertEqual(probe.call_count, 6)
+
+    @patch('time.sleep', return_value=None)
+    def test_wait_for_db_backoff(self, ts, probe):
+        """Testing the pause doubles between attempts up to the max delay"""
+        probe.side_effect = [OperationalError] * 5 + [None]
+        call_command('wait_for_db', max_delay=1)
+        delays = [call.args[0] for call in ts.call_args_list]
+        self.assertEqual(delays, [0.2, 0.4, 0.8, 1, 1])
+
+    @patch('time.sleep', return_value=None)
+    def test_wait_for_db_timeout(self, ts, probe):
+        """Testing the command fails once the timeout runs out"""
+        probe.side_effect = OperationalError
+        with patch('time.monotonic', side_effect=[0, 1, 5, 11]):
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=10)
+        self.assertEqual(probe.call_count, 3)
+
+    def test_wait_for_db_unknown_alias(self, probe):
+        """Testing unknown database aliases are rejected"""
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', databases=['missing'])
+        probe.assert_not_called()
+
+
+class WaitForDbProbeTests(TestCase):
+
+    def test_probe_queries_database(self):
+        """Testing the probe runs a query on the database"""
+        with self.assertNumQueries(1):
+            Command().probe('default')
+
+
+# the test case already runs on a test database
+@patch.object(bench.Command, 'test_databases', nullcontext)
+class BenchCommandTests(TestCase):
+
+    def test_bench(self):
+        """Testing the benchmark reports every scenario as JSON"""
+        out = StringIO()
+        call_command('bench', users=2, tasks=3, requests=4, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['results']), set(bench.SCENARIOS))
+        for result in report['results'].values():
+            self.assertEqual(result['requests'], 4)
+            self.assertEqual(result['errors'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(report['config']['users'], 2)
+
+    def test_bench_scenarios(self):
+        """Testing a subset of the scenarios can be run"""
+        out = StringIO()
+        call_command(
+            'bench', users=1, tasks=1, requests=1, scenarios='list,login',
+            stdout=out
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(list(report['results']), ['list', 'login'])
+
+    def test_bench_unknown_scenario(self):
+        """Testing unknown scenarios are rejected"""
+        with self.assertRaises(CommandError):
+            call_command('bench', scenarios='list,delete')
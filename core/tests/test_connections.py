@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import add_user_claims
+from core.signals import check_persistent_connections
+
+
+TASK_URL = reverse('task:task-list')
+
+
+class PersistentConnectionTests(TransactionTestCase):
+    """Test database connections are kept between requests"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        token = add_user_claims(AccessToken.for_user(user), user)
+        # a real handler, the test client doesn't close connections
+        self.handler = WSGIHandler()
+        self.environ = RequestFactory()._base_environ(
+            PATH_INFO=TASK_URL,
+            HTTP_AUTHORIZATION='Bearer %s' % token,
+        )
+
+    def request(self):
+        status = []
+        body = self.handler(self.environ, lambda s, headers: status.append(s))
+        b''.join(body)
+        body.close()
+        return status[0]
+
+    def test_requests_reuse_connection(self):
+        """Test sequential requests run on a single connection"""
+        created = []
+
+        def count(**kwargs):
+            created.append(kwargs['connection'].alias)
+
+        connection_created.connect(count)
+        self.addCleanup(connection_created.disconnect, count)
+        with patch.dict(connection.settings_dict, CONN_MAX_AGE=60):
+            connection.close()
+            statuses = [self.request() for _ in range(5)]
+            db_connection = connection.connection
+
+            self.request()
+
+            self.assertIs(connection.connection, db_connection)
+
+        self.assertEqual(statuses, ['200 OK'] * 5)
+        self.assertLessEqual(created.count(connection.alias), 1)
+
+    def test_health_check_closes_broken_connection(self):
+        """Test an unusable connection is closed when a request starts"""
+        connection.ensure_connection()
+        with patch.dict(connection.settings_dict, CONN_HEALTH_CHECKS=True), \
+                patch.object(connection, 'is_usable', return_value=False), \
+                patch.object(connection, 'close') as close:
+            check_persistent_connections()
+
+        close.assert_called_once_with()
+
+    def test_health_check_keeps_working_connection(self):
+        """Test a usable connection is left open"""
+        connection.ensure_connection()
+        with patch.dict(connection.settings_dict, CONN_HEALTH_CHECKS=True), \
+                patch.object(connection, 'close') as close:
+            check_persistent_connections()
+
+        close.assert_not_called()
@@ -0,0 +1,86 @@
+import json
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.hashers import acheck_password, amake_password
+
+
+SCRYPT = 'core.hashers.ScryptPasswordHasher'
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+FAST_SCRYPT = {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1}
+
+
+@override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2], SCRYPT_PARAMETERS=FAST_SCRYPT)
+class HasherTests(TestCase):
+
+    def test_scrypt_round_trip(self):
+        """Test scrypt hashes verify the right password only"""
+        encoded = make_password('testpass')
+
+        self.assertTrue(encoded.startswith('scrypt$1024$'))
+        self.assertTrue(check_password('testpass', encoded))
+        self.assertFalse(check_password('wrongpass', encoded))
+
+    def test_rehash_on_login(self):
+        """Test hashes from an older hasher are upgraded on login"""
+        with override_settings(PASSWORD_HASHERS=[PBKDF2]):
+            user = get_user_model().objects.create_user(
+                'test@testing.com', 'Test', 'User', 'testpass'
+            )
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+        authenticate(email='test@testing.com', password='testpass')
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+
+    def test_rehash_on_parameter_change(self):
+        """Test scrypt hashes with outdated parameters are upgraded"""
+        user = get_user_model().objects.create_user(
+            'test@testing.com', 'Test', 'User', 'testpass'
+        )
+        stronger = dict(FAST_SCRYPT, work_factor=2 ** 11)
+
+        with override_settings(SCRYPT_PARAMETERS=stronger):
+            self.assertTrue(user.check_password('testpass'))
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$2048$'))
+
+    def test_async_check_password(self):
+        """Test passwords are checked in the hashing pool"""
+        encoded = async_to_sync(amake_password)('testpass')
+
+        valid, new_encoded = async_to_sync(acheck_password)('testpass', encoded)
+        self.assertTrue(valid)
+        self.assertIsNone(new_encoded)
+
+        valid, new_encoded = async_to_sync(acheck_password)('wrong', encoded)
+        self.assertFalse(valid)
+
+    def test_async_check_password_rehash(self):
+        """Test outdated hashes come back with their replacement"""
+        with override_settings(PASSWORD_HASHERS=[PBKDF2]):
+            encoded = make_password('testpass')
+
+        valid, new_encoded = async_to_sync(acheck_password)('testpass', encoded)
+
+        self.assertTrue(valid)
+        self.assertTrue(new_encoded.startswith('scrypt$'))
+
+    def test_bench_hashers_command(self):
+        """Test the hasher benchmark reports every requested hasher"""
+        out = StringIO()
+
+        call_command(
+            'bench_hashers', hashers='scrypt', iterations=2, workers=2,
+            stdout=out
+        )
+
+        results = json.loads(out.getvalue())
+        self.assertIn('verify_per_second', results['scrypt'])
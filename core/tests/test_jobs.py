@@ -0,0 +1,167 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job, Task
+
+
+calls = []
+
+
+@jobs.job('tests.record')
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@jobs.job('tests.fail')
+def fail():
+    raise ValueError('Failed on purpose')
+
+
+class JobQueueTests(TestCase):
+    """Test queuing and running background jobs"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue(self):
+        """Test jobs are queued with their payload"""
+        job = jobs.enqueue('tests.record', value=1)
+
+        self.assertEqual(job.status, Job.queued)
+        self.assertEqual(job.payload, {'value': 1})
+        self.assertEqual(calls, [])
+
+    def test_enqueue_unknown_kind(self):
+        """Test only registered jobs can be queued"""
+        with self.assertRaises(KeyError):
+            jobs.enqueue('tests.missing')
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager(self):
+        """Test eager jobs run as soon as they are queued"""
+        job = jobs.enqueue('tests.record', value=2)
+
+        self.assertEqual(calls, [2])
+        self.assertEqual(job.status, Job.succeeded)
+        self.assertEqual(job.result, {'value': 2})
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_claim(self):
+        """Test due jobs are claimed in order, once"""
+        first = jobs.enqueue('tests.record', value=1)
+        second = jobs.enqueue('tests.record', value=2)
+        later = jobs.enqueue('tests.record', value=3)
+        Job.objects.filter(pk=later.pk).update(
+            run_at=timezone.now() + timedelta(minutes=1)
+        )
+
+        self.assertEqual(jobs.claim_jobs(5), [first.pk, second.pk])
+        self.assertEqual(jobs.claim_jobs(5), [])
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.running)
+        self.assertEqual(first.attempts, 1)
+
+    @override_settings(JOBS_RETRY_DELAY=10)
+    def test_retry(self):
+        """Test failed jobs are retried later, until out of attempts"""
+        job = jobs.enqueue('tests.fail', max_attempts=2)
+
+        jobs.claim_jobs(1)
+        self.assertEqual(jobs.run_job(job.pk), Job.queued)
+        job.refresh_from_db()
+        self.assertIn('Failed on purpose', job.error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        jobs.claim_jobs(1)
+        self.assertEqual(jobs.run_job(job.pk), Job.failed)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOBS_TIMEOUT=60)
+    def test_requeue_lost_jobs(self):
+        """Test jobs running for too long are queued again or failed"""
+        retried = jobs.enqueue('tests.record', value=1)
+        exhausted = jobs.enqueue('tests.record', value=2, max_attempts=1)
+        jobs.claim_jobs(2)
+        Job.objects.update(started_at=timezone.now() - timedelta(minutes=2))
+
+        jobs.requeue_lost_jobs()
+
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(retried.status, Job.queued)
+        self.assertEqual(exhausted.status, Job.failed)
+
+    def test_run_worker(self):
+        """Test the worker runs the due jobs and reports them"""
+        jobs.enqueue('tests.record', value=1)
+        jobs.enqueue('tests.record', value=2)
+        out = StringIO()
+
+        call_command('run_worker', processes=0, once=True, stdout=out)
+
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(out.getvalue().count('Succeeded'), 2)
+        self.assertFalse(Job.objects.exclude(status=Job.succeeded).exists())
+
+    def test_run_worker_processes(self):
+        """Test the number of processes can't be negative"""
+        with self.assertRaises(CommandError):
+            call_command('run_worker', processes=-1, once=True)
+
+
+class AdminDeleteUserTests(TestCase):
+    """Test the admin deletes users in the background"""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com', 'admin', 'user', 'password123'
+        )
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass', 'Test', 'User'
+        )
+        self.task_ids = [
+            Task.objects.create(
+                user=self.user, title='Task', description='Task'
+            ).task_id
+            for _ in range(3)
+        ]
+
+    def test_admin_delete_confirmation(self):
+        """Test the confirmation page counts the tasks of the user"""
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:core_user_delete', args=[self.user.pk])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            list(res.context['model_count']), [('users', 1), ('tasks', 3)]
+        )
+        self.assertEqual(res.context['deleted_objects'], [str(self.user)])
+
+    def test_admin_delete(self):
+        """Test the admin deactivates the user and queues the deletion"""
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:core_user_delete', args=[self.user.pk])
+
+        res = self.client.post(url, {'post': 'yes'})
+
+        self.assertEqual(res.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        job = Job.objects.get()
+        self.assertEqual(job.kind, 'users.delete')
+        self.assertEqual(job.payload, {'user_id': self.user.pk})
@@ -0,0 +1,132 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import path, reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.metrics import Histogram, request_metrics
+from core.models import Task
+
+
+METRICS_URL = reverse('metrics')
+TASK_URL = reverse('task:task-list')
+
+
+async def thread_query_view(request):
+    """Query from a worker thread, like the async task views do"""
+    def query():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    await sync_to_async(query, thread_sensitive=False)()
+    return HttpResponse()
+
+
+urlpatterns = [
+    path('thread-query/', thread_query_view),
+]
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(TestCase):
+    """Test the request metrics middleware and endpoint"""
+
+    def setUp(self):
+        request_metrics.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        Task.objects.create(user=self.user, title='Sample', description='x')
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing(self):
+        """Test responses carry their app and database time"""
+        res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        timing = res['Server-Timing']
+        self.assertRegex(timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries"$')
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        """Test the header can be turned off"""
+        res = self.client.get(TASK_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    def test_metrics_endpoint(self):
+        """Test the metrics of the served views are exposed"""
+        res = self.client.get(TASK_URL)
+        size = len(res.content)
+        self.client.get(TASK_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        body = res.content.decode()
+        labels = 'view="task:task-list",method="GET"'
+        self.assertIn('http_requests_total{%s,status="200"} 2' % labels, body)
+        self.assertIn(
+            'http_request_duration_seconds_count{%s} 2' % labels, body
+        )
+        self.assertIn(
+            'http_request_db_queries_bucket{%s,le="2"} 2' % labels, body
+        )
+        self.assertIn(
+            'http_response_size_bytes_sum{%s} %d' % (labels, 2 * size), body
+        )
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled(self):
+        """Test nothing is recorded or exposed when disabled"""
+        res = self.client.get(TASK_URL)
+
+        self.assertNotIn('Server-Timing', res)
+        self.assertEqual(request_metrics.requests, {})
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, ROOT_URLCONF=__name__)
+class AsyncRequestMetricsTests(SimpleTestCase):
+    """Test the metrics of requests served under ASGI"""
+    databases = {'default'}
+
+    def setUp(self):
+        request_metrics.reset()
+
+    async def test_worker_thread_queries(self):
+        """Test queries run in worker threads are counted"""
+        res = await AsyncClient().get('/thread-query/')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('desc="1 queries"', res['Server-Timing'])
+
+
+class HistogramTests(TestCase):
+    """Test the histogram buckets"""
+
+    def test_cumulative_buckets(self):
+        """Test rendered buckets count every value up to their bound"""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual(list(histogram.samples('h', 'a="b"')), [
+            'h_bucket{a="b",le="1"} 2',
+            'h_bucket{a="b",le="5"} 3',
+            'h_bucket{a="b",le="+Inf"} 4',
+            'h_sum{a="b"} 14.5',
+            'h_count{a="b"} 4',
+        ])
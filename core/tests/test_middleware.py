@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+from django.http import HttpResponse
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.urls import path
+
+from core.db.routers import is_pinned
+
+
+async def slow_view(request):
+    """Stand in for an async view waiting on I/O"""
+    await asyncio.sleep(0.2)
+    return HttpResponse('pinned' if is_pinned() else 'unpinned')
+
+
+urlpatterns = [
+    path('slow/', slow_view),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncMiddlewareTests(SimpleTestCase):
+    """Test the middleware keeps ASGI requests on the event loop"""
+
+    async def test_concurrent_requests(self):
+        """Test concurrent requests to async views aren't serialized"""
+        client = AsyncClient()
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get('/slow/') for _ in range(4))
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([res.status_code for res in responses], [200] * 4)
+        # serialized, the requests take 0.8s
+        self.assertLess(elapsed, 0.6)
+
+    async def test_pinned(self):
+        """Test unsafe requests read from the primary"""
+        client = AsyncClient()
+
+        self.assertEqual((await client.get('/slow/')).content, b'unpinned')
+        self.assertEqual((await client.post('/slow/')).content, b'pinned')
@@ -56,7 +56,6 @@ class ModelTests(TestCase):
     def test_task(self):
         """Test the task string representation"""
         task = models.Task.objects.create(
-            task_id=1,
             title='Create a Django Rest API',
             description='Django API for the user',
             task_status='A',
@@ -0,0 +1,136 @@
+import threading
+import time
+from unittest import skipUnless
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core.db.backends.postgresql_pool.blocking import BlockingPool
+
+
+POOL_ENGINE = 'core.db.backends.postgresql_pool'
+
+
+class ListPool:
+    """A pool of plain objects that fails when exhausted like psycopg2's"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.idle = []
+        self.used = 0
+
+    def getconn(self):
+        if self.used == self.max_size:
+            raise RuntimeError('connection pool exhausted')
+        self.used += 1
+        return self.idle.pop() if self.idle else object()
+
+    def putconn(self, connection, close=False):
+        self.used -= 1
+        if not close:
+            self.idle.append(connection)
+
+
+class BlockingPoolTests(SimpleTestCase):
+    """Test connections are waited for when the pool is exhausted"""
+
+    def test_reuse_after_put(self):
+        """Test a connection put back is handed out again"""
+        pool = BlockingPool(ListPool(1), 1, timeout=1)
+        connection = pool.getconn()
+        pool.putconn(connection)
+
+        self.assertIs(pool.getconn(), connection)
+
+    def test_wait_for_connection(self):
+        """Test a thread waits for a connection to be put back"""
+        pool = BlockingPool(ListPool(1), 1, timeout=5)
+        connection = pool.getconn()
+
+        timer = threading.Timer(0.1, pool.putconn, [connection])
+        timer.start()
+        self.addCleanup(timer.join)
+        start = time.perf_counter()
+
+        self.assertIs(pool.getconn(), connection)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def test_exhausted(self):
+        """Test waiting longer than the timeout raises OperationalError"""
+        pool = BlockingPool(ListPool(2), 2, timeout=0.05)
+        pool.getconn()
+        pool.getconn()
+
+        with self.assertRaisesMessage(OperationalError, 'all 2 are in use'):
+            pool.getconn()
+
+    def test_failed_getconn_frees_slot(self):
+        """Test a connection that couldn't be opened doesn't take a slot"""
+        inner = ListPool(1)
+        pool = BlockingPool(inner, 1, timeout=0.05)
+        inner.used = 1
+
+        with self.assertRaises(RuntimeError):
+            pool.getconn()
+        inner.used = 0
+
+        self.assertIsNotNone(pool.getconn())
+
+
+@skipUnless(
+    connection.settings_dict['ENGINE'] == POOL_ENGINE,
+    'connection pool backend'
+)
+class PooledBackendTests(TransactionTestCase):
+    """Test the pooled backend hands connections back and waits for them"""
+
+    def test_reuse_after_close(self):
+        """Test a closed connection goes back to the pool and is reused"""
+        connection.ensure_connection()
+        raw_connection = connection.connection
+
+        connection.close()
+        connection.ensure_connection()
+
+        self.assertIs(connection.connection, raw_connection)
+
+    def test_exhausted(self):
+        """Test connecting with every pooled connection in use fails with
+        OperationalError once the timeout passed"""
+        connection.ensure_connection()
+        pool = connection.get_pool(connection.get_connection_params())
+        wrappers = [connection.copy() for _ in range(pool.max_size - 1)]
+        for wrapper in wrappers:
+            self.addCleanup(wrapper.close)
+            wrapper.ensure_connection()
+
+        timeout, pool.timeout = pool.timeout, 0.05
+        self.addCleanup(setattr, pool, 'timeout', timeout)
+        extra = connection.copy()
+        with self.assertRaises(OperationalError):
+            extra.ensure_connection()
+
+        freed = wrappers[0] if wrappers else connection
+        freed.close()
+        extra.ensure_connection()
+        extra.close()
+
+    def test_broken_connection_replaced(self):
+        """Test a pooled connection closed by the server is discarded on
+        checkout"""
+        connection.ensure_connection()
+        raw_connection = connection.connection
+        pid = raw_connection.get_backend_pid()
+        # taken before raw_connection goes back to the pool
+        other = connection.copy()
+        self.addCleanup(other.close)
+        other.ensure_connection()
+        connection.close()
+
+        with other.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        self.assertIsNot(connection.connection, raw_connection)
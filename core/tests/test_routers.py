@@ -0,0 +1,148 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.db.routers import (
+    PrimaryReplicaRouter,
+    is_pinned,
+    pin_to_primary,
+    reset_pinned,
+    set_pinned,
+)
+from core.jobs import run_job
+from core.models import Job, Task
+
+
+TASK_URL = reverse('task:task-list')
+
+
+def detail_url(task_id):
+    """Return task detail URL"""
+    return reverse('task:task-detail', args=[task_id])
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    """Test reads go to the replica unless the request wrote"""
+
+    def setUp(self):
+        # a second connection to the test database stands in for a
+        # replica of it
+        connections.databases['replica'] = dict(
+            connections.databases['default']
+        )
+        self.addCleanup(self.remove_replica)
+
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.task = Task.objects.create(
+            user=self.user, title='Sample', description='Sample'
+        )
+        # a bearer token without the claims, so the user is looked up
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer %s' % AccessToken.for_user(self.user)
+        )
+
+    def remove_replica(self):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+
+    def capture(self):
+        return (
+            CaptureQueriesContext(connections['default']),
+            CaptureQueriesContext(connections['replica']),
+        )
+
+    def test_reads_use_replica(self):
+        """Test the user lookup and the task list read from the replica"""
+        primary, replica = self.capture()
+        with primary, replica:
+            res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data[0]['task_id'], self.task.task_id)
+        self.assertEqual(len(primary), 0)
+        self.assertTrue(any('core_user' in q['sql'] for q in replica))
+        self.assertTrue(any('core_task' in q['sql'] for q in replica))
+
+    def test_writes_read_from_primary(self):
+        """Test an update reads and writes on the primary only"""
+        primary, replica = self.capture()
+        with primary, replica:
+            res = self.client.patch(
+                detail_url(self.task.task_id), {'title': 'Changed'}
+            )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['title'], 'Changed')
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(any('UPDATE' in q['sql'] for q in primary))
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'replica2'])
+    def test_one_replica_per_context(self):
+        """Test every read of a context goes to the same replica"""
+        router = PrimaryReplicaRouter()
+        for _ in range(10):
+            token = set_pinned(False)
+            try:
+                databases = {router.db_for_read(Task) for _ in range(20)}
+            finally:
+                reset_pinned(token)
+
+            self.assertEqual(len(databases), 1)
+            self.assertIn(databases.pop(), ['replica', 'replica2'])
+
+    def test_write_does_not_pin(self):
+        """Test routing a write leaves reads on the replica until the
+        context is pinned explicitly"""
+        router = PrimaryReplicaRouter()
+        token = set_pinned(False)
+        try:
+            self.assertEqual(router.db_for_write(Task), 'default')
+            self.assertFalse(is_pinned())
+            self.assertEqual(router.db_for_read(Task), 'replica')
+
+            pin_to_primary()
+            self.assertEqual(router.db_for_read(Task), 'default')
+        finally:
+            reset_pinned(token)
+
+    def test_job_read_from_primary(self):
+        """Test a job is loaded from the primary, which has its claim"""
+        job = Job.objects.create(kind='users.delete', payload={'user_id': 0})
+        token = set_pinned(False)
+        primary, replica = self.capture()
+        try:
+            with primary, replica:
+                self.assertEqual(run_job(job.pk), Job.succeeded)
+        finally:
+            reset_pinned(token)
+
+        self.assertFalse(any('core_job' in q['sql'] for q in replica))
+        self.assertTrue(any('core_job' in q['sql'] for q in primary))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test everything goes to the primary without replicas"""
+        token = set_pinned(False)
+        try:
+            self.assertEqual(PrimaryReplicaRouter().db_for_read(Task), 'default')
+        finally:
+            reset_pinned(token)
+
+    def test_no_migrations_on_replica(self):
+        """Test replicas aren't migrated"""
+        router = PrimaryReplicaRouter()
+        self.assertTrue(router.allow_migrate('default', 'core'))
+        self.assertFalse(router.allow_migrate('replica', 'core'))
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core import seeding
+from core.models import Task
+
+
+class SeedCommandTests(TestCase):
+    """Test creating users and tasks in bulk"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(content)
+        return path
+
+    def seed(self, **options):
+        out = StringIO()
+        call_command('seed', stdout=out, **options)
+        return out.getvalue()
+
+    def test_generate(self):
+        """Test generating users with their tasks in batches"""
+        out = self.seed(users=5, tasks=3, batch_size=2, password='seedpass')
+
+        self.assertIn('Created 5 users and 15 tasks', out)
+        users = get_user_model().objects.all()
+        self.assertEqual(users.count(), 5)
+        for user in users:
+            self.assertEqual(user.task_set.count(), 3)
+
+    def test_password_hashed_once(self):
+        """Test every user shares one hash of the password"""
+        with patch(
+            'core.seeding.make_password', wraps=seeding.make_password
+        ) as make_password:
+            self.seed(users=4, password='seedpass')
+
+        make_password.assert_called_once_with('seedpass')
+        hashes = set(get_user_model().objects.values_list('password', flat=True))
+        self.assertEqual(len(hashes), 1)
+        self.assertTrue(get_user_model().objects.first().check_password('seedpass'))
+
+    def test_no_password(self):
+        """Test users created without a password can't log in"""
+        self.seed(users=1)
+
+        self.assertFalse(get_user_model().objects.get().has_usable_password())
+
+    def test_import_csv(self):
+        """Test importing users and tasks from CSV files"""
+        users = self.write(
+            'users.csv',
+            'email,first_name,last_name\n'
+            'one@testing.com,One,User\n'
+            'two@testing.com,Two,User\n'
+        )
+        self.seed(users_file=users, password='seedpass')
+        user = get_user_model().objects.get(email='two@testing.com')
+        tasks = self.write(
+            'tasks.csv',
+            'task_id,title,description,task_status,user\n'
+            '7,Imported,"With, commas",P,%d\n' % user.id
+        )
+
+        out = self.seed(tasks_file=tasks)
+
+        self.assertIn('Created 0 users and 1 tasks', out)
+        task = Task.objects.get()
+        self.assertEqual(task.user, user)
+        self.assertEqual(task.description, 'With, commas')
+        self.assertEqual(task.task_status, 'P')
+
+    def test_import_ndjson(self):
+        """Test importing tasks from an NDJSON export"""
+        user = get_user_model().objects.create_user(
+            'test@testing.com', 'Test', 'User'
+        )
+        lines = [
+            {'title': 'Task %d' % i, 'description': 'x',
+             'task_status': 'A', 'user': user.id}
+            for i in range(5)
+        ]
+        tasks = self.write(
+            'tasks.ndjson', ''.join(json.dumps(line) + '\n' for line in lines)
+        )
+
+        self.seed(tasks_file=tasks, batch_size=2)
+
+        self.assertEqual(Task.objects.filter(user=user).count(), 5)
+
+    def test_unknown_format(self):
+        """Test files of unknown formats are rejected"""
+        path = self.write('tasks.xml', '')
+
+        with self.assertRaises(CommandError):
+            self.seed(tasks_file=path)
+
+
+class BatchesTests(TestCase):
+
+    def test_batches(self):
+        """Test iterables are consumed in batches"""
+        self.assertEqual(
+            list(seeding.batches(range(5), 2)), [[0, 1], [2, 3], [4]]
+        )
@@ -0,0 +1,237 @@
+import os
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import throttling
+from core.tests.runner import TestRunner, iter_tests
+from core.throttling import (
+    BucketThrottle,
+    LocMemThrottleStore,
+    RedisThrottleStore,
+    parse_rate,
+    take,
+)
+
+
+TASK_URL = reverse('task:task-list')
+LOGIN_URL = reverse('auth:token_obtain_pair')
+REGISTER_URL = reverse('auth:register')
+
+RATES = {
+    'tasks_read': '2/m',
+    'tasks_write': '1/m',
+    'login': '2/m',
+    'register': '1/h',
+}
+
+
+class BucketTests(TestCase):
+    """Test the token bucket arithmetic"""
+
+    def test_parse_rate(self):
+        """Test rates are parsed into requests and seconds"""
+        self.assertEqual(parse_rate('100/m'), (100, 60))
+        self.assertEqual(parse_rate('5/hour'), (5, 3600))
+        with self.assertRaises(ImproperlyConfigured):
+            parse_rate('100')
+
+    def test_take(self):
+        """Test a bucket allows its capacity, then one token per interval"""
+        full_at = None
+        for _ in range(3):
+            full_at, wait = take(full_at, 100, 10, 3)
+            self.assertEqual(wait, 0)
+
+        full_at, wait = take(full_at, 100, 10, 3)
+        self.assertEqual(wait, 10)
+
+        full_at, wait = take(full_at, 110, 10, 3)
+        self.assertEqual(wait, 0)
+        full_at, wait = take(full_at, 110, 10, 3)
+        self.assertEqual(wait, 10)
+
+    def test_wait_rounded_up(self):
+        """Test the wait is in whole seconds, never shorter than needed"""
+        throttle = BucketThrottle()
+        for wait_seconds, wait in ((0.2, 1), (29.5, 30), (30, 30)):
+            throttle.wait_seconds = wait_seconds
+            self.assertEqual(throttle.wait(), wait)
+
+    def test_locmem_store_refills(self):
+        """Test the in-memory store refills buckets with time"""
+        store = LocMemThrottleStore()
+        with patch('time.monotonic', return_value=1000):
+            self.assertEqual(store.hit('key', 30, 2), 0)
+            self.assertEqual(store.hit('key', 30, 2), 0)
+            self.assertEqual(store.hit('key', 30, 2), 30)
+            self.assertEqual(store.hit('other', 30, 2), 0)
+        with patch('time.monotonic', return_value=1030):
+            self.assertEqual(store.hit('key', 30, 2), 0)
+
+    def test_locmem_store_purges_full_buckets(self):
+        """Test buckets that refilled are dropped"""
+        store = LocMemThrottleStore()
+        store.purge_every = 2
+        with patch('time.monotonic', return_value=1000):
+            store.hit('old', 1, 5)
+        with patch('time.monotonic', return_value=2000):
+            store.hit('new', 1, 5)
+        self.assertEqual(list(store._buckets), ['new'])
+
+
+class FakeRedis:
+    """Records the script calls a Redis client would receive"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def register_script(self, source):
+        self.source = source
+
+        def script(keys, args):
+            self.calls.append((keys, args))
+            return self.reply
+        return script
+
+
+class RedisThrottleStoreTests(TestCase):
+    """Test the Redis store"""
+
+    def test_hit(self):
+        """Test the script gets the prefixed key and its reply is parsed"""
+        client = FakeRedis(b'1.5')
+        store = RedisThrottleStore(client=client)
+
+        self.assertEqual(store.hit('tasks_read:user:1', 0.5, 120), 1.5)
+        self.assertEqual(
+            client.calls, [(['throttle:tasks_read:user:1'], [0.5, 120])]
+        )
+        self.assertIn("redis.call('TIME')", client.source)
+
+    @skipUnless(
+        os.environ.get('THROTTLE_TEST_REDIS_URL'),
+        'THROTTLE_TEST_REDIS_URL is not set'
+    )
+    def test_redis_server(self):
+        """Test the script against a real server"""
+        store = RedisThrottleStore(os.environ['THROTTLE_TEST_REDIS_URL'])
+        store.clear()
+        self.addCleanup(store.clear)
+
+        self.assertEqual(store.hit('test', 60, 2), 0)
+        self.assertEqual(store.hit('test', 60, 2), 0)
+        self.assertGreater(store.hit('test', 60, 2), 0)
+
+
+# in memory even when THROTTLE_REDIS_URL is set
+@override_settings(
+    THROTTLE_RATES=RATES,
+    THROTTLE_STORE='core.throttling.LocMemThrottleStore',
+    THROTTLE_STORE_OPTIONS={},
+)
+class ThrottledViewsTests(TestCase):
+    """Test the throttles of the task and auth endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+
+    def test_store_from_settings(self):
+        """Test the configured store is used"""
+        self.assertIsInstance(
+            throttling.get_throttle_store(), LocMemThrottleStore
+        )
+
+    def test_task_reads_and_writes(self):
+        """Test task reads and writes have separate budgets per user"""
+        self.client.force_authenticate(self.user)
+        for _ in range(2):
+            self.assertEqual(self.client.get(TASK_URL).status_code, 200)
+
+        res = self.client.get(TASK_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '30')
+
+        payload = {'title': 'Task', 'description': 'Task'}
+        res = self.client.post(TASK_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(TASK_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_tasks_per_user(self):
+        """Test a user's budget doesn't affect other users"""
+        other = get_user_model().objects.create_user(
+            'other@testing.com', 'testpass', 'Other', 'User'
+        )
+        self.client.force_authenticate(self.user)
+        for _ in range(3):
+            self.client.get(TASK_URL)
+
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(TASK_URL).status_code, 200)
+
+    def test_login_per_ip(self):
+        """Test logins are limited per IP address"""
+        payload = {'email': 'test@testing.com', 'password': 'wrong'}
+        for _ in range(2):
+            res = self.client.post(LOGIN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(LOGIN_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        res = self.client.post(LOGIN_URL, payload, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_register(self):
+        """Test registrations are limited per IP address"""
+        payload = {
+            'email': 'new@testing.com',
+            'password': 'testpass',
+            'first_name': 'New',
+            'last_name': 'User',
+        }
+        res = self.client.post(REGISTER_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        payload['email'] = 'second@testing.com'
+        res = self.client.post(REGISTER_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(THROTTLE_RATES={})
+    def test_no_rate(self):
+        """Test scopes without a rate aren't throttled"""
+        self.client.force_authenticate(self.user)
+        for _ in range(5):
+            self.assertEqual(self.client.get(TASK_URL).status_code, 200)
+
+
+class TestRunnerTests(TestCase):
+    """Test the throttle store doesn't leak from test to test"""
+
+    def test_store_reset_after_each_test(self):
+        """Test every test drops the store once it ran"""
+        suite = TestRunner(verbosity=0).build_suite(
+            ['core.tests.test_throttling.BucketTests']
+        )
+        tests = list(iter_tests(suite))
+
+        self.assertTrue(tests)
+        for test in tests:
+            self.assertIn(
+                (throttling.reset_throttle_store, (), {}), test._cleanups
+            )
@@ -0,0 +1,33 @@
+import importlib
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import clear_url_caches, get_resolver
+
+from core.warmup import warm_up
+
+
+class WarmUpTests(SimpleTestCase):
+
+    def test_warm_up(self):
+        """Testing the URL patterns are compiled without a request"""
+        clear_url_caches()
+
+        warm_up()
+
+        self.assertTrue(get_resolver()._populated)
+
+    @override_settings(WARM_UP=False)
+    def test_warm_up_disabled(self):
+        """Testing nothing is loaded with WARM_UP off"""
+        with patch('core.warmup.get_resolver') as resolver:
+            warm_up()
+        resolver.assert_not_called()
+
+    def test_server_processes_warm_up(self):
+        """Testing the WSGI and ASGI entry points warm up"""
+        for name in ('task_project.wsgi', 'task_project.asgi'):
+            module = importlib.import_module(name)
+            with self.subTest(name), patch('core.warmup.warm_up') as warm:
+                importlib.reload(module)
+            warm.assert_called_once_with()
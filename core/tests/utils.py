@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Task
+
+
+def create_user(email='test@testing.com', **params):
+    """Create and return a user, named Test User unless given a name"""
+    params = {'first_name': 'Test', 'last_name': 'User', **params}
+    return get_user_model().objects.create_user(email, **params)
+
+
+def sample_task(user, **params):
+    """Create and return a sample task"""
+    defaults = {
+        'title': 'Sample task',
+        'description': 'Django API for the user',
+        'task_status': 'A',
+    }
+    defaults.update(params)
+
+    return Task.objects.create(user=user, **defaults)
+
+
+def sample_tasks(user, count):
+    """Create count tasks of the user with a single insert"""
+    return Task.objects.bulk_create([
+        Task(user=user, title='Task %d' % index, description='Sample')
+        for index in range(count)
+    ])
+
+
+def format_queries(context):
+    return '\n'.join(
+        '%d. %s' % (index, query['sql'])
+        for index, query in enumerate(context.captured_queries, start=1)
+    )
+
+
+class QueryBudgetMixin:
+    """Test case assertions on the number of queries code runs"""
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using='default'):
+        """Fail if the block runs more than ``budget`` queries"""
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        if len(context) > budget:
+            self.fail('%d queries run, over the budget of %d:\n%s' % (
+                len(context), budget, format_queries(context)
+            ))
+
+    def assertConstantQueries(self, func, add_rows, budget, using='default'):
+        """Fail if ``func`` runs more queries once ``add_rows()`` ran.
+
+        Catches N+1 queries: the count must not grow with the number of
+        rows, and stay within the budget.
+        """
+        with self.assertMaxQueries(budget, using) as before:
+            func()
+        add_rows()
+        with self.assertMaxQueries(budget, using) as after:
+            func()
+        if len(after) != len(before):
+            self.fail('%d queries run before adding rows, %d after:\n%s' % (
+                len(before), len(after), format_queries(after)
+            ))
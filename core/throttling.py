@@ -0,0 +1,201 @@
+"""Token bucket throttles with their state in a pluggable store.
+
+Buckets follow the generic cell rate algorithm: a rate of N requests per
+period refills one token every period / N seconds and holds up to N
+tokens. The only state per key is the time at which the bucket will be
+full again, so checking a request is O(1) in time and space.
+
+The store is set by THROTTLE_STORE. LocMemThrottleStore keeps buckets in
+process memory, so each worker process gets its own budget. Set
+THROTTLE_REDIS_URL to share the buckets between every process through
+RedisThrottleStore.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Turn a ``<requests>/<s|m|h|d>`` rate into requests and seconds"""
+    try:
+        count, period = rate.split('/')
+        return int(count), PERIODS[period[0]]
+    except (ValueError, KeyError, IndexError):
+        raise ImproperlyConfigured('Invalid throttle rate: %r' % rate)
+
+
+def take(full_at, now, interval, capacity):
+    """Take a token from a bucket.
+
+    ``full_at`` is when the bucket would be full again, or None for a new
+    bucket. Return the new ``full_at`` and 0 if a token was left, or the
+    old one and the seconds to wait for the next token otherwise.
+    """
+    full_at = max(full_at or now, now)
+    # the bucket is empty while it is more than capacity tokens from full
+    wait = full_at - (capacity - 1) * interval - now
+    if wait > 0:
+        return full_at, wait
+    return full_at + interval, 0
+
+
+class LocMemThrottleStore:
+    """Buckets in the memory of the process"""
+
+    # Drop full buckets every that many requests, keeping memory bounded
+    purge_every = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key, interval, capacity):
+        """Take a token, return the seconds to wait, 0 if allowed"""
+        now = time.monotonic()
+        with self._lock:
+            self._hits += 1
+            if self._hits % self.purge_every == 0:
+                self._buckets = {
+                    key: full_at for key, full_at in self._buckets.items()
+                    if full_at > now
+                }
+            full_at, wait = take(
+                self._buckets.get(key), now, interval, capacity
+            )
+            self._buckets[key] = full_at
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# Same as take(), run atomically inside Redis on its own clock. The key
+# expires once the bucket is full again.
+TAKE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local full_at = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local wait = full_at - (capacity - 1) * interval - now
+if wait > 0 then
+    return tostring(wait)
+end
+full_at = full_at + interval
+redis.call('SET', KEYS[1], tostring(full_at),
+           'PX', math.ceil((full_at - now) * 1000))
+return '0'
+"""
+
+
+class RedisThrottleStore:
+    """Buckets in Redis, or a server speaking its protocol, shared by
+    every process. Requires the redis package."""
+
+    key_prefix = 'throttle:'
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImproperlyConfigured(
+                    'RedisThrottleStore requires the redis package'
+                )
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    def hit(self, key, interval, capacity):
+        """Take a token, return the seconds to wait, 0 if allowed"""
+        wait = self._take(
+            keys=[self.key_prefix + key], args=[interval, capacity]
+        )
+        return float(wait)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.key_prefix + '*'):
+            self.client.delete(key)
+
+
+_store = None
+
+
+def get_throttle_store():
+    """Return the store configured by THROTTLE_STORE"""
+    global _store
+    if _store is None:
+        store_class = import_string(settings.THROTTLE_STORE)
+        _store = store_class(**settings.THROTTLE_STORE_OPTIONS)
+    return _store
+
+
+def reset_throttle_store():
+    """Drop the store, the next request creates one from the settings"""
+    global _store
+    _store = None
+
+
+@receiver(setting_changed)
+def throttle_settings_changed(*, setting, **kwargs):
+    if setting in ('THROTTLE_STORE', 'THROTTLE_STORE_OPTIONS'):
+        reset_throttle_store()
+
+
+class BucketThrottle(BaseThrottle):
+    """Throttle requests with a token bucket per user and scope.
+
+    Authenticated requests are counted per user, anonymous ones per IP
+    address. The rate of the scope comes from THROTTLE_RATES; scopes
+    without a rate aren't throttled.
+    """
+
+    def get_scope(self, request, view):
+        return view.throttle_scope
+
+    def get_ident_key(self, request):
+        user = request.user
+        if user and user.is_authenticated:
+            return 'user:%s' % user.pk
+        return 'ip:%s' % self.get_ident(request)
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = settings.THROTTLE_RATES.get(scope)
+        if not rate:
+            return True
+
+        capacity, period = parse_rate(rate)
+        self.wait_seconds = get_throttle_store().hit(
+            '%s:%s' % (scope, self.get_ident_key(request)),
+            period / capacity,
+            capacity
+        )
+        return self.wait_seconds == 0
+
+    def wait(self):
+        # whole seconds for Retry-After, rounded up so retrying on time
+        # finds a token
+        return math.ceil(self.wait_seconds)
+
+
+class ReadWriteBucketThrottle(BucketThrottle):
+    """Give reads and writes separate budgets: the view's throttle scope
+    suffixed with ``_read`` for safe methods, ``_write`` otherwise"""
+
+    def get_scope(self, request, view):
+        kind = 'read' if request.method in SAFE_METHODS else 'write'
+        return '%s_%s' % (view.throttle_scope, kind)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from core.metrics import request_metrics
+
+
+def metrics(request):
+    """Expose the request metrics of this process to Prometheus"""
+    if not settings.REQUEST_METRICS_ENABLED:
+        raise Http404()
+    return HttpResponse(
+        request_metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,29 @@
+"""Do the work otherwise left to the first requests of a process.
+
+The URL resolver compiles its patterns, serializers introspect the model
+fields behind them and the password hasher imports its library on first
+use, which makes the first requests served by each process slow. The WSGI
+and ASGI entry points call warm_up() once the application is loaded, so
+each server process pays for it before it accepts requests; with
+gunicorn's --preload, the master does it once before forking the workers.
+Set WARM_UP=0 to skip it.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.urls import get_resolver
+
+from tasks.serializers import AdminTaskSerializer, TaskSerializer
+
+
+def warm_up():
+    """Load what the first requests would otherwise load, if WARM_UP"""
+    if not settings.WARM_UP:
+        return
+
+    # compiles the URL patterns
+    get_resolver().reverse_dict
+    # introspects the model fields behind the serializers
+    for serializer_class in (TaskSerializer, AdminTaskSerializer):
+        serializer_class().fields
+    # imports the hashing library
+    get_hasher('default')
@@ -0,0 +1,27 @@
+"""Entry points of the processes running jobs for ``manage.py run_worker``.
+
+The processes are spawned, not forked, so they don't share the database
+connections of the worker; Django is set up in each of them first, which
+is why nothing is imported from the apps at the top of this module.
+"""
+import django
+
+
+def setup():
+    django.setup()
+
+
+def execute(job_id):
+    """Run a job, with the connections handled like around a request"""
+    from django.db import close_old_connections
+
+    from core.db.routers import pin_to_primary
+    from core.jobs import run_job
+
+    # jobs read back what they write, and their own row just claimed
+    pin_to_primary()
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
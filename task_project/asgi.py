@@ -3,6 +3,19 @@ ASGI config for task_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Database connections are kept open between requests for CONN_MAX_AGE
+seconds, or shared through a per-process pool when DB_POOL_MAX_SIZE is
+set (see core.db.backends.postgresql_pool).
+
+Set TASK_API_ASYNC=1 to serve the task endpoints from native async views
+(see task_project.async_urls).
+
+Task events are streamed from /api/task/events/ by
+tasks.streaming.TaskEventsMiddleware, around the Django application.
+
+The URL resolver, serializers and password hasher are loaded before the
+first request, see core.warmup.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
@@ -13,4 +26,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_project.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.warmup import warm_up  # noqa: E402
+from tasks.streaming import TaskEventsMiddleware  # noqa: E402
+
+application = TaskEventsMiddleware(django_application)
+
+warm_up()
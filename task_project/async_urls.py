@@ -0,0 +1,18 @@
+"""task_project URL Configuration for the async task API
+
+Same as task_project.urls, except that the task list and detail endpoints
+are served by the native async views of tasks.async_views, and logins by
+the one of authentication.async_views. Selected with
+TASK_API_ASYNC=1, which only pays off under ASGI (task_project.asgi).
+"""
+from django.urls import path
+
+from authentication import async_views as auth_async_views
+from task_project.urls import urlpatterns as sync_urlpatterns
+from tasks import async_views
+
+urlpatterns = [
+    path('api/task/tasks/', async_views.task_list),
+    path('api/task/tasks/<int:pk>/', async_views.task_detail),
+    path('api/auth/login/', auth_async_views.login),
+] + sync_urlpatterns
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -40,13 +41,17 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     'rest_framework',
-    'core',
+    'core.apps.CoreConfig',
     'authentication',
-    'tasks',
+    'tasks.apps.TasksConfig',
 ]
 
 MIDDLEWARE = [
+    # first: under RequestMetricsMiddleware, Django 3.1's SecurityMiddleware
+    # would hide from it that the rest of the chain is async
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -55,7 +60,20 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'task_project.urls'
+# TASK_API_ASYNC=1 serves the task list and detail endpoints and the login
+# from native async views (tasks.async_views, authentication.async_views),
+# meant for the ASGI entry point
+if os.environ.get('TASK_API_ASYNC') == '1':
+    ROOT_URLCONF = 'task_project.async_urls'
+else:
+    ROOT_URLCONF = 'task_project.urls'
+
+# Load the URL resolver, serializers and password hasher when a server
+# process starts rather than on its first requests, see core.warmup
+WARM_UP = os.environ.get('WARM_UP', '1') == '1'
+
+# Gives every test a new throttle store, see core.tests.runner
+TEST_RUNNER = 'core.tests.runner.TestRunner'
 
 TEMPLATES = [
     {
@@ -75,10 +93,15 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task_project.wsgi.application'
 
+# Per view latency, query and response size metrics, served on /metrics.
+# REQUEST_METRICS_SERVER_TIMING also adds them to a Server-Timing header
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS') == '1'
+REQUEST_METRICS_SERVER_TIMING = True
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (   
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.StatelessJWTAuthentication',
     )
 }
 
@@ -90,6 +113,89 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Request budgets per user, or per IP address for anonymous requests, as
+# "<requests>/<s|m|h|d>"; scopes without a rate aren't throttled. Task
+# reads and writes have separate budgets. See core.throttling
+THROTTLE_RATES = {
+    'tasks_read': os.environ.get('THROTTLE_TASKS_READ', '1200/m'),
+    'tasks_write': os.environ.get('THROTTLE_TASKS_WRITE', '300/m'),
+    'login': os.environ.get('THROTTLE_LOGIN', '30/m'),
+    'register': os.environ.get('THROTTLE_REGISTER', '30/h'),
+}
+
+# Throttle state is kept in process memory, unless THROTTLE_REDIS_URL
+# points at a Redis server shared by every process
+if os.environ.get('THROTTLE_REDIS_URL'):
+    THROTTLE_STORE = 'core.throttling.RedisThrottleStore'
+    THROTTLE_STORE_OPTIONS = {'url': os.environ['THROTTLE_REDIS_URL']}
+else:
+    THROTTLE_STORE = 'core.throttling.LocMemThrottleStore'
+    THROTTLE_STORE_OPTIONS = {}
+
+# Task events reach the streams of this process only, unless
+# TASK_EVENTS_REDIS_URL points at a Redis server relaying them to every
+# process (see tasks.events)
+if os.environ.get('TASK_EVENTS_REDIS_URL'):
+    TASK_EVENTS_BACKEND = 'tasks.events.RedisEventBackend'
+    TASK_EVENTS_BACKEND_OPTIONS = {'url': os.environ['TASK_EVENTS_REDIS_URL']}
+else:
+    TASK_EVENTS_BACKEND = 'tasks.events.LocalEventBackend'
+    TASK_EVENTS_BACKEND_OPTIONS = {}
+# Events queued per stream before a slow client is disconnected
+TASK_EVENTS_QUEUE_SIZE = 100
+# Seconds between keep-alive comments on idle event streams
+TASK_EVENTS_KEEPALIVE = 15
+# Lifetime of the tokens opening event streams from clients that can't
+# set headers, see authentication.tokens.StreamToken
+TASK_EVENTS_TOKEN_LIFETIME = timedelta(seconds=60)
+# Event streams a user may keep open at once, in each process
+TASK_EVENTS_MAX_STREAMS = int(os.environ.get('TASK_EVENTS_MAX_STREAMS', 5))
+
+# Version of the user claims embedded in tokens at login. Bump it to make
+# previously issued tokens fall back to a database lookup of the user.
+JWT_CLAIMS_VERSION = 1
+
+
+# Task API
+# Keyset pagination is opt-in through the ``cursor``/``page_size`` query params
+
+TASK_PAGE_SIZE = 100
+TASK_MAX_PAGE_SIZE = 1000
+
+# Rows fetched per round trip when streaming task exports
+TASK_EXPORT_CHUNK_SIZE = 2000
+
+# Limits for the bulk create/update/delete endpoint
+TASK_BULK_MAX_ITEMS = 10000
+TASK_BULK_BATCH_SIZE = 1000
+
+# Seconds a per-user status summary may stay cached; entries are keyed by
+# the version of the user's tasks, so writes never serve a stale one
+TASK_SUMMARY_CACHE_TIMEOUT = 300
+
+# Seconds to cache task list bodies under their ETag; 0 disables it
+TASK_RESPONSE_CACHE_TIMEOUT = 0
+
+# Run the queries of the async task views on the thread shared with sync
+# views instead of a thread pool; they then share its transaction
+TASK_ASYNC_DB_THREAD_SENSITIVE = False
+
+
+# Background jobs, run by ``manage.py run_worker`` (see core.jobs)
+# JOBS_EAGER=1 runs jobs inline as soon as they're queued, without a worker
+JOBS_EAGER = os.environ.get('JOBS_EAGER') == '1'
+JOBS_WORKER_PROCESSES = int(
+    os.environ.get('JOBS_WORKER_PROCESSES', os.cpu_count() or 1)
+)
+JOBS_MAX_ATTEMPTS = 3
+# Seconds before retrying a failed job, doubled after each attempt
+JOBS_RETRY_DELAY = 30
+# Seconds after which a running job is deemed lost and queued again
+JOBS_TIMEOUT = 3600
+
+# Files written by jobs, such as task exports
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
 
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
@@ -97,14 +203,56 @@ SIMPLE_JWT = {
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
-        'NAME': 'postgres',
-        'USER': 'postgres',
-        'PASSWORD': '12345678',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'postgres'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '12345678'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Seconds a connection is kept open for later requests, 0 closes
+        # it at the end of each request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # Check a persistent connection still works before each request
+        # reuses it, see core.signals
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        'OPTIONS': {},
     }
 }
 
+# DB_POOL_MAX_SIZE > 0 shares a pool of connections between the threads
+# of each process instead: every request borrows a connection and hands
+# it back when it ends, so CONN_MAX_AGE is 0. A request finding every
+# connection in use waits DB_POOL_TIMEOUT seconds for one
+if int(os.environ.get('DB_POOL_MAX_SIZE', 0)) > 0:
+    DATABASES['default'].update({
+        'ENGINE': 'core.db.backends.postgresql_pool',
+        'CONN_MAX_AGE': 0,
+    })
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+        'max_size': int(os.environ['DB_POOL_MAX_SIZE']),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+
+
+# Read replicas of the default database, e.g. DB_REPLICA_HOSTS=db2,db3.
+# Reads are spread over them, see core.db.routers
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host
+):
+    alias = 'replica%d' % index
+    DATABASES[alias] = dict(
+        DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+
+
+# Logins of the sync and the async views both go through this backend,
+# see authentication.backends
+AUTHENTICATION_BACKENDS = ['authentication.backends.PasswordBackend']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -125,6 +273,37 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.1/topics/auth/passwords/
+# New passwords are hashed with PASSWORD_HASHER; the other hashers only
+# verify existing hashes, which are rehashed on the user's next login.
+
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+
+_PASSWORD_HASHERS = {
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+    # requires the argon2-cffi package
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items()
+    if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+SCRYPT_PARAMETERS = {
+    'work_factor': int(os.environ.get('SCRYPT_WORK_FACTOR', 2 ** 14)),
+    'block_size': int(os.environ.get('SCRYPT_BLOCK_SIZE', 8)),
+    'parallelism': int(os.environ.get('SCRYPT_PARALLELISM', 1)),
+}
+
+# Threads hashing passwords for async code, see core.hashers
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 4))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.1/topics/i18n/
 
@@ -3,6 +3,13 @@ WSGI config for task_project project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+Database connections are kept open between requests for CONN_MAX_AGE
+seconds, or shared through a per-process pool when DB_POOL_MAX_SIZE is
+set (see core.db.backends.postgresql_pool).
+
+The URL resolver, serializers and password hasher are loaded before the
+first request, see core.warmup.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/wsgi/
 """
@@ -14,3 +21,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_project.settings')
 
 application = get_wsgi_application()
+
+from core.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,238 @@
+"""Native async views for the task list, retrieve and create endpoints.
+
+Under ASGI, Django runs sync views through ``sync_to_async`` on a single
+shared thread, so requests to the DRF viewset queue behind each other.
+These views keep the request on the event loop instead: the JWT check is
+pure computation thanks to the claims in the token, and each ORM call
+(Django 3.1 has no async ORM) is sent to a thread pool by
+``database_sync_to_async``. Responses match the ones of TaskViewSet.
+
+Set TASK_API_ASYNC=1 to serve /api/task/tasks/ from these views, see
+``task_project.async_urls``.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from authentication.authentication import StatelessJWTAuthentication
+from core.throttling import ReadWriteBucketThrottle
+from tasks.conditional import detail_response, list_response
+from tasks.pagination import TaskCursorPagination
+from tasks.renderers import ORJSONRenderer
+from tasks.views import (
+    TaskViewSet,
+    get_task_queryset,
+    get_task_serializer_class,
+    list_task_data,
+    save_tasks,
+)
+
+
+def close_old_connections():
+    """Close this thread's connections that are broken or past their age"""
+    for conn in connections.all():
+        # never close a connection in the middle of a transaction
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+
+
+def database_sync_to_async(func):
+    """Wrap ORM code to run in a worker thread from async views.
+
+    Worker threads keep their own connections, so stale ones are closed
+    around every call just like Django does around every sync request.
+    """
+    def inner(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(
+        inner, thread_sensitive=settings.TASK_ASYNC_DB_THREAD_SENSITIVE
+    )
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    """Render data the way the DRF JSON renderer does"""
+    response = HttpResponse(
+        ORJSONRenderer().render(data),
+        status=status_code,
+        content_type='application/json'
+    )
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def error_response(exc, authenticator):
+    """Render an API exception like DRF's default exception handler"""
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated,
+                        exceptions.AuthenticationFailed)):
+        headers['WWW-Authenticate'] = authenticator.authenticate_header(None)
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = '%d' % math.ceil(exc.wait)
+    return render(data, exc.status_code, headers)
+
+
+async def authenticate(request, authenticator):
+    """Return the user of the request's JWT, querying only if needed"""
+    return await authenticate_header(
+        authenticator.get_header(request), authenticator
+    )
+
+
+async def authenticate_header(header, authenticator):
+    """Return the user of an Authorization header, querying only if needed"""
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        raise exceptions.NotAuthenticated()
+
+    validated_token = authenticator.get_validated_token(raw_token)
+    user = authenticator.get_stateless_user(validated_token)
+    if user is None:
+        user = await database_sync_to_async(authenticator.get_user)(
+            validated_token
+        )
+    return user
+
+
+async def check_throttles(request, user):
+    """Apply the throttles of TaskViewSet"""
+    drf_request = Request(request)
+    drf_request.user = user
+    throttle = ReadWriteBucketThrottle()
+    # the store may be remote
+    allowed = await sync_to_async(
+        throttle.allow_request, thread_sensitive=False
+    )(drf_request, TaskViewSet)
+    if not allowed:
+        raise exceptions.Throttled(throttle.wait())
+
+
+async def list_tasks(request, user):
+    drf_request = Request(request)
+    serializer_class = get_task_serializer_class(user)
+
+    def get_data():
+        queryset = get_task_queryset(
+            TaskViewSet.queryset.all(), request.GET, user, 'list'
+        )
+        return list_task_data(
+            queryset,
+            drf_request,
+            TaskCursorPagination(),
+            serializer_class,
+            {'request': drf_request}
+        )
+
+    # the version lookup, the response cache and the query in one call
+    return await database_sync_to_async(list_response)(
+        request, user, serializer_class, get_data, render
+    )
+
+
+async def create_task(request, user):
+    drf_request = Request(
+        request,
+        parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    )
+    serializer = get_task_serializer_class(user)(
+        data=drf_request.data, context={'request': drf_request}
+    )
+
+    def save():
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            save_tasks(serializer, user)
+        return serializer.data
+
+    data = await database_sync_to_async(save)()
+    return render(data, status.HTTP_201_CREATED)
+
+
+async def retrieve_task(request, user, pk):
+    task = await database_sync_to_async(
+        lambda: get_task_queryset(
+            TaskViewSet.queryset.all(), request.GET, user, 'retrieve'
+        ).filter(task_id=pk).first()
+    )()
+    if task is None:
+        raise exceptions.NotFound()
+
+    serializer_class = get_task_serializer_class(user)
+    context = {'request': Request(request)}
+    return detail_response(
+        request,
+        user,
+        task,
+        serializer_class,
+        lambda: serializer_class(task, context=context).data,
+        render
+    )
+
+
+# the DRF views answering the methods that have no async version here,
+# OPTIONS included
+sync_task_list = TaskViewSet.as_view({
+    'get': 'list',
+    'post': 'create',
+})
+sync_task_detail = TaskViewSet.as_view({
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+})
+
+
+async def task_list(request):
+    """List tasks or create a task; other methods are handed to the DRF
+    viewset"""
+    if request.method not in ('GET', 'HEAD', 'POST'):
+        return await sync_to_async(sync_task_list, thread_sensitive=True)(
+            request
+        )
+
+    authenticator = StatelessJWTAuthentication()
+    try:
+        user = await authenticate(request, authenticator)
+        await check_throttles(request, user)
+        if request.method == 'POST':
+            return await create_task(request, user)
+        return await list_tasks(request, user)
+    except exceptions.APIException as exc:
+        return error_response(exc, authenticator)
+
+
+async def task_detail(request, pk):
+    """Retrieve a task; other methods are handed to the DRF viewset"""
+    if request.method not in ('GET', 'HEAD'):
+        return await sync_to_async(sync_task_detail, thread_sensitive=True)(
+            request, pk=pk
+        )
+
+    authenticator = StatelessJWTAuthentication()
+    try:
+        user = await authenticate(request, authenticator)
+        await check_throttles(request, user)
+        return await retrieve_task(request, user, pk)
+    except exceptions.APIException as exc:
+        return error_response(exc, authenticator)
+
+
+# Django 3.1's csrf_exempt decorator hides that a view is async
+task_list.csrf_exempt = True
+task_detail.csrf_exempt = True
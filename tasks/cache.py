@@ -0,0 +1,38 @@
+"""Cached data derived from the task table.
+
+Entries are keyed by the version of the tasks they were computed from, so
+a write anywhere moves readers on to a new key as soon as it commits, in
+every process, and stale entries simply expire.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from tasks.changes import get_tasks_version
+from tasks.filters import TASK_STATUSES
+
+
+def summary_key(user_id, version):
+    """Return the cache key of a version of the summary for a user, or for
+    everyone"""
+    return 'tasks:summary:%s:%d' % (
+        'all' if user_id is None else user_id, version
+    )
+
+
+def get_task_summary(queryset, user_id=None):
+    """Return the number of tasks per status, computed with one GROUP BY"""
+    key = summary_key(user_id, get_tasks_version(user_id))
+    summary = cache.get(key)
+    if summary is None:
+        counts = dict(
+            queryset.order_by()
+            .values_list('task_status')
+            .annotate(count=Count('task_id'))
+        )
+        summary = {
+            'total': sum(counts.values()),
+            'counts': {status: counts.get(status, 0) for status in TASK_STATUSES},
+        }
+        cache.set(key, summary, settings.TASK_SUMMARY_CACHE_TIMEOUT)
+    return summary
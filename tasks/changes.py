@@ -0,0 +1,170 @@
+"""Change feed of the tasks, for clients syncing incrementally.
+
+Every write to a task appends a TaskChange with the next sequence number.
+Deleting a task, or moving it to another user, appends a tombstone for
+its previous owner. Clients keep the last sequence number they've seen
+and only fetch the changes after it.
+
+Sequence numbers are handed out when changes are inserted, but become
+visible when their transaction commits, so a reader could see a change
+before an earlier one still uncommitted, then skip it. Writers lock the
+feeds of the owners of their tasks until they commit, so the changes of
+each user commit in sequence order, see lock_feeds. Writers of different
+users don't wait for each other, which means the unfiltered feed of
+superusers can skip a change committed late: superusers syncing every
+task should follow each user's feed with ``?user=``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+from core.models import TaskChange
+from tasks.events import publish_task_events
+
+
+_batch = ContextVar('task_change_batch', default=None)
+
+
+@contextmanager
+def batch_changes():
+    """Write the changes recorded inside the block with a single insert"""
+    changes, events = [], []
+    token = _batch.set((changes, events))
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    write_changes(changes, events)
+
+
+def record_task_changes(tasks, deleted=False, created=False):
+    """Append the writes of the given tasks to the change feed, and
+    publish them as events once they're committed"""
+    changes, events = [], []
+    for task in tasks:
+        moved = task.loaded_user_id not in (None, task.user_id)
+        if moved:
+            # before the change of the new owner, so the feed of every
+            # user ends with the task
+            changes.append(TaskChange(
+                task_id=task.task_id, user_id=task.loaded_user_id,
+                deleted=True
+            ))
+            events.append(('deleted', task.task_id, task.loaded_user_id))
+        changes.append(TaskChange(
+            task_id=task.task_id, user_id=task.user_id, deleted=deleted
+        ))
+        if deleted:
+            event = 'deleted'
+        elif created or moved:
+            event = 'created'
+        else:
+            event = 'updated'
+        events.append((event, task.task_id, task.user_id))
+
+    batch = _batch.get()
+    if batch is None:
+        write_changes(changes, events)
+    else:
+        batch[0].extend(changes)
+        batch[1].extend(events)
+
+
+def write_changes(changes, events):
+    if not changes:
+        return
+    using = router.db_for_write(TaskChange)
+    with transaction.atomic(using=using, savepoint=False):
+        lock_feeds(using, {change.user_id for change in changes})
+        TaskChange.objects.using(using).bulk_create(
+            changes, batch_size=settings.TASK_BULK_BATCH_SIZE
+        )
+        transaction.on_commit(
+            lambda: publish_task_events(events), using=using
+        )
+
+
+# first key of the PostgreSQL advisory locks of the feeds, the second is
+# the id of the user
+FEED_LOCK_KEY = 0x7461736b
+
+
+def lock_feeds(using, user_ids):
+    """Lock the feeds of the given users until the transaction commits.
+
+    Locks are taken in the order of the user ids, so writers touching
+    several feeds can't deadlock. PostgreSQL uses advisory locks, other
+    databases lock the rows of the users. SQLite serializes writers
+    anyway.
+    """
+    user_ids = sorted(user_ids)
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # unnest keeps the order of the array
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s, user_id) '
+                'FROM unnest(%s::integer[]) AS user_id',
+                [FEED_LOCK_KEY, user_ids]
+            )
+    elif connection.features.has_select_for_update:
+        list(
+            get_user_model().objects.using(using).select_for_update()
+            .filter(pk__in=user_ids).order_by('pk').values_list('pk', flat=True)
+        )
+
+
+def get_tasks_version(user_id=None):
+    """Return the version of a user's tasks, or of all tasks: the sequence
+    number of their last change, read with one index lookup.
+
+    Unlike a stamp in a process-local cache, every worker sees it move
+    as soon as the write commits.
+    """
+    changes = TaskChange.objects.all()
+    if user_id is not None:
+        changes = changes.filter(user_id=user_id)
+    return changes.aggregate(version=Max('seq'))['version'] or 0
+
+
+def read_changes(changes, tasks, since, limit, encoder):
+    """Return a page of the changes after since.
+
+    Only the last change of each task counts. Tasks changed but no longer
+    in the tasks queryset are reported as deleted, the others are encoded
+    as they are now. ``next`` is the since of the following page.
+    """
+    page = list(
+        changes.filter(seq__gt=since).order_by('seq')
+        .values_list('seq', 'task_id', 'deleted')[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    latest = {}
+    for seq, task_id, deleted in page:
+        latest.pop(task_id, None)
+        latest[task_id] = deleted
+    changed = [task_id for task_id, deleted in latest.items() if not deleted]
+
+    rows = {}
+    if changed:
+        rows = {
+            row.task_id: row for row in tasks.filter(task_id__in=changed)
+            .order_by().values_list(*encoder.query_fields, named=True)
+        }
+    return {
+        'updated': encoder.encode(
+            rows[task_id] for task_id in changed if task_id in rows
+        ),
+        'deleted': [
+            task_id for task_id, deleted in latest.items()
+            if deleted or task_id not in rows
+        ],
+        'next': page[-1][0] if page else since,
+        'has_more': has_more,
+    }
@@ -0,0 +1,140 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from tasks.changes import get_tasks_version
+from tasks.filters import expanded_relations
+
+
+def make_etag(user_id, serializer_class, full_path, *parts):
+    """Return a quoted ETag for a user's view of a path, plus extra parts"""
+    parts = (user_id, serializer_class.__name__, full_path) + parts
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def task_etag(task, user_id, serializer_class, full_path):
+    """Return the ETag and Last-Modified timestamp of a task"""
+    etag = make_etag(
+        user_id,
+        serializer_class,
+        full_path,
+        task.pk,
+        task.user_id,
+        task.modified_at.isoformat()
+    )
+    return etag, timegm(task.modified_at.utctimetuple())
+
+
+def list_etag(user, serializer_class, full_path):
+    """Return the ETag of a list of the tasks the user can see, made from
+    their version"""
+    version = get_tasks_version(None if user.is_superuser else user.id)
+    return make_etag(user.id, serializer_class, full_path, version)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add the cache validators to a 200 or 304 response"""
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag, last_modified, get_response):
+    """Return 304 if the client is up to date, else ``get_response()``"""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = get_response()
+    return set_validators(response, etag, last_modified)
+
+
+def cached_list_data(etag, get_data):
+    """Return the data of a list, from the response cache if enabled"""
+    timeout = settings.TASK_RESPONSE_CACHE_TIMEOUT
+    if not timeout:
+        return get_data()
+
+    key = 'tasks:response:%s' % etag.strip('"')
+    data = cache.get(key)
+    if data is None:
+        data = get_data()
+        cache.set(key, data, timeout)
+    return data
+
+
+def list_response(request, user, serializer_class, get_data, make_response):
+    """Return the response of a task list, or 304 Not Modified.
+
+    Shared by TaskViewSet and the async views: ``get_data()`` returns the
+    list data and ``make_response(data)`` renders it.
+    """
+    if expanded_relations(request.GET):
+        return make_response(get_data())
+    etag = list_etag(user, serializer_class, request.get_full_path())
+    return conditional_response(
+        request,
+        etag,
+        None,
+        lambda: make_response(cached_list_data(etag, get_data))
+    )
+
+
+def detail_response(request, user, task, serializer_class, get_data,
+                    make_response):
+    """Return the response of a task, or 304 Not Modified"""
+    if expanded_relations(request.GET):
+        return make_response(get_data())
+    etag, last_modified = task_etag(
+        task, user.id, serializer_class, request.get_full_path()
+    )
+    return conditional_response(
+        request, etag, last_modified, lambda: make_response(get_data())
+    )
+
+
+class ConditionalTaskMixin:
+    """ETag and Last-Modified support for the task list and detail views.
+
+    The list ETag comes from the version of the user's tasks in the change
+    feed, so an unchanged list is answered with 304 Not Modified before any
+    task is queried. Lists have no Last-Modified: a date, to the second,
+    would miss a write in the same second as the last one. Detail
+    validators come from the task's modified_at. When
+    TASK_RESPONSE_CACHE_TIMEOUT is set, list bodies are also cached under
+    their ETag, which changes whenever the user's tasks are written.
+
+    Responses expanding a relation get no validators and aren't cached:
+    the related rows change without the tasks, so a renamed user would
+    still match the ETag of the tasks.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return list_response(
+            request,
+            request.user,
+            self.get_serializer_class(),
+            lambda: super(ConditionalTaskMixin, self).list(
+                request, *args, **kwargs
+            ).data,
+            Response
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return detail_response(
+            request,
+            request.user,
+            instance,
+            self.get_serializer_class(),
+            lambda: self.get_serializer(instance).data,
+            Response
+        )
@@ -0,0 +1,71 @@
+"""Delete tasks without Django's collector.
+
+The model signals of Task make the collector load every task it deletes
+and send a signal per row. ``delete_tasks`` deletes a set of tasks with
+one statement instead, and ``delete_user_tasks`` the tasks of a user in
+bounded batches.
+
+Deleting a user makes the collector load every task of the user into
+memory and delete them in one long transaction. Their tasks are deleted
+beforehand instead, by ranges of TASK_BULK_BATCH_SIZE ids, each in a
+transaction of its own, so neither memory nor lock time grows with the
+number of tasks.
+
+Django 3.1 has no database level ON DELETE CASCADE, so both use raw
+deletes, which skip the collector and the model signals; the change feed
+is updated here instead.
+"""
+from django.conf import settings
+from django.db import router, transaction
+
+from core.models import Task
+from tasks.changes import batch_changes, record_task_changes
+
+
+def delete_tasks(queryset):
+    """Delete the tasks of a queryset with one statement, return the ids
+    of the deleted tasks"""
+    using = router.db_for_write(Task)
+    rows = list(
+        queryset.using(using).order_by().values_list('task_id', 'user_id')
+    )
+    if not rows:
+        return []
+    task_ids = [task_id for task_id, _ in rows]
+    Task.objects.using(using).filter(task_id__in=task_ids)._raw_delete(using)
+    record_task_changes(
+        [Task(task_id=task_id, user_id=user_id) for task_id, user_id in rows],
+        deleted=True
+    )
+    return task_ids
+
+
+def delete_user_tasks(user_id):
+    """Delete every task of a user a batch at a time, return how many"""
+    batch_size = settings.TASK_BULK_BATCH_SIZE
+    using = router.db_for_write(Task)
+    deleted = 0
+    last_id = 0
+    while True:
+        with transaction.atomic(using=using), batch_changes():
+            task_ids = list(
+                Task.objects.using(using)
+                .filter(user_id=user_id, task_id__gt=last_id)
+                .order_by('task_id')
+                .values_list('task_id', flat=True)[:batch_size]
+            )
+            if not task_ids:
+                break
+            Task.objects.using(using).filter(
+                user_id=user_id,
+                task_id__gt=last_id,
+                task_id__lte=task_ids[-1]
+            )._raw_delete(using)
+            record_task_changes(
+                [Task(task_id=task_id, user_id=user_id) for task_id in task_ids],
+                deleted=True
+            )
+        last_id = task_ids[-1]
+        deleted += len(task_ids)
+
+    return deleted
@@ -0,0 +1,216 @@
+"""Publish and subscribe to task events, pushed to clients by tasks.streaming.
+
+Each write to a task is published, once its transaction commits, as a
+``created``, ``updated`` or ``deleted`` event on the channel of its owner
+and on the channel of everyone, which superusers follow. The events only
+name the task: clients fetch the task itself from the change feed. The
+events of a transaction go out together, as one message per channel
+listing them, so a bulk write costs a message per owner rather than two
+per task.
+
+Subscribers are the streams open in this process, fanned out to by the
+EventHub. The backend set by TASK_EVENTS_BACKEND carries the events to
+the hubs: LocalEventBackend delivers them to this process only, enough
+for a single process and for the tests. Set TASK_EVENTS_REDIS_URL to go
+through Redis pub/sub and reach the streams of every process.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+ALL_TASKS = 'all'
+
+
+def user_channel(user_id):
+    return 'user:%s' % user_id
+
+
+class Subscription:
+    """Queue of the events for one stream, on the stream's event loop"""
+
+    def __init__(self, hub, channel, queue_size):
+        self.hub = hub
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        # set when events had to be dropped; the stream should end so the
+        # client resyncs from the change feed
+        self.overflowed = False
+
+    def put(self, messages):
+        for message in messages:
+            try:
+                self.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventHub:
+    """Fan events out to the subscriptions of this process"""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Subscribe the running event loop to a channel"""
+        subscription = Subscription(
+            self, channel, settings.TASK_EVENTS_QUEUE_SIZE
+        )
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def deliver(self, channel, messages):
+        """Queue messages for the subscriptions of a channel, from any
+        thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.put, messages
+                )
+            except RuntimeError:
+                # the loop of the stream is closed
+                self.unsubscribe(subscription)
+
+
+hub = EventHub()
+
+
+class LocalEventBackend:
+    """Deliver events to the streams of this process only"""
+
+    def publish(self, batches):
+        for channel, messages in batches.items():
+            hub.deliver(channel, messages)
+
+    def start(self):
+        pass
+
+
+class RedisEventBackend:
+    """Carry events through Redis pub/sub to the streams of every process.
+    Requires the redis package."""
+
+    channel_prefix = 'task-events:'
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImproperlyConfigured(
+                    'RedisEventBackend requires the redis package'
+                )
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, batches):
+        """Publish the messages of each channel as one JSON list, in a
+        single round trip"""
+        pipeline = self.client.pipeline(transaction=False)
+        for channel, messages in batches.items():
+            pipeline.publish(self.channel_prefix + channel, json.dumps(messages))
+        pipeline.execute()
+
+    def start(self):
+        """Start relaying the events of Redis to the hub, unless it runs"""
+        with self._lock:
+            # the relay stops if the connection to Redis is lost
+            if self._thread is None or not self._thread.is_alive():
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.channel_prefix + '*')
+                self._thread = threading.Thread(
+                    target=self.relay, args=(pubsub,), daemon=True
+                )
+                self._thread.start()
+
+    def relay(self, pubsub):
+        for message in pubsub.listen():
+            channel = message['channel']
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            hub.deliver(
+                channel[len(self.channel_prefix):], json.loads(message['data'])
+            )
+
+
+_backend = None
+
+
+def get_event_backend():
+    """Return the backend configured by TASK_EVENTS_BACKEND"""
+    global _backend
+    if _backend is None:
+        backend_class = import_string(settings.TASK_EVENTS_BACKEND)
+        _backend = backend_class(**settings.TASK_EVENTS_BACKEND_OPTIONS)
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_event_backend(*, setting, **kwargs):
+    global _backend
+    if setting in ('TASK_EVENTS_BACKEND', 'TASK_EVENTS_BACKEND_OPTIONS'):
+        _backend = None
+
+
+def subscribe(user):
+    """Subscribe to the events of the tasks the user can see"""
+    get_event_backend().start()
+    if user.is_superuser:
+        return hub.subscribe(ALL_TASKS)
+    return hub.subscribe(user_channel(user.pk))
+
+
+def publish_task_events(events):
+    """Publish ``(event, task_id, user_id)`` events, with one message per
+    channel.
+
+    Runs after the writes are committed, so a failure is only logged:
+    clients catch up on missed events from the change feed.
+    """
+    batches = defaultdict(list)
+    for event, task_id, user_id in events:
+        message = {'event': event, 'task_id': task_id, 'user': user_id}
+        batches[user_channel(user_id)].append(message)
+        batches[ALL_TASKS].append(message)
+    try:
+        get_event_backend().publish(batches)
+    except Exception:
+        logger.exception('Publishing task events failed')
@@ -0,0 +1,132 @@
+from rest_framework.exceptions import ValidationError
+
+from core.models import Task
+from core.search import search_tasks
+
+
+TASK_STATUSES = [choice for choice, label in Task.TASK_CHOICES]
+# Fields rendered by the task serializers, in their order
+TASK_FIELDS = ['task_id', 'title', 'description', 'task_status', 'user']
+# Relations that can be inlined with ``?expand=``
+TASK_EXPANSIONS = ['user']
+# Query parameters read by filter_tasks
+FILTER_PARAMS = ['user', 'status', 'search']
+
+
+def parse_statuses(value):
+    """Parse a comma separated ``status`` parameter into task statuses"""
+    statuses = [status for status in value.split(',') if status]
+    invalid = [status for status in statuses if status not in TASK_STATUSES]
+    if invalid or not statuses:
+        raise ValidationError({'status': [
+            'Choose from: %s.' % ', '.join(TASK_STATUSES)
+        ]})
+    return statuses
+
+
+def parse_user_id(value):
+    """Parse the ``user`` parameter into a user id"""
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({'user': ['A valid integer is required.']})
+
+
+def parse_sequence(value):
+    """Parse the ``since`` parameter into a change sequence number"""
+    try:
+        since = int(value)
+    except ValueError:
+        since = -1
+    if since < 0:
+        raise ValidationError({'since': [
+            'A valid non-negative integer is required.'
+        ]})
+    return since
+
+
+def parse_fields(value):
+    """Parse a comma separated ``fields`` parameter into task fields"""
+    fields = {field for field in value.split(',') if field}
+    if not fields or not fields.issubset(TASK_FIELDS):
+        raise ValidationError({'fields': [
+            'Choose from: %s.' % ', '.join(TASK_FIELDS)
+        ]})
+    return [field for field in TASK_FIELDS if field in fields]
+
+
+def requested_fields(params):
+    """Return the fields asked for with ``?fields=``, or None for all"""
+    if not params.get('fields'):
+        return None
+    return parse_fields(params['fields'])
+
+
+def requested_expansions(params):
+    """Return the relations asked to be inlined with ``?expand=``"""
+    if not params.get('expand'):
+        return []
+    expansions = {name for name in params['expand'].split(',') if name}
+    if not expansions.issubset(TASK_EXPANSIONS):
+        raise ValidationError({'expand': [
+            'Choose from: %s.' % ', '.join(TASK_EXPANSIONS)
+        ]})
+    return [name for name in TASK_EXPANSIONS if name in expansions]
+
+
+def expanded_relations(params):
+    """Return the relations rendered inline: those asked for with
+    ``?expand=`` that are among the requested fields"""
+    fields = requested_fields(params)
+    return [
+        name for name in requested_expansions(params)
+        if fields is None or name in fields
+    ]
+
+
+def expand_tasks(queryset, params):
+    """Join the expanded relations so they aren't queried per task"""
+    related = expanded_relations(params)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset
+
+
+def only_requested_fields(queryset, params):
+    """Load only the columns of the requested fields.
+
+    modified_at and user are always loaded as the ETag of a task is made
+    from them.
+    """
+    fields = requested_fields(params)
+    if fields is None:
+        return queryset
+    return queryset.only('modified_at', 'user', *fields)
+
+
+def filter_tasks(queryset, params, user):
+    """Restrict a task queryset to what the user may see and asked for.
+
+    Regular users only ever see their own tasks. Superusers see every task
+    and may narrow the list down to one user with ``?user=<id>``. Anyone
+    can filter on ``?status=A`` or several statuses with ``?status=A,P``.
+    The filters line up with the (user_id, task_status, task_id) index.
+    ``?search=`` keeps the tasks whose title or description contain every
+    word, ranked by relevance unless the list is paginated.
+    """
+    if not user.is_superuser:
+        queryset = queryset.filter(user=user)
+    elif 'user' in params:
+        queryset = queryset.filter(user_id=parse_user_id(params['user']))
+
+    if 'status' in params:
+        statuses = parse_statuses(params['status'])
+        if len(statuses) == 1:
+            queryset = queryset.filter(task_status=statuses[0])
+        else:
+            queryset = queryset.filter(task_status__in=statuses)
+
+    if params.get('search'):
+        queryset = search_tasks(queryset, params['search'])
+
+    return queryset
@@ -0,0 +1,86 @@
+"""Background jobs of the task API, see core.jobs"""
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from core.jobs import job
+from core.models import Task
+from tasks.changes import batch_changes, record_task_changes
+from tasks.deletion import delete_user_tasks
+from tasks.encoders import EXPORT_FIELDS, stream_export
+from tasks.filters import filter_tasks
+
+
+@job('tasks.reassign')
+def reassign_tasks(from_user, to_user):
+    """Move every task of a user to another, a batch at a time"""
+    batch_size = settings.TASK_BULK_BATCH_SIZE
+    moved = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.select_for_update()
+                .filter(user_id=from_user, task_id__gt=last_id)
+                .order_by('task_id').only('task_id', 'user')[:batch_size]
+            )
+            if not tasks:
+                break
+            task_ids = [task.task_id for task in tasks]
+            Task.objects.filter(task_id__in=task_ids).update(
+                user_id=to_user, modified_at=timezone.now()
+            )
+            for task in tasks:
+                task.user_id = to_user
+            record_task_changes(tasks)
+        last_id = task_ids[-1]
+        moved += len(tasks)
+
+    return {'moved': moved}
+
+
+@job('tasks.export')
+def export_tasks(user_id, params, output):
+    """Write the tasks the user would export to a file in the storage"""
+    user = get_user_model().objects.get(pk=user_id)
+    rows = filter_tasks(
+        Task.objects.order_by('-task_id'), params, user
+    ).values_list(*EXPORT_FIELDS).iterator(
+        chunk_size=settings.TASK_EXPORT_CHUNK_SIZE
+    )
+    chunks, content_type = stream_export(rows, output)
+
+    with tempfile.TemporaryFile() as export_file:
+        for chunk in chunks:
+            export_file.write(chunk)
+        size = export_file.tell()
+        export_file.seek(0)
+        name = default_storage.save(
+            'exports/tasks-%s.%s' % (uuid.uuid4().hex, output),
+            File(export_file)
+        )
+    return {
+        'file': name,
+        'content_type': content_type,
+        'filename': 'tasks.%s' % output,
+        'size': size,
+    }
+
+
+@job('users.delete')
+def delete_user(user_id):
+    """Delete a user along with their tasks, deleted in batches first"""
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None:
+        return {'deleted': False}
+    tasks = delete_user_tasks(user.pk)
+    # catches the tasks created since
+    with transaction.atomic(), batch_changes():
+        user.delete()
+    return {'deleted': True, 'tasks': tasks}
@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """Keyset pagination of tasks ordered on the task_id primary key.
+
+    Pagination is opt-in: it only kicks in when the client sends a
+    ``cursor`` or ``page_size`` query parameter, otherwise the list is
+    returned unpaginated as before.
+    """
+    ordering = '-task_id'
+    page_size_query_param = 'page_size'
+
+    def is_requested(self, request):
+        """Return True if the client asked for a paginated response"""
+        params = request.query_params
+        return (
+            self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped at TASK_MAX_PAGE_SIZE"""
+        self.page_size = settings.TASK_PAGE_SIZE
+        self.max_page_size = settings.TASK_MAX_PAGE_SIZE
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
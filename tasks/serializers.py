@@ -1,16 +1,199 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
 from rest_framework import serializers
 from rest_framework.fields import ReadOnlyField
-from core.models import Task
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from core.models import Job, Task
+from tasks.changes import record_task_changes
+from tasks.filters import requested_expansions, requested_fields
+
+
+class BulkTaskListSerializer(serializers.ListSerializer):
+    """Validate a batch of tasks and write it with bulk queries.
+
+    When updating, ``instance`` holds the tasks the items may refer to and
+    every item is matched to its task through ``task_id``. Validation
+    errors are reported per item, in the order of the payload.
+    """
+    default_error_messages = {
+        'too_many': _('Ensure this list has no more than {max_items} items.'),
+        'not_found': _('Task not found.'),
+        'duplicate': _('Task appears more than once in this batch.'),
+    }
+
+    @staticmethod
+    def get_task_id(item):
+        """Return the task_id of a raw payload item, or None"""
+        try:
+            return int(item['task_id'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        max_items = settings.TASK_BULK_MAX_ITEMS
+        if len(data) > max_items:
+            message = self.error_messages['too_many'].format(
+                max_items=max_items
+            )
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='too_many')
+
+        tasks = None
+        if self.instance is not None:
+            tasks = {task.task_id: task for task in self.instance}
+
+        ret = []
+        errors = []
+        seen = set()
+        self.matched_tasks = []
+
+        for item in data:
+            if tasks is not None:
+                task_id = self.get_task_id(item)
+                if task_id not in tasks:
+                    errors.append({'task_id': [self.error_messages['not_found']]})
+                    continue
+                if task_id in seen:
+                    errors.append({'task_id': [self.error_messages['duplicate']]})
+                    continue
+                seen.add(task_id)
+                self.child.instance = tasks[task_id]
+
+            try:
+                validated = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append(exc.detail)
+            else:
+                ret.append(validated)
+                self.matched_tasks.append(self.child.instance)
+                errors.append({})
+        self.child.instance = None
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return ret
+
+    def create(self, validated_data):
+        """Insert the tasks with bulk_create and return them"""
+        tasks = [Task(**attrs) for attrs in validated_data]
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Without RETURNING the generated task_ids would be lost
+            for task in tasks:
+                task.save(force_insert=True)
+            return tasks
+        Task.objects.bulk_create(
+            tasks, batch_size=settings.TASK_BULK_BATCH_SIZE
+        )
+        record_task_changes(tasks, created=True)
+        return tasks
+
+    def update(self, instance, validated_data):
+        """Apply the changes to the matched tasks with bulk_update"""
+        fields = set()
+        for task, attrs in zip(self.matched_tasks, validated_data):
+            for attr, value in attrs.items():
+                setattr(task, attr, value)
+            fields.update(attrs)
+        fields.discard('task_id')
+
+        if fields:
+            # bulk_update doesn't apply auto_now, so stamp the rows here
+            now = timezone.now()
+            for task in self.matched_tasks:
+                task.modified_at = now
+            fields.add('modified_at')
+            Task.objects.bulk_update(
+                self.matched_tasks,
+                sorted(fields),
+                batch_size=settings.TASK_BULK_BATCH_SIZE
+            )
+            record_task_changes(self.matched_tasks)
+        return self.matched_tasks
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    """Validate the ids of the tasks to delete in bulk"""
+    task_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+
+
+class ReassignSerializer(serializers.Serializer):
+    """Validate the users of a reassignment of every task"""
+    from_user = serializers.PrimaryKeyRelatedField(
+        queryset=get_user_model().objects.all()
+    )
+    to_user = serializers.PrimaryKeyRelatedField(
+        queryset=get_user_model().objects.all()
+    )
+
+    def validate(self, attrs):
+        if attrs['from_user'] == attrs['to_user']:
+            raise serializers.ValidationError(
+                _('The tasks already belong to this user.')
+            )
+        return attrs
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serialize the status of a background job"""
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'kind', 'status', 'attempts', 'max_attempts', 'created_at',
+            'started_at', 'finished_at', 'result'
+        )
+        read_only_fields = fields
+
+
+class TaskUserSerializer(serializers.ModelSerializer):
+    """Serialize the user of a task inlined with ``?expand=user``"""
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'email', 'first_name', 'last_name')
+        read_only_fields = fields
+
+
+class SparseFieldsMixin:
+    """Render only the fields asked for with ``?fields=`` on reads, and
+    inline the relations asked for with ``?expand=``"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        if 'user' in requested_expansions(request.query_params):
+            fields['user'] = TaskUserSerializer(read_only=True)
+
+        names = requested_fields(request.query_params)
+        if names is None:
+            return fields
+        return OrderedDict((name, fields[name]) for name in names)
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serialize a Task"""
     class Meta:
         model = Task
         fields = (
             'task_id', 'title', 'description', 'task_status', 'user'
         )
-        read_only_fields = ('user',)
+        read_only_fields = ('task_id', 'user')
+        list_serializer_class = BulkTaskListSerializer
 
     def create(self, validated_data):
         """Create a new task and return it"""
@@ -22,13 +205,15 @@ class TaskSerializer(serializers.ModelSerializer):
         return task
 
 
-class AdminTaskSerializer(serializers.ModelSerializer):
+class AdminTaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serialize a Task by admin"""
     class Meta:
         model = Task
         fields = [
             'task_id', 'title', 'description', 'task_status', 'user'
         ]
+        read_only_fields = ('task_id',)
+        list_serializer_class = BulkTaskListSerializer
 
     def create(self, validated_data):
         """Create a new task and return it"""
@@ -0,0 +1,314 @@
+"""ASGI endpoint pushing task events to clients, instead of them polling.
+
+``GET /api/task/events/`` streams the events of the user's tasks (see
+tasks.events) as server-sent events::
+
+    event: updated
+    data: {"event":"updated","task_id":42,"user":7}
+
+A WebSocket opened on the same path receives the same events as JSON text
+messages. Both authenticate with the usual ``Authorization: Bearer``
+header carrying an access token. EventSource and WebSocket clients can't
+set headers, so they get a short-lived stream token from
+``POST /api/task/events/token/`` and pass it as ``?token=``, or as the
+``bearer, <token>`` WebSocket subprotocols.
+
+Streams end when the access token expires, when the user is deactivated
+or gains or loses superuser status (checked at every keep-alive), or when
+they fall too far behind. Clients reconnect and catch up from the change
+feed. A user may keep TASK_EVENTS_MAX_STREAMS streams open per process.
+
+Django 3.1 can't stream a response from async code, so the endpoint is
+an ASGI application wrapping Django's, see task_project.asgi.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework import exceptions, status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from authentication.tokens import StreamToken
+from tasks.async_views import database_sync_to_async, error_response
+from tasks.events import subscribe
+
+
+EVENTS_PATH = '/api/task/events/'
+# milliseconds browsers wait before reconnecting a closed event stream
+RECONNECT_DELAY = 5000
+# WebSocket subprotocol announcing a stream token as the next subprotocol
+TOKEN_SUBPROTOCOL = 'bearer'
+# WebSocket close code of a stream that fell behind: try again later
+CLOSE_OVERFLOWED = 1013
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_TOO_MANY_STREAMS = 4429
+
+# Why relay() ended a stream
+DISCONNECTED = 'disconnected'
+OVERFLOWED = 'overflowed'
+EXPIRED = 'expired'
+REVOKED = 'revoked'
+
+
+def encode_event(message):
+    return json.dumps(message, separators=(',', ':'))
+
+
+def get_header(scope, name):
+    """Return the value of a request header, None if missing"""
+    for key, value in scope['headers']:
+        if key == name:
+            return value
+    return None
+
+
+def get_stream_token(scope):
+    """Return the stream token passed in the query string or as WebSocket
+    subprotocols, None if there is none"""
+    query = parse_qs(scope.get('query_string', b'').decode('latin1'))
+    if query.get('token'):
+        return query['token'][0]
+    subprotocols = scope.get('subprotocols') or []
+    if TOKEN_SUBPROTOCOL in subprotocols[:-1]:
+        return subprotocols[subprotocols.index(TOKEN_SUBPROTOCOL) + 1]
+    return None
+
+
+def get_active_user(user_id):
+    return get_user_model()._default_manager.filter(
+        pk=user_id, is_active=True
+    ).first()
+
+
+class StreamCounter:
+    """Count the streams each user has open in this process"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, user_id):
+        """Count a stream while it is open, raising Throttled if the user
+        already has TASK_EVENTS_MAX_STREAMS open"""
+        with self._lock:
+            if self._counts[user_id] >= settings.TASK_EVENTS_MAX_STREAMS:
+                raise exceptions.Throttled(
+                    detail='Too many open event streams.'
+                )
+            self._counts[user_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._counts[user_id] -= 1
+                if not self._counts[user_id]:
+                    del self._counts[user_id]
+
+
+streams = StreamCounter()
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] in ('http.disconnect', 'websocket.disconnect'):
+            return
+
+
+async def relay(subscription, receive, write, expires_at, still_allowed):
+    """Write the events of a subscription until the stream ends, and
+    return why: DISCONNECTED, OVERFLOWED, EXPIRED or REVOKED.
+
+    The stream expires at the ``expires_at`` timestamp. After
+    TASK_EVENTS_KEEPALIVE idle seconds, ``still_allowed()`` is awaited and
+    ``write`` is called with None if it is true.
+    """
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        while not subscription.overflowed:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                return EXPIRED
+            event = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {event, disconnect},
+                timeout=min(settings.TASK_EVENTS_KEEPALIVE, remaining),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if event not in done:
+                event.cancel()
+            if disconnect in done:
+                return DISCONNECTED
+            if event in done:
+                await write(event.result())
+            elif time.time() < expires_at:
+                if not await still_allowed():
+                    return REVOKED
+                await write(None)
+        return OVERFLOWED
+    finally:
+        disconnect.cancel()
+
+
+class TaskEventsMiddleware:
+    """Serve the task event streams, and pass the rest to the application"""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] in ('http', 'websocket') and scope['path'] == EVENTS_PATH:
+            if scope['type'] == 'http':
+                await self.stream(scope, receive, send)
+            else:
+                await self.websocket(scope, receive, send)
+        else:
+            await self.application(scope, receive, send)
+
+    async def authenticate(self, scope, authenticator):
+        """Return the user of the stream and when the stream must end.
+
+        The user is loaded from the database rather than from the token
+        claims, which may be out of date on a reconnect.
+        """
+        raw_token = get_stream_token(scope)
+        if raw_token is not None:
+            try:
+                token = StreamToken(raw_token)
+            except TokenError as exc:
+                raise InvalidToken(exc.args[0])
+            expires_at = token.get_session_exp()
+        else:
+            header = get_header(scope, b'authorization')
+            raw_token = authenticator.get_raw_token(header) if header else None
+            if raw_token is None:
+                raise exceptions.NotAuthenticated()
+            token = authenticator.get_validated_token(raw_token)
+            expires_at = token['exp']
+
+        user = await database_sync_to_async(authenticator.get_user)(token)
+        return user, expires_at
+
+    def still_allowed(self, user):
+        """Return a coroutine function checking the user may still follow
+        the channel the stream subscribed to"""
+        async def check():
+            current = await database_sync_to_async(get_active_user)(user.pk)
+            return (
+                current is not None
+                and current.is_superuser == user.is_superuser
+            )
+        return check
+
+    async def stream(self, scope, receive, send):
+        """Send the events as server-sent events"""
+        authenticator = JWTAuthentication()
+        try:
+            if scope['method'] != 'GET':
+                raise exceptions.MethodNotAllowed(scope['method'])
+            user, expires_at = await self.authenticate(scope, authenticator)
+            with streams.open(user.pk), subscribe(user) as subscription:
+                await self.send_stream(
+                    receive, send, subscription, expires_at,
+                    self.still_allowed(user)
+                )
+        except exceptions.APIException as exc:
+            await self.send_response(send, error_response(exc, authenticator))
+
+    async def send_stream(self, receive, send, subscription, expires_at,
+                          still_allowed):
+        await send({
+            'type': 'http.response.start',
+            'status': status.HTTP_200_OK,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # stop proxies from buffering the stream
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await self.send_body(send, 'retry: %d\n\n' % RECONNECT_DELAY)
+
+        async def write(message):
+            if message is None:
+                chunk = ': keep-alive\n\n'
+            else:
+                chunk = 'event: %s\ndata: %s\n\n' % (
+                    message['event'], encode_event(message)
+                )
+            await self.send_body(send, chunk)
+
+        await relay(subscription, receive, write, expires_at, still_allowed)
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def websocket(self, scope, receive, send):
+        """Send the events as WebSocket text messages"""
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+        try:
+            user, expires_at = await self.authenticate(
+                scope, JWTAuthentication()
+            )
+        except exceptions.APIException:
+            await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+            return
+
+        try:
+            with streams.open(user.pk), subscribe(user) as subscription:
+                accept = {'type': 'websocket.accept'}
+                if TOKEN_SUBPROTOCOL in (scope.get('subprotocols') or []):
+                    # browsers drop connections not agreeing on one
+                    accept['subprotocol'] = TOKEN_SUBPROTOCOL
+                await send(accept)
+
+                async def write(message):
+                    if message is not None:
+                        await send({
+                            'type': 'websocket.send',
+                            'text': encode_event(message),
+                        })
+
+                reason = await relay(
+                    subscription, receive, write, expires_at,
+                    self.still_allowed(user)
+                )
+                if reason == OVERFLOWED:
+                    await send({
+                        'type': 'websocket.close', 'code': CLOSE_OVERFLOWED
+                    })
+                elif reason in (EXPIRED, REVOKED):
+                    await send({
+                        'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED
+                    })
+        except exceptions.Throttled:
+            await send({
+                'type': 'websocket.close', 'code': CLOSE_TOO_MANY_STREAMS
+            })
+
+    async def send_body(self, send, chunk):
+        await send({
+            'type': 'http.response.body',
+            'body': chunk.encode(),
+            'more_body': True,
+        })
+
+    async def send_response(self, send, response):
+        """Send a complete Django response"""
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in response.items()
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': response.content})
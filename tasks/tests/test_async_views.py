@@ -0,0 +1,198 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import add_user_claims
+from core.tests.utils import sample_task
+
+from tasks import async_views
+from tasks.serializers import TaskSerializer
+
+
+TASK_URL = '/api/task/tasks/'
+
+
+def bearer(user):
+    """Return an Authorization header value for the user"""
+    return 'Bearer %s' % add_user_claims(AccessToken.for_user(user), user)
+
+
+@override_settings(TASK_ASYNC_DB_THREAD_SENSITIVE=True)
+class AsyncTaskViewTests(TestCase):
+    """Test the native async task views"""
+
+    def setUp(self):
+        # the views take any HttpRequest; Django 3.1's AsyncRequestFactory
+        # mangles request headers
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        self.task = sample_task(self.user)
+        sample_task(self.other_user)
+
+    def authorize(self, request, user=None):
+        request.META['HTTP_AUTHORIZATION'] = bearer(user or self.user)
+        return request
+
+    async def test_required_auth(self):
+        """Test the authentication is required"""
+        res = await async_views.task_list(self.factory.get(TASK_URL))
+
+        self.assertEqual(res.status_code, 401)
+        self.assertIn('WWW-Authenticate', res)
+
+    async def test_list_tasks(self):
+        """Test listing returns the user's tasks like the sync view"""
+        request = self.authorize(self.factory.get(TASK_URL))
+
+        res = await async_views.task_list(request)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            json.loads(res.content), TaskSerializer([self.task], many=True).data
+        )
+
+    async def test_list_not_modified(self):
+        """Test the list ETag is honoured"""
+        res = await async_views.task_list(
+            self.authorize(self.factory.get(TASK_URL))
+        )
+
+        request = self.authorize(
+            self.factory.get(TASK_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        )
+        res = await async_views.task_list(request)
+
+        self.assertEqual(res.status_code, 304)
+
+    @override_settings(TASK_RESPONSE_CACHE_TIMEOUT=60)
+    def test_list_response_cache(self):
+        """Test list bodies are served from the response cache like in
+        the sync view"""
+        cache.clear()
+        list_tasks = async_to_sync(async_views.task_list)
+        first = list_tasks(self.authorize(self.factory.get(TASK_URL)))
+
+        # the version of the tasks
+        with self.assertNumQueries(1):
+            cached = list_tasks(self.authorize(self.factory.get(TASK_URL)))
+        self.assertEqual(cached.content, first.content)
+
+    async def test_options(self):
+        """Test OPTIONS is answered with the metadata of the viewset"""
+        res = await async_views.task_list(
+            self.authorize(self.factory.options(TASK_URL))
+        )
+        # rendered by Django's handler when served
+        res.render()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('application/json', json.loads(res.content)['renders'])
+
+    async def test_list_invalid_filter(self):
+        """Test filter errors are rendered as 400 responses"""
+        request = self.authorize(self.factory.get(TASK_URL, {'status': 'X'}))
+
+        res = await async_views.task_list(request)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('status', json.loads(res.content))
+
+    async def test_create_task(self):
+        """Test creating a task assigns it to the user"""
+        payload = {'title': 'Async task', 'description': 'Created async'}
+        request = self.authorize(self.factory.post(
+            TASK_URL, json.dumps(payload), content_type='application/json'
+        ))
+
+        res = await async_views.task_list(request)
+
+        self.assertEqual(res.status_code, 201)
+        data = json.loads(res.content)
+        self.assertEqual(data['user'], self.user.id)
+        self.assertEqual(data['title'], payload['title'])
+
+    async def test_retrieve_task(self):
+        """Test retrieving a task and not another user's"""
+        url = '%s%s/' % (TASK_URL, self.task.task_id)
+        res = await async_views.task_detail(
+            self.authorize(self.factory.get(url)), pk=self.task.task_id
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(json.loads(res.content)['task_id'], self.task.task_id)
+
+        res = await async_views.task_detail(
+            self.authorize(self.factory.get(url), self.other_user),
+            pk=self.task.task_id
+        )
+        self.assertEqual(res.status_code, 404)
+
+    async def test_retrieve_ignores_filters(self):
+        """Test the list filter parameters don't apply to a task"""
+        url = '%s%s/' % (TASK_URL, self.task.task_id)
+        res = await async_views.task_detail(
+            self.authorize(self.factory.get(url, {'status': 'C'})),
+            pk=self.task.task_id
+        )
+
+        self.assertEqual(res.status_code, 200)
+
+
+    async def test_expanded_without_validators(self):
+        """Test responses expanding the user have no ETag"""
+        url = '%s%s/' % (TASK_URL, self.task.task_id)
+        res = await async_views.task_detail(
+            self.authorize(self.factory.get(url, {'expand': 'user'})),
+            pk=self.task.task_id
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('ETag', res)
+
+        res = await async_views.task_list(
+            self.authorize(self.factory.get(TASK_URL, {'expand': 'user'}))
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('ETag', res)
+
+@override_settings(
+    TASK_ASYNC_DB_THREAD_SENSITIVE=True,
+    THROTTLE_RATES={'tasks_read': '1/m'},
+    THROTTLE_STORE='core.throttling.LocMemThrottleStore',
+    THROTTLE_STORE_OPTIONS={},
+)
+class AsyncTaskViewThrottleTests(TestCase):
+    """Test the async task views apply the task throttles"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass', 'Test', 'User'
+        )
+
+    async def test_throttled(self):
+        """Test reads over the budget are refused"""
+        factory = RequestFactory()
+
+        responses = []
+        for _ in range(2):
+            request = factory.get(
+                TASK_URL, HTTP_AUTHORIZATION=bearer(self.user)
+            )
+            responses.append(await async_views.task_list(request))
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[1].status_code, 429)
+        self.assertEqual(responses[1]['Retry-After'], '60')
@@ -0,0 +1,164 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests.utils import sample_task
+
+
+BULK_URL = reverse('task:task-bulk')
+
+
+class BulkTaskApiTests(TestCase):
+    """Test the bulk create/update/delete endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        """Test creating many tasks assigns them to the user"""
+        payload = [
+            {'title': 'Task %s' % i, 'description': 'Bulk'}
+            for i in range(1, 4)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 3)
+        tasks = Task.objects.filter(user=self.user)
+        self.assertEqual(tasks.count(), 3)
+        self.assertEqual(
+            sorted(task['task_id'] for task in res.data),
+            sorted(tasks.values_list('task_id', flat=True))
+        )
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test invalid items are reported by position and nothing is saved"""
+        payload = [
+            {'title': 'Valid', 'description': 'Bulk'},
+            {'description': 'Missing title'},
+            {'title': 'Bad status', 'description': 'Bulk', 'task_status': 'X'},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('title', res.data[1])
+        self.assertIn('task_status', res.data[2])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASK_BULK_MAX_ITEMS=2)
+    def test_bulk_create_too_many_items(self):
+        """Test batches larger than the configured limit are rejected"""
+        payload = [
+            {'title': 'Task', 'description': 'Bulk'} for i in range(3)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_update(self):
+        """Test updating many tasks in one request"""
+        first = sample_task(self.user)
+        second = sample_task(self.user)
+        payload = [
+            {'task_id': first.task_id, 'task_status': 'C'},
+            {'task_id': second.task_id, 'title': 'Renamed', 'task_status': 'P'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        first.refresh_from_db()
+        self.assertEqual(first.task_status, 'C')
+        task = Task.objects.get(task_id=second.task_id)
+        self.assertEqual(task.title, 'Renamed')
+        self.assertEqual(task.task_status, 'P')
+
+    def test_bulk_update_other_users_task(self):
+        """Test tasks of other users cannot be updated in bulk"""
+        task = sample_task(self.user)
+        other_task = sample_task(self.other_user)
+        payload = [
+            {'task_id': task.task_id, 'task_status': 'C'},
+            {'task_id': other_task.task_id, 'task_status': 'C'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('task_id', res.data[1])
+        task.refresh_from_db()
+        self.assertEqual(task.task_status, 'A')
+
+    def test_bulk_update_duplicate_task(self):
+        """Test a task cannot be updated twice in the same batch"""
+        task = sample_task(self.user)
+        payload = [
+            {'task_id': task.task_id, 'task_status': 'C'},
+            {'task_id': task.task_id, 'task_status': 'P'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('task_id', res.data[1])
+
+    def test_bulk_delete(self):
+        """Test deleting many tasks and reporting the missing ones"""
+        task_ids = [sample_task(self.user).task_id for _ in range(2)]
+        other_id = sample_task(self.other_user).task_id
+        missing_id = other_id + 1
+
+        res = self.client.delete(
+            BULK_URL,
+            {'task_ids': task_ids + [other_id, missing_id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['deleted'], task_ids)
+        self.assertEqual(res.data['not_found'], [other_id, missing_id])
+        self.assertEqual(
+            list(Task.objects.values_list('task_id', flat=True)), [other_id]
+        )
+
+    def test_admin_bulk_assign(self):
+        """Test an admin can create tasks for other users in bulk"""
+        admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com',
+            'password123',
+            'admin',
+            'user'
+        )
+        self.client.force_authenticate(admin_user)
+        payload = [
+            {'title': 'A', 'description': 'Bulk', 'user': self.user.id},
+            {'title': 'B', 'description': 'Bulk', 'user': self.other_user.id},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.get(title='B').user, self.other_user)
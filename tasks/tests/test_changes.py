@@ -0,0 +1,308 @@
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import seeding
+from core.models import Task, TaskChange
+from core.tests.utils import sample_task
+from tasks.changes import FEED_LOCK_KEY, lock_feeds
+
+
+CHANGES_URL = reverse('task:task-changes')
+BULK_URL = reverse('task:task-bulk')
+
+
+def detail_url(task_id):
+    """Return task detail URL"""
+    return reverse('task:task-detail', args=[task_id])
+
+
+class TaskChangesTests(TestCase):
+    """Test syncing tasks through the change feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=0, **params):
+        res = self.client.get(CHANGES_URL, dict(params, since=since))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_initial_sync(self):
+        """Test syncing from 0 returns every task of the user"""
+        first = sample_task(self.user, title='First')
+        second = sample_task(self.user, title='Second')
+        sample_task(self.other_user)
+
+        data = self.sync()
+
+        self.assertEqual(
+            [task['task_id'] for task in data['updated']],
+            [first.task_id, second.task_id]
+        )
+        self.assertEqual(data['updated'][0]['title'], 'First')
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_incremental_sync(self):
+        """Test only the tasks changed since the last sync are returned"""
+        task = sample_task(self.user)
+        sample_task(self.user)
+        since = self.sync()['next']
+
+        task.title = 'Changed'
+        task.save()
+        data = self.sync(since)
+
+        self.assertEqual(
+            data['updated'], [{
+                'task_id': task.task_id,
+                'title': 'Changed',
+                'description': task.description,
+                'task_status': 'A',
+                'user': self.user.id,
+            }]
+        )
+        self.assertEqual(self.sync(data['next'])['updated'], [])
+
+    def test_sync_collapses_changes(self):
+        """Test a task changed several times is returned once"""
+        task = sample_task(self.user)
+        for title in ('One', 'Two'):
+            task.title = title
+            task.save()
+
+        data = self.sync()
+
+        self.assertEqual(len(data['updated']), 1)
+        self.assertEqual(data['updated'][0]['title'], 'Two')
+
+    def test_deleted_tombstone(self):
+        """Test deleted tasks are reported by id"""
+        task = sample_task(self.user)
+        since = self.sync()['next']
+        task_id = task.task_id
+        task.delete()
+
+        data = self.sync(since)
+
+        self.assertEqual(data['updated'], [])
+        self.assertEqual(data['deleted'], [task_id])
+
+    def test_reassigned_task(self):
+        """Test a task moved to another user is deleted from the feed of
+        its previous owner and added to the new one"""
+        task = sample_task(self.user)
+        since = self.sync()['next']
+        admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com', 'admin', 'user', 'password123'
+        )
+        self.client.force_authenticate(admin_user)
+        res = self.client.patch(
+            detail_url(task.task_id), {'user': self.other_user.id}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.sync(since, user=self.other_user.id)['updated'][0]['task_id'],
+            task.task_id
+        )
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.sync(since)['deleted'], [task.task_id])
+
+    def test_paged_sync(self):
+        """Test the changes are returned in pages"""
+        tasks = [sample_task(self.user) for _ in range(3)]
+
+        data = self.sync(page_size=2)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['updated']), 2)
+        data = self.sync(data['next'], page_size=2)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['updated'][0]['task_id'], tasks[2].task_id)
+
+    def test_sync_fields(self):
+        """Test the feed honours sparse fieldsets"""
+        task = sample_task(self.user)
+
+        data = self.sync(fields='task_id,title')
+
+        self.assertEqual(
+            data['updated'], [{'task_id': task.task_id, 'title': task.title}]
+        )
+
+    def test_sync_queries(self):
+        """Test a page of changes runs two queries"""
+        for _ in range(5):
+            sample_task(self.user)
+
+        with self.assertNumQueries(2):
+            self.sync()
+
+    def test_invalid_since(self):
+        """Test since must be a non-negative integer"""
+        for since in ('abc', '-1'):
+            res = self.client.get(CHANGES_URL, {'since': since})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('since', res.data)
+
+    def test_bulk_writes_recorded(self):
+        """Test bulk creates, updates and deletes reach the feed"""
+        res = self.client.post(BULK_URL, [
+            {'title': 'Bulk %d' % index, 'description': 'Bulk'}
+            for index in range(2)
+        ], format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        data = self.sync()
+        self.assertEqual(len(data['updated']), 2)
+        task_ids = [task['task_id'] for task in data['updated']]
+
+        res = self.client.patch(BULK_URL, [
+            {'task_id': task_ids[0], 'title': 'Changed'}
+        ], format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = self.sync(data['next'])
+        self.assertEqual(data['updated'][0]['title'], 'Changed')
+
+        res = self.client.delete(
+            BULK_URL, {'task_ids': task_ids}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(self.sync(data['next'])['deleted'], task_ids)
+
+    def test_bulk_delete_single_insert(self):
+        """Test the tombstones of a bulk delete are written at once"""
+        task_ids = [sample_task(self.user).task_id for _ in range(3)]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.delete(
+                BULK_URL, {'task_ids': task_ids}, format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT INTO "core_taskchange"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            TaskChange.objects.filter(deleted=True).count(), len(task_ids)
+        )
+
+    def test_seeded_tasks_recorded(self):
+        """Test tasks seeded in bulk reach the feed"""
+        seeding.create_tasks(seeding.generate_tasks([self.user.id], 3))
+
+        self.assertEqual(len(self.sync()['updated']), 3)
+        self.assertEqual(TaskChange.objects.count(), 3)
+
+
+@patch('tasks.changes.lock_feeds', side_effect=DatabaseError)
+class FeedWriteFailureTests(TestCase):
+    """Test a task isn't written when its change can't be recorded"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass', 'Test', 'User'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_create(self, lock_feeds):
+        """Test the task is rolled back along with its change"""
+        with self.assertRaises(DatabaseError):
+            self.client.post(
+                reverse('task:task-list'),
+                {'title': 'Task', 'description': 'Task'}
+            )
+
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(TaskChange.objects.exists())
+
+    def test_update(self, lock_feeds):
+        """Test the task is left as it was"""
+        lock_feeds.side_effect = None
+        task = sample_task(self.user)
+        lock_feeds.side_effect = DatabaseError
+
+        with self.assertRaises(DatabaseError):
+            self.client.patch(detail_url(task.task_id), {'title': 'Changed'})
+
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Sample task')
+
+    def test_delete(self, lock_feeds):
+        """Test the task is kept"""
+        lock_feeds.side_effect = None
+        task = sample_task(self.user)
+        lock_feeds.side_effect = DatabaseError
+
+        with self.assertRaises(DatabaseError):
+            self.client.delete(detail_url(task.task_id))
+
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL advisory locks')
+class FeedLockTests(TransactionTestCase):
+    """Test writers of a feed are serialized until they commit"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass', 'Test', 'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com', 'password123', 'other', 'user'
+        )
+
+    def try_lock(self, user_id):
+        """Try to take the lock of a feed from another connection"""
+        result = []
+
+        def run():
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT pg_try_advisory_xact_lock(%s, %s)',
+                        [FEED_LOCK_KEY, user_id]
+                    )
+                    result.append(cursor.fetchone()[0])
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_writers_of_a_user_serialized(self):
+        """Test the feed of a user stays locked until the writer commits,
+        while the feeds of other users are free"""
+        with transaction.atomic():
+            lock_feeds('default', {self.user.id})
+            self.assertFalse(self.try_lock(self.user.id))
+            self.assertTrue(self.try_lock(self.other_user.id))
+        self.assertTrue(self.try_lock(self.user.id))
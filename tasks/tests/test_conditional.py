@@ -0,0 +1,175 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.tests.utils import sample_task
+
+
+TASK_URL = reverse('task:task-list')
+
+
+def detail_url(task_id):
+    """Return task detail URL"""
+    return reverse('task:task-detail', args=[task_id])
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling of the task endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        self.task = sample_task(self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_list_not_modified(self):
+        """Test an unchanged list returns 304 without querying tasks"""
+        res = self.client.get(TASK_URL)
+        self.assertIn('ETag', res)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        # only the version of the tasks, from the change feed
+        self.assertEqual(len(queries), 1)
+        self.assertIn('core_taskchange', queries[0]['sql'])
+
+    def test_list_modified_after_write(self):
+        """Test writing a task changes the list ETag"""
+        res = self.client.get(TASK_URL)
+
+        sample_task(self.user, title='Another task')
+        res = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+
+    def test_list_modified_without_cache(self):
+        """Test the ETag moves when the write was made by another process,
+        whose cache this one doesn't see"""
+        res = self.client.get(TASK_URL)
+
+        sample_task(self.user, title='Another task')
+        cache.clear()
+        res = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_without_last_modified(self):
+        """Test lists only validate with their ETag, as a date would miss
+        a write in the same second"""
+        res = self.client.get(TASK_URL)
+        self.assertNotIn('Last-Modified', res)
+
+        sample_task(self.user, title='Another task')
+        res = self.client.get(
+            TASK_URL, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+
+    def test_list_unaffected_by_other_users(self):
+        """Test writes to another user's tasks keep the list ETag valid"""
+        res = self.client.get(TASK_URL)
+
+        sample_task(self.other_user)
+        res = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_depends_on_query(self):
+        """Test different query strings get different ETags"""
+        res = self.client.get(TASK_URL)
+        filtered = self.client.get(TASK_URL, {'status': 'A'})
+
+        self.assertNotEqual(res['ETag'], filtered['ETag'])
+
+    def test_detail_not_modified(self):
+        """Test an unchanged task returns 304 and a changed one 200"""
+        url = detail_url(self.task.task_id)
+        res = self.client.get(url)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(url, {'title': 'Changed'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Changed')
+
+    def test_detail_if_modified_since(self):
+        """Test Last-Modified is honoured through If-Modified-Since"""
+        url = detail_url(self.task.task_id)
+        res = self.client.get(url)
+
+        res = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_expanded_user_renamed(self):
+        """Test responses expanding the user have no validators, so a
+        renamed user is never answered with 304"""
+        for url in (TASK_URL, detail_url(self.task.task_id)):
+            res = self.client.get(url, {'expand': 'user'})
+            self.assertNotIn('ETag', res)
+            self.assertNotIn('Last-Modified', res)
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        res = self.client.get(
+            detail_url(self.task.task_id), {'expand': 'user'},
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['user']['first_name'], 'Renamed')
+
+    @override_settings(TASK_RESPONSE_CACHE_TIMEOUT=60)
+    def test_expanded_list_not_cached(self):
+        """Test list bodies expanding the user aren't cached"""
+        self.client.get(TASK_URL, {'expand': 'user'})
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        res = self.client.get(TASK_URL, {'expand': 'user'})
+
+        self.assertEqual(res.data[0]['user']['first_name'], 'Renamed')
+
+    @override_settings(TASK_RESPONSE_CACHE_TIMEOUT=60)
+    def test_list_response_cache(self):
+        """Test cached list bodies are served until the user writes"""
+        first = self.client.get(TASK_URL)
+
+        # the version of the tasks
+        with self.assertNumQueries(1):
+            cached = self.client.get(TASK_URL)
+        self.assertEqual(cached.data, first.data)
+
+        sample_task(self.user, title='Another task')
+        res = self.client.get(TASK_URL)
+        self.assertEqual(len(res.data), 2)
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests import utils
+
+from tasks.serializers import AdminTaskSerializer
+
+
+EXPORT_URL = reverse('task:task-export')
+
+
+def sample_task(user, **params):
+    """Create and return a sample task whose description needs quoting"""
+    params.setdefault('description', 'Django API, "quoted", with commas\nand newlines')
+    return utils.sample_task(user, **params)
+
+
+class TaskExportTests(TestCase):
+    """Test streaming exports of tasks"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com',
+            'password123',
+            'admin',
+            'user'
+        )
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.task = sample_task(self.user)
+        sample_task(self.admin_user, title='Ünïcode task')
+
+    def test_export_ndjson(self):
+        """Test NDJSON export matches the admin serializer output"""
+        self.client.force_authenticate(self.admin_user)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        body = b''.join(res.streaming_content).decode('utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        tasks = Task.objects.all().order_by('-task_id')
+        self.assertEqual(rows, AdminTaskSerializer(tasks, many=True).data)
+
+    def test_export_csv(self):
+        """Test CSV export has a header and round-trips the values"""
+        self.client.force_authenticate(self.admin_user)
+
+        res = self.client.get(EXPORT_URL, {'output': 'csv'})
+
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        body = b''.join(res.streaming_content).decode('utf-8')
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(
+            rows[0], ['task_id', 'title', 'description', 'task_status', 'user']
+        )
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][2], self.task.description)
+
+    def test_export_limited_to_user(self):
+        """Test a regular user only exports their own tasks"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(EXPORT_URL)
+
+        body = b''.join(res.streaming_content).decode('utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['task_id'] for row in rows], [self.task.task_id])
+
+    def test_export_invalid_format(self):
+        """Test an unknown export format is rejected"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(EXPORT_URL, {'output': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
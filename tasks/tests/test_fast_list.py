@@ -0,0 +1,129 @@
+import datetime
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests import utils
+
+from tasks import renderers
+from tasks.renderers import ORJSONRenderer
+from tasks.serializers import AdminTaskSerializer, TaskSerializer
+
+
+TASK_URL = reverse('task:task-list')
+
+
+def sample_task(user, **params):
+    """Create and return a sample task whose description needs escaping"""
+    params.setdefault('description', 'Line\u2028separated "quoted" ünicode \U0001f600')
+    return utils.sample_task(user, **params)
+
+
+class FastListTests(TestCase):
+    """Test the task list read path matches the serializers byte for byte"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com',
+            'password123',
+            'admin',
+            'user'
+        )
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        sample_task(self.user)
+        sample_task(self.user, title='Pending', task_status='P')
+        sample_task(self.admin_user, title='Admin task')
+
+    def expected(self, serializer_class, queryset):
+        return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+    def test_list_matches_serializer(self):
+        """Test the user's list is what TaskSerializer renders"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        tasks = Task.objects.filter(user=self.user).order_by('-task_id')
+        self.assertEqual(res.content, self.expected(TaskSerializer, tasks))
+
+    def test_admin_list_matches_serializer(self):
+        """Test the admin's list is what AdminTaskSerializer renders"""
+        self.client.force_authenticate(self.admin_user)
+
+        res = self.client.get(TASK_URL)
+
+        tasks = Task.objects.order_by('-task_id')
+        self.assertEqual(res.content, self.expected(AdminTaskSerializer, tasks))
+
+    def test_paginated_list_uses_rows(self):
+        """Test cursor pagination works on the encoded rows"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(TASK_URL, {'page_size': 1})
+        second = self.client.get(res.data['next'])
+
+        tasks = list(Task.objects.filter(user=self.user).order_by('-task_id'))
+        self.assertEqual(res.data['results'][0]['task_id'], tasks[0].task_id)
+        self.assertEqual(second.data['results'][0]['task_id'], tasks[1].task_id)
+
+    def test_list_queries_no_users(self):
+        """Test listing doesn't build instances that load related users"""
+        self.client.force_authenticate(self.user)
+
+        # the version of the tasks, then the tasks
+        with self.assertNumQueries(2):
+            self.client.get(TASK_URL, HTTP_ACCEPT='application/json')
+
+
+class ORJSONRendererTests(TestCase):
+    """Test the orjson renderer renders like JSONRenderer"""
+
+    data = {
+        'text': 'Line\u2028and\u2029paragraph ünicode \U0001f600 "quoted"',
+        'date': datetime.datetime(2021, 5, 1, 12, 30, 15, 123456),
+        'aware': datetime.datetime(2021, 5, 1, tzinfo=datetime.timezone.utc),
+        'nested': [{'id': 1, 'flag': True, 'none': None}],
+    }
+
+    def test_same_bytes(self):
+        """Test the output is identical to JSONRenderer's"""
+        self.assertEqual(
+            ORJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data)
+        )
+
+    def test_unsupported_falls_back(self):
+        """Test values orjson refuses are rendered by JSONRenderer"""
+        data = {'big': 2 ** 70, 1: 'int key'}
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indent_falls_back(self):
+        """Test indented output is left to JSONRenderer"""
+        context = {'indent': 2}
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, renderer_context=context),
+            JSONRenderer().render(self.data, renderer_context=context)
+        )
+
+    @skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_uses_orjson(self):
+        """Test orjson is used when installed"""
+        self.assertEqual(
+            ORJSONRenderer().render({'a': [1, 'b']}), b'{"a":[1,"b"]}'
+        )
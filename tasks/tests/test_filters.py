@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests.utils import sample_task
+
+
+TASK_URL = reverse('task:task-list')
+BULK_URL = reverse('task:task-bulk')
+
+
+def detail_url(task_id):
+    """Return task detail URL"""
+    return reverse('task:task-detail', args=[task_id])
+
+
+class TaskFilterTests(TestCase):
+    """Test filtering the task list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        self.assigned = sample_task(self.user, task_status='A')
+        self.pending = sample_task(self.user, task_status='P')
+        self.completed = sample_task(self.user, task_status='C')
+        self.other = sample_task(self.other_user, task_status='P')
+        self.client.force_authenticate(self.user)
+
+    def test_filter_by_status(self):
+        """Test only tasks with the requested status are returned"""
+        res = self.client.get(TASK_URL, {'status': 'P'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task['task_id'] for task in res.data], [self.pending.task_id]
+        )
+
+    def test_filter_by_several_statuses(self):
+        """Test a comma separated list of statuses is accepted"""
+        res = self.client.get(TASK_URL, {'status': 'A,P'})
+
+        self.assertEqual(
+            [task['task_id'] for task in res.data],
+            [self.pending.task_id, self.assigned.task_id]
+        )
+
+    def test_filter_invalid_status(self):
+        """Test an unknown status is rejected"""
+        res = self.client.get(TASK_URL, {'status': 'X'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_user_filter_ignored_for_regular_users(self):
+        """Test regular users cannot list another user's tasks"""
+        res = self.client.get(TASK_URL, {'user': self.other_user.id})
+
+        self.assertEqual(len(res.data), 3)
+        self.assertNotIn(
+            self.other.task_id, [task['task_id'] for task in res.data]
+        )
+
+    def test_admin_filter_by_user_and_status(self):
+        """Test a superuser can filter on user and status together"""
+        admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com',
+            'password123',
+            'admin',
+            'user'
+        )
+        self.client.force_authenticate(admin_user)
+
+        res = self.client.get(
+            TASK_URL, {'user': self.other_user.id, 'status': 'P'}
+        )
+
+        self.assertEqual(
+            [task['task_id'] for task in res.data], [self.other.task_id]
+        )
+
+    def test_detail_ignores_filters(self):
+        """Test the filter parameters don't hide a task from detail
+        requests"""
+        url = detail_url(self.assigned.task_id)
+
+        res = self.client.get(url, {'status': 'C'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.patch(url + '?status=C', {'title': 'Changed'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.delete(url + '?status=C')
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(
+            Task.objects.filter(task_id=self.assigned.task_id).exists()
+        )
+
+    def test_bulk_ignores_filters(self):
+        """Test bulk updates aren't narrowed down by the filter parameters"""
+        res = self.client.patch(
+            BULK_URL + '?status=C',
+            [{'task_id': self.assigned.task_id, 'title': 'Changed'}],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assigned.refresh_from_db()
+        self.assertEqual(self.assigned.title, 'Changed')
@@ -0,0 +1,223 @@
+import json
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Job, Task, TaskChange
+from core.tests.utils import sample_task
+from tasks.deletion import delete_user_tasks
+from tasks.jobs import delete_user
+
+
+EXPORT_URL = reverse('task:task-export')
+REASSIGN_URL = reverse('task:task-reassign')
+JOBS_URL = reverse('task:job-list')
+
+
+def job_url(job_id):
+    """Return job detail URL"""
+    return reverse('task:job-detail', args=[job_id])
+
+
+def download_url(job_id):
+    """Return job download URL"""
+    return reverse('task:job-download', args=[job_id])
+
+
+@override_settings(JOBS_EAGER=True)
+class TaskJobsTests(TestCase):
+    """Test the task operations run as background jobs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com',
+            'admin',
+            'user',
+            'password123'
+        )
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = self.settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def test_export_in_background(self):
+        """Test a POST exports the user's tasks to a file downloaded from
+        the job"""
+        self.client.force_authenticate(self.user)
+        sample_task(self.user, title='Mine', task_status='C')
+        sample_task(self.user, title='Active')
+        sample_task(self.other_user, title='Theirs', task_status='C')
+
+        res = self.client.post(EXPORT_URL + '?status=C')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res['Location'], job_url(res.data['id']))
+        self.assertEqual(res.data['status'], Job.succeeded)
+
+        res = self.client.get(download_url(res.data['id']))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('tasks.ndjson', res['Content-Disposition'])
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)['title'] for line in lines], ['Mine']
+        )
+
+    def test_export_in_background_invalid(self):
+        """Test invalid exports are rejected before queuing a job"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.post(EXPORT_URL + '?output=xml')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_EAGER=False)
+    def test_download_unfinished(self):
+        """Test there is nothing to download until the job succeeded"""
+        self.client.force_authenticate(self.user)
+        res = self.client.post(EXPORT_URL)
+
+        self.assertEqual(res.data['status'], Job.queued)
+        res = self.client.get(download_url(res.data['id']))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reassign(self):
+        """Test superusers move every task of a user to another"""
+        self.client.force_authenticate(self.admin_user)
+        tasks = [sample_task(self.user) for _ in range(3)]
+        kept = sample_task(self.other_user)
+
+        res = self.client.post(REASSIGN_URL, {
+            'from_user': self.user.id, 'to_user': self.other_user.id
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['result'], {'moved': 3})
+        self.assertEqual(
+            Task.objects.filter(user=self.other_user).count(), 4
+        )
+        tombstones = TaskChange.objects.filter(user=self.user, deleted=True)
+        self.assertCountEqual(
+            tombstones.values_list('task_id', flat=True),
+            [task.task_id for task in tasks]
+        )
+        self.assertEqual(
+            TaskChange.objects.filter(task_id=kept.task_id).count(), 1
+        )
+
+    def test_reassign_same_user(self):
+        """Test tasks can't be reassigned to their owner"""
+        self.client.force_authenticate(self.admin_user)
+
+        res = self.client.post(REASSIGN_URL, {
+            'from_user': self.user.id, 'to_user': self.user.id
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_reassign_forbidden(self):
+        """Test only superusers can reassign tasks"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.post(REASSIGN_URL, {
+            'from_user': self.other_user.id, 'to_user': self.user.id
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Job.objects.exists())
+
+    def test_jobs_limited_to_user(self):
+        """Test users only see their own jobs"""
+        self.client.force_authenticate(self.other_user)
+        self.client.post(EXPORT_URL)
+        self.client.force_authenticate(self.user)
+        own = self.client.post(EXPORT_URL).data['id']
+
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([job['id'] for job in res.data], [own])
+        other = Job.objects.exclude(pk=own).get()
+        res = self.client.get(job_url(other.pk))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class DeleteUserJobTests(TestCase):
+    """Test deleting users in the background"""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com', 'admin', 'user', 'password123'
+        )
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass', 'Test', 'User'
+        )
+        self.task_ids = [
+            sample_task(self.user).task_id for _ in range(3)
+        ]
+
+    def test_delete_user(self):
+        """Test the user is deleted along with their tasks, leaving
+        tombstones in the change feed"""
+        result = delete_user(self.user.pk)
+
+        self.assertEqual(result, {'deleted': True, 'tasks': 3})
+        self.assertFalse(
+            get_user_model().objects.filter(pk=self.user.pk).exists()
+        )
+        self.assertFalse(Task.objects.exists())
+        self.assertCountEqual(
+            TaskChange.objects.filter(deleted=True)
+            .values_list('task_id', flat=True),
+            self.task_ids
+        )
+
+    @override_settings(TASK_BULK_BATCH_SIZE=2)
+    def test_delete_user_tasks_in_batches(self):
+        """Test the tasks are deleted a batch at a time, leaving the tasks
+        of other users"""
+        kept = Task.objects.create(
+            user=self.admin_user, title='Task', description='Task'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(delete_user_tasks(self.user.pk), 3)
+
+        deletes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "core_task"')
+        ]
+        self.assertEqual(len(deletes), 2)
+        self.assertEqual(list(Task.objects.all()), [kept])
+        self.assertEqual(
+            TaskChange.objects.filter(deleted=True).count(), 3
+        )
+
+    def test_delete_missing_user(self):
+        """Test deleting a user already gone succeeds"""
+        self.assertEqual(delete_user(0), {'deleted': False})
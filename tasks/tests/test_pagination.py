@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.tests.utils import sample_task
+
+
+TASK_URL = reverse('task:task-list')
+
+
+class TaskPaginationTests(TestCase):
+    """Test keyset pagination of the task list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.client.force_authenticate(self.user)
+        tasks = [sample_task(self.user) for _ in range(5)]
+        # newest first, the order of the list
+        self.task_ids = [task.task_id for task in reversed(tasks)]
+
+    def test_list_unpaginated_by_default(self):
+        """Test the list is a plain array when no pagination is requested"""
+        res = self.client.get(TASK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 5)
+
+    def test_paginate_with_page_size(self):
+        """Test pages follow the task_id ordering and link to each other"""
+        res = self.client.get(TASK_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task['task_id'] for task in res.data['results']],
+            self.task_ids[:2]
+        )
+        self.assertIsNone(res.data['previous'])
+
+        seen = []
+        next_url = res.data['next']
+        while next_url:
+            page = self.client.get(next_url)
+            seen.extend(task['task_id'] for task in page.data['results'])
+            next_url = page.data['next']
+        self.assertEqual(seen, self.task_ids[2:])
+
+    def test_cursor_stable_under_inserts(self):
+        """Test rows inserted after the first page do not shift later pages"""
+        res = self.client.get(TASK_URL, {'page_size': 2})
+        sample_task(self.user)
+
+        page = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [task['task_id'] for task in page.data['results']],
+            self.task_ids[2:4]
+        )
+
+    @override_settings(TASK_MAX_PAGE_SIZE=3)
+    def test_page_size_capped(self):
+        """Test the requested page size is capped by the configured ceiling"""
+        res = self.client.get(TASK_URL, {'page_size': 1000})
+
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor is rejected"""
+        res = self.client.get(TASK_URL, {'cursor': 'garbage'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,167 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests.utils import QueryBudgetMixin, create_user, sample_tasks
+
+
+TASK_URL = reverse('task:task-list')
+BULK_URL = reverse('task:task-bulk')
+
+
+def detail_url(task_id):
+    """Return task detail URL"""
+    return reverse('task:task-detail', args=[task_id])
+
+
+class TaskQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test the task endpoints run a fixed number of queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user('test@testing.com')
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com', 'admin', 'user', 'password123'
+        )
+        self.task = Task.objects.create(
+            user=self.user, title='Sample', description='Sample'
+        )
+        self.client.force_authenticate(self.user)
+
+    def add_tasks(self):
+        """Add tasks of several users"""
+        sample_tasks(self.user, 10)
+        for index in range(5):
+            sample_tasks(create_user('user%d@testing.com' % index), 2)
+
+    def get(self, url, params=None):
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_list(self):
+        """Test listing tasks runs one query, after the version lookup"""
+        self.assertConstantQueries(lambda: self.get(TASK_URL), self.add_tasks, 2)
+
+    def test_list_admin(self):
+        """Test listing every task runs one query, after the version lookup"""
+        self.client.force_authenticate(self.admin_user)
+        self.assertConstantQueries(lambda: self.get(TASK_URL), self.add_tasks, 2)
+
+    def test_list_paginated(self):
+        """Test a page of tasks runs one query, after the version lookup"""
+        self.assertConstantQueries(
+            lambda: self.get(TASK_URL, {'page_size': 5}), self.add_tasks, 2
+        )
+
+    def test_list_expand_user(self):
+        """Test inlining the users joins them in the list query"""
+        self.client.force_authenticate(self.admin_user)
+
+        self.assertConstantQueries(
+            lambda: self.get(TASK_URL, {'expand': 'user'}), self.add_tasks, 2
+        )
+
+    def test_retrieve(self):
+        """Test retrieving a task runs one query, with or without its user,
+        and with sparse fields"""
+        url = detail_url(self.task.task_id)
+        with self.assertMaxQueries(1):
+            self.get(url)
+        with self.assertMaxQueries(1):
+            self.get(url, {'expand': 'user'})
+        with self.assertMaxQueries(1):
+            self.get(url, {'fields': 'title'})
+
+    def test_create(self):
+        """Test creating a task runs an insert, plus the change feed's
+        lock of the owner and insert and the savepoint"""
+        def create():
+            res = self.client.post(
+                TASK_URL, {'title': 'New', 'description': 'New'}
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertConstantQueries(create, self.add_tasks, 5)
+
+    def test_update(self):
+        """Test updating a task runs a select and an update, plus the
+        change feed's lock of the owner and insert and the savepoint"""
+        def update():
+            res = self.client.patch(
+                detail_url(self.task.task_id), {'title': 'Changed'}
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertConstantQueries(update, self.add_tasks, 6)
+
+    def test_bulk_delete(self):
+        """Test a bulk delete selects and deletes the tasks with a query
+        each, however many, plus the change feed's lock and insert and
+        the savepoint"""
+        for count in (2, 20):
+            sample_tasks(self.user, count)
+            task_ids = list(
+                Task.objects.filter(user=self.user)
+                .values_list('task_id', flat=True)
+            )
+            with self.assertMaxQueries(6):
+                res = self.client.delete(
+                    BULK_URL, {'task_ids': task_ids}, format='json'
+                )
+            self.assertCountEqual(res.data['deleted'], task_ids)
+
+
+class ExpandUserTests(TestCase):
+    """Test inlining the user of tasks with the expand parameter"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user('test@testing.com')
+        self.task = Task.objects.create(
+            user=self.user, title='Sample', description='Sample'
+        )
+        self.client.force_authenticate(self.user)
+        self.expected_user = {
+            'id': self.user.id,
+            'email': 'test@testing.com',
+            'first_name': 'Test',
+            'last_name': 'User',
+        }
+
+    def test_list_expand_user(self):
+        """Test the list inlines the users"""
+        res = self.client.get(TASK_URL, {'expand': 'user'})
+
+        self.assertEqual(res.data[0]['user'], self.expected_user)
+        self.assertEqual(res.data[0]['title'], self.task.title)
+
+    def test_retrieve_expand_user_with_fields(self):
+        """Test expanding works along with sparse fields"""
+        res = self.client.get(
+            detail_url(self.task.task_id),
+            {'expand': 'user', 'fields': 'title,user'}
+        )
+
+        self.assertEqual(
+            res.data, {'title': self.task.title, 'user': self.expected_user}
+        )
+
+    def test_expand_without_user_field(self):
+        """Test expanding a field that isn't requested is a no-op"""
+        res = self.client.get(
+            detail_url(self.task.task_id), {'expand': 'user', 'fields': 'title'}
+        )
+
+        self.assertEqual(res.data, {'title': self.task.title})
+
+    def test_invalid_expand(self):
+        """Test unknown relations are rejected"""
+        res = self.client.get(TASK_URL, {'expand': 'owner'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', res.data)
@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests import utils
+
+
+TASK_URL = reverse('task:task-list')
+
+
+def sample_task(user, **params):
+    """Create and return a sample task not matching the searches"""
+    params.setdefault('description', 'Nothing to see here')
+    return utils.sample_task(user, **params)
+
+
+class TaskSearchTests(TestCase):
+    """Test searching the task list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, **params):
+        res = self.client.get(TASK_URL, dict(params, search=query))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [task['task_id'] for task in res.data]
+
+    def test_search_title_and_description(self):
+        """Test tasks match on their title or their description"""
+        title = sample_task(self.user, title='Invoice the client')
+        description = sample_task(
+            self.user, description='Send the invoice by mail'
+        )
+        sample_task(self.user)
+
+        self.assertCountEqual(
+            self.search('invoice'), [title.task_id, description.task_id]
+        )
+
+    def test_search_every_word(self):
+        """Test tasks must contain every word of the search"""
+        both = sample_task(self.user, title='Paint the fence green')
+        sample_task(self.user, title='Paint the door')
+
+        self.assertEqual(self.search('paint fence'), [both.task_id])
+
+    def test_search_stems_words(self):
+        """Test words match their other forms"""
+        task = sample_task(self.user, title='Running errands')
+
+        self.assertEqual(self.search('run'), [task.task_id])
+
+    def test_search_ranked(self):
+        """Test better matches come first"""
+        once = sample_task(self.user, title='Review', description='Code')
+        twice = sample_task(
+            self.user, title='Review', description='Review the review'
+        )
+
+        self.assertEqual(self.search('review'), [twice.task_id, once.task_id])
+
+    def test_search_own_tasks(self):
+        """Test searches don't return tasks of other users"""
+        other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        sample_task(other_user, title='Secret plan')
+
+        self.assertEqual(self.search('secret'), [])
+
+    def test_search_with_filters(self):
+        """Test searches combine with the other filters"""
+        pending = sample_task(self.user, title='Call Bob', task_status='P')
+        sample_task(self.user, title='Call Alice', task_status='A')
+
+        self.assertEqual(self.search('call', status='P'), [pending.task_id])
+
+    def test_search_follows_writes(self):
+        """Test the index follows updated and deleted tasks"""
+        task = sample_task(self.user, title='Buy milk')
+        deleted = sample_task(self.user, title='Buy bread')
+        task.title = 'Buy eggs'
+        task.save()
+        deleted.delete()
+
+        self.assertEqual(self.search('milk'), [])
+        self.assertEqual(self.search('buy'), [task.task_id])
+
+    def test_search_bulk_created(self):
+        """Test tasks created in bulk are searchable"""
+        Task.objects.bulk_create([
+            Task(user=self.user, title='Water plants', description='Daily'),
+            Task(user=self.user, title='Feed cat', description='Daily'),
+        ])
+
+        self.assertEqual(len(self.search('daily')), 2)
+
+    def test_search_syntax_is_plain_words(self):
+        """Test quotes and operators in searches are taken as words"""
+        task = sample_task(self.user, title='Fix "quoted" title')
+
+        self.assertEqual(self.search('"quoted'), [task.task_id])
+        self.assertEqual(self.search('title OR -NEAR('), [])
+
+    def test_blank_search(self):
+        """Test a blank search doesn't filter the list"""
+        tasks = [sample_task(self.user), sample_task(self.user)]
+
+        self.assertEqual(len(self.search('  ')), len(tasks))
+
+    def test_search_paginated(self):
+        """Test paginated searches page through the matches"""
+        for number in range(3):
+            sample_task(self.user, title='Match %d' % number)
+        sample_task(self.user, title='Other')
+
+        res = self.client.get(TASK_URL, {'search': 'match', 'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_search_with_fields(self):
+        """Test searches select only the requested fields"""
+        sample_task(self.user, title='Match')
+
+        res = self.client.get(TASK_URL, {'search': 'match', 'fields': 'title'})
+
+        self.assertEqual(res.data, [{'title': 'Match'}])
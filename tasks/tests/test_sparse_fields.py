@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+
+
+TASK_URL = reverse('task:task-list')
+
+
+def detail_url(task_id):
+    """Return task detail URL"""
+    return reverse('task:task-detail', args=[task_id])
+
+
+class SparseFieldsTests(TestCase):
+    """Test the fields query parameter of the task endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(
+            user=self.user,
+            title='Sample task',
+            description='A very long description ' * 100,
+            task_status='A'
+        )
+        Task.objects.create(user=self.user, title='Other', description='x')
+
+    def test_list_fields(self):
+        """Test the list only renders and selects the requested fields"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TASK_URL, {'fields': 'title,task_id'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [{'task_id': task.task_id, 'title': task.title}
+             for task in Task.objects.order_by('-task_id')]
+        )
+        self.assertEqual(list(res.data[0]), ['task_id', 'title'])
+        self.assertNotIn('description', queries[-1]['sql'])
+
+    def test_list_fields_paginated(self):
+        """Test pagination still works when task_id isn't requested"""
+        res = self.client.get(TASK_URL, {'fields': 'title', 'page_size': 1})
+
+        self.assertEqual(res.data['results'], [{'title': 'Other'}])
+        res = self.client.get(res.data['next'])
+        self.assertEqual(res.data['results'], [{'title': 'Sample task'}])
+
+    def test_retrieve_fields(self):
+        """Test retrieving a task defers the fields that aren't requested"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                detail_url(self.task.task_id), {'fields': 'title,task_status'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'title': 'Sample task', 'task_status': 'A'})
+        self.assertIn('ETag', res)
+        self.assertNotIn('description', queries[-1]['sql'])
+
+    def test_etag_depends_on_fields(self):
+        """Test a sparse response doesn't validate the full one"""
+        url = detail_url(self.task.task_id)
+        sparse = self.client.get(url, {'fields': 'title'})
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=sparse['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('description', res.data)
+
+    def test_invalid_fields(self):
+        """Test unknown fields are rejected"""
+        res = self.client.get(TASK_URL, {'fields': 'title,password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_fields_ignored_on_write(self):
+        """Test writes validate and return every field"""
+        res = self.client.patch(
+            detail_url(self.task.task_id) + '?fields=title',
+            {'task_status': 'C'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['task_status'], 'C')
+        self.assertIn('description', res.data)
@@ -0,0 +1,538 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import add_user_claims
+from authentication.tokens import SESSION_EXP_CLAIM, StreamToken
+from core.models import Task
+
+from tasks import events
+from tasks.events import EventHub, RedisEventBackend, publish_task_events
+from tasks.streaming import EVENTS_PATH, TaskEventsMiddleware
+
+
+EVENTS_TOKEN_URL = reverse('task:events-token')
+
+
+def access_token(user):
+    return add_user_claims(AccessToken.for_user(user), user)
+
+
+def bearer(user):
+    """Return an Authorization header value for the user"""
+    return ('Bearer %s' % access_token(user)).encode()
+
+
+def stream_token(user, session_exp=None):
+    """Return a stream token for the user"""
+    token = StreamToken.for_access_token(access_token(user))
+    if session_exp is not None:
+        token[SESSION_EXP_CLAIM] = session_exp
+    return str(token)
+
+
+async def not_found(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class ASGIConnection:
+    """Drive an ASGI application through one connection"""
+
+    def __init__(self, application, scope):
+        self.inbound = asyncio.Queue()
+        self.outbound = asyncio.Queue()
+        self.task = asyncio.ensure_future(
+            application(scope, self.inbound.get, self.outbound.put)
+        )
+
+    async def receive(self):
+        return await asyncio.wait_for(self.outbound.get(), 5)
+
+    async def receive_body(self):
+        """Return the next chunk of the response body, as text"""
+        message = await self.receive()
+        return message['body'].decode()
+
+    async def send(self, message):
+        await self.inbound.put(message)
+
+    async def close(self, message_type):
+        await self.send({'type': message_type})
+        await asyncio.wait_for(self.task, 5)
+
+
+def http_scope(user=None, method='GET', path=EVENTS_PATH, token=None):
+    headers = []
+    if user is not None:
+        headers.append((b'authorization', bearer(user)))
+    query_string = b''
+    if token is not None:
+        query_string = ('token=%s' % token).encode()
+    return {
+        'type': 'http', 'method': method, 'path': path, 'headers': headers,
+        'query_string': query_string,
+    }
+
+
+def websocket_scope(user=None, subprotocols=()):
+    scope = http_scope(user)
+    scope['type'] = 'websocket'
+    scope['subprotocols'] = list(subprotocols)
+    return scope
+
+
+async def read_until_end(connection):
+    """Return the rest of a streamed response body"""
+    body = ''
+    while True:
+        message = await connection.receive()
+        body += message['body'].decode()
+        if not message.get('more_body'):
+            return body
+
+
+class EventHubTests(TestCase):
+    """Test fanning events out to subscriptions"""
+
+    async def test_deliver(self):
+        """Test subscriptions get the events of their channel only"""
+        hub = EventHub()
+        with hub.subscribe('user:1') as first, hub.subscribe('user:2') as other:
+            hub.deliver('user:1', [{'task_id': 1}])
+            self.assertEqual(
+                await asyncio.wait_for(first.get(), 1), {'task_id': 1}
+            )
+            self.assertTrue(other.queue.empty())
+
+        self.assertEqual(dict(hub._subscriptions), {})
+
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=1)
+    async def test_overflow(self):
+        """Test a subscription that falls behind is flagged"""
+        hub = EventHub()
+        with hub.subscribe('user:1') as subscription:
+            hub.deliver('user:1', [{'task_id': 1}, {'task_id': 2}])
+            await asyncio.sleep(0)
+
+            self.assertTrue(subscription.overflowed)
+
+    async def test_publish(self):
+        """Test events reach the owner's channel and everyone's"""
+        with events.hub.subscribe('user:1') as owner, \
+                events.hub.subscribe(events.ALL_TASKS) as everyone:
+            publish_task_events([('created', 5, 1)])
+            expected = {'event': 'created', 'task_id': 5, 'user': 1}
+
+            self.assertEqual(await asyncio.wait_for(owner.get(), 1), expected)
+            self.assertEqual(
+                await asyncio.wait_for(everyone.get(), 1), expected
+            )
+
+
+class FakePubSub:
+    """Plays back the messages a Redis pub/sub connection would receive"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    def listen(self):
+        yield from self.messages
+
+
+class FakePipeline:
+    """Records the messages published to Redis when executed"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def publish(self, channel, message):
+        self.commands.append((channel, message))
+
+    def execute(self):
+        self.client.published.append(self.commands)
+
+
+class FakeRedis:
+    """Records the messages published to Redis, by round trip"""
+
+    def __init__(self, messages=()):
+        self.published = []
+        self.pubsub_ = FakePubSub(messages)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.pubsub_
+
+
+class RecordingEventBackend:
+    """Records the batches of messages published"""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, batches):
+        self.published.append(dict(batches))
+
+    def start(self):
+        pass
+
+
+class RedisEventBackendTests(TestCase):
+    """Test relaying events through Redis"""
+
+    def test_publish(self):
+        """Test the messages of each channel are published as a JSON list
+        on its prefixed channel, in one round trip"""
+        client = FakeRedis()
+        RedisEventBackend(client=client).publish({
+            'user:1': [{'task_id': 1}, {'task_id': 2}],
+            'all': [{'task_id': 1}],
+        })
+
+        self.assertEqual(client.published, [[
+            ('task-events:user:1', '[{"task_id": 1}, {"task_id": 2}]'),
+            ('task-events:all', '[{"task_id": 1}]'),
+        ]])
+
+    async def test_relay(self):
+        """Test the events received from Redis are delivered to the hub"""
+        client = FakeRedis([{
+            'channel': b'task-events:user:3', 'data': b'[{"task_id": 7}]',
+        }])
+        with events.hub.subscribe('user:3') as subscription:
+            RedisEventBackend(client=client).start()
+
+            self.assertEqual(
+                await asyncio.wait_for(subscription.get(), 1), {'task_id': 7}
+            )
+        self.assertEqual(client.pubsub_.pattern, 'task-events:*')
+
+
+class TaskEventsMiddlewareTests(TransactionTestCase):
+    """Test streaming task events over SSE and WebSockets.
+
+    The streams run as tasks of their own, so they query the database from
+    other threads, which only see committed data.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.application = TaskEventsMiddleware(not_found)
+
+    async def test_other_paths(self):
+        """Test other requests are passed to the wrapped application"""
+        connection = ASGIConnection(
+            self.application, http_scope(self.user, path='/api/task/tasks/')
+        )
+
+        self.assertEqual((await connection.receive())['status'], 404)
+
+    async def test_stream_unauthenticated(self):
+        """Test streams require an access token"""
+        connection = ASGIConnection(self.application, http_scope())
+
+        start = await connection.receive()
+        self.assertEqual(start['status'], 401)
+        self.assertIn(b'www-authenticate', dict(start['headers']))
+
+    async def test_stream_method(self):
+        """Test streams are only opened with GET"""
+        connection = ASGIConnection(
+            self.application, http_scope(self.user, method='POST')
+        )
+
+        self.assertEqual((await connection.receive())['status'], 405)
+
+    async def test_stream(self):
+        """Test the events of the user are sent as server-sent events"""
+        connection = ASGIConnection(self.application, http_scope(self.user))
+        start = await connection.receive()
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(
+            dict(start['headers'])[b'content-type'], b'text/event-stream'
+        )
+        self.assertEqual(await connection.receive_body(), 'retry: 5000\n\n')
+
+        publish_task_events([('deleted', 2, self.user.id + 1)])
+        publish_task_events([('updated', 1, self.user.id)])
+
+        self.assertEqual(
+            await connection.receive_body(),
+            'event: updated\ndata: {"event":"updated","task_id":1,"user":%d}'
+            '\n\n' % self.user.id
+        )
+        await connection.close('http.disconnect')
+        self.assertNotIn(
+            'user:%d' % self.user.id, events.hub._subscriptions
+        )
+
+    @override_settings(TASK_EVENTS_KEEPALIVE=0.01)
+    async def test_stream_keepalive(self):
+        """Test idle streams send keep-alive comments"""
+        connection = ASGIConnection(self.application, http_scope(self.user))
+        await connection.receive()
+        await connection.receive_body()
+
+        self.assertEqual(await connection.receive_body(), ': keep-alive\n\n')
+        await connection.close('http.disconnect')
+
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=1)
+    async def test_stream_overflow(self):
+        """Test a stream that falls behind is ended"""
+        connection = ASGIConnection(self.application, http_scope(self.user))
+        await connection.receive()
+        await connection.receive_body()
+        # delivered before the stream can send any of them
+        events.hub.deliver(
+            'user:%d' % self.user.id, [{'event': 'updated'}] * 2
+        )
+
+        body = await read_until_end(connection)
+        self.assertLessEqual(body.count('event: updated'), 1)
+
+    async def test_stream_token(self):
+        """Test streams can be opened with a stream token in the query
+        string"""
+        connection = ASGIConnection(
+            self.application, http_scope(token=stream_token(self.user))
+        )
+
+        self.assertEqual((await connection.receive())['status'], 200)
+        await connection.close('http.disconnect')
+
+    async def test_access_token_in_query_string(self):
+        """Test access tokens aren't accepted in the query string"""
+        connection = ASGIConnection(
+            self.application, http_scope(token=access_token(self.user))
+        )
+
+        self.assertEqual((await connection.receive())['status'], 401)
+
+    async def test_stream_expires(self):
+        """Test the stream ends when the access token expires"""
+        token = stream_token(self.user, session_exp=time.time() + 0.1)
+        connection = ASGIConnection(self.application, http_scope(token=token))
+        await connection.receive()
+
+        self.assertEqual(await read_until_end(connection), 'retry: 5000\n\n')
+
+    @override_settings(TASK_EVENTS_KEEPALIVE=0.01)
+    async def test_stream_revoked(self):
+        """Test the stream ends once the user became a superuser, as its
+        subscription only covers their own tasks"""
+        connection = ASGIConnection(self.application, http_scope(self.user))
+        await connection.receive()
+        await connection.receive_body()
+
+        await sync_to_async(
+            get_user_model().objects.filter(pk=self.user.pk).update,
+            thread_sensitive=True
+        )(is_superuser=True)
+
+        body = await read_until_end(connection)
+        self.assertNotIn('event:', body)
+
+    async def test_stream_inactive_user(self):
+        """Test deactivated users can't open streams with a token issued
+        before"""
+        await sync_to_async(
+            get_user_model().objects.filter(pk=self.user.pk).update,
+            thread_sensitive=True
+        )(is_active=False)
+        connection = ASGIConnection(self.application, http_scope(self.user))
+
+        self.assertEqual((await connection.receive())['status'], 401)
+
+    @override_settings(TASK_EVENTS_MAX_STREAMS=1)
+    async def test_stream_limit(self):
+        """Test users can only keep so many streams open"""
+        first = ASGIConnection(self.application, http_scope(self.user))
+        self.assertEqual((await first.receive())['status'], 200)
+
+        second = ASGIConnection(self.application, http_scope(self.user))
+        self.assertEqual((await second.receive())['status'], 429)
+        websocket = ASGIConnection(
+            self.application, websocket_scope(self.user)
+        )
+        await websocket.send({'type': 'websocket.connect'})
+        self.assertEqual(await websocket.receive(), {
+            'type': 'websocket.close', 'code': 4429,
+        })
+
+        await first.close('http.disconnect')
+        third = ASGIConnection(self.application, http_scope(self.user))
+        self.assertEqual((await third.receive())['status'], 200)
+        await third.close('http.disconnect')
+
+    async def test_websocket(self):
+        """Test the events of the user are sent as WebSocket messages"""
+        connection = ASGIConnection(
+            self.application, websocket_scope(self.user)
+        )
+        await connection.send({'type': 'websocket.connect'})
+        self.assertEqual(
+            await connection.receive(), {'type': 'websocket.accept'}
+        )
+
+        publish_task_events([('created', 3, self.user.id)])
+
+        message = await connection.receive()
+        self.assertEqual(json.loads(message['text']), {
+            'event': 'created', 'task_id': 3, 'user': self.user.id,
+        })
+        await connection.close('websocket.disconnect')
+
+    async def test_websocket_subprotocol_token(self):
+        """Test WebSockets can pass a stream token as a subprotocol"""
+        connection = ASGIConnection(
+            self.application,
+            websocket_scope(subprotocols=['bearer', stream_token(self.user)])
+        )
+        await connection.send({'type': 'websocket.connect'})
+
+        self.assertEqual(await connection.receive(), {
+            'type': 'websocket.accept', 'subprotocol': 'bearer',
+        })
+        await connection.close('websocket.disconnect')
+
+    async def test_websocket_expires(self):
+        """Test WebSockets are closed when the access token expires"""
+        token = stream_token(self.user, session_exp=time.time() + 0.1)
+        connection = ASGIConnection(
+            self.application, websocket_scope(subprotocols=['bearer', token])
+        )
+        await connection.send({'type': 'websocket.connect'})
+        await connection.receive()
+
+        self.assertEqual(await connection.receive(), {
+            'type': 'websocket.close', 'code': 4401,
+        })
+
+    async def test_websocket_unauthenticated(self):
+        """Test WebSockets without an access token are refused"""
+        connection = ASGIConnection(self.application, websocket_scope())
+        await connection.send({'type': 'websocket.connect'})
+
+        self.assertEqual(await connection.receive(), {
+            'type': 'websocket.close', 'code': 4401,
+        })
+
+
+class EventTokenTests(TestCase):
+    """Test issuing stream tokens"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.client = APIClient()
+
+    def test_issue_token(self):
+        """Test the token is tied to the user and their access token"""
+        access = access_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % access)
+
+        res = self.client.post(EVENTS_TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        token = StreamToken(res.data['token'])
+        self.assertEqual(token['user_id'], self.user.id)
+        self.assertEqual(token.get_session_exp(), access['exp'])
+        self.assertEqual(res.data['expires_in'], 60)
+
+    def test_token_requires_auth(self):
+        """Test stream tokens are only issued to authenticated users"""
+        res = self.client.post(EVENTS_TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskWriteEventsTests(TransactionTestCase):
+    """Test committed task writes are published"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com', 'admin', 'user', 'password123'
+        )
+
+    def write_tasks(self):
+        task = Task.objects.create(
+            user=self.user, title='Sample', description='Sample'
+        )
+        task.title = 'Changed'
+        task.save()
+        task.user = self.admin_user
+        task.save()
+        task.delete()
+
+    async def test_write_events(self):
+        """Test creates, updates, moves and deletes are published"""
+        with events.hub.subscribe('user:%d' % self.user.id) as owner, \
+                events.hub.subscribe('user:%d' % self.admin_user.id) as admin:
+            await sync_to_async(self.write_tasks, thread_sensitive=True)()
+            owner_events = [
+                (await asyncio.wait_for(owner.get(), 1))['event']
+                for _ in range(3)
+            ]
+            admin_events = [
+                (await asyncio.wait_for(admin.get(), 1))['event']
+                for _ in range(2)
+            ]
+
+        self.assertEqual(owner_events, ['created', 'updated', 'deleted'])
+        self.assertEqual(admin_events, ['created', 'deleted'])
+
+    @override_settings(
+        TASK_EVENTS_BACKEND='tasks.tests.test_streaming.RecordingEventBackend',
+        TASK_EVENTS_BACKEND_OPTIONS={},
+    )
+    def test_bulk_write_batched(self):
+        """Test a bulk write publishes one message per channel"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = [
+            {'title': 'Task %d' % index, 'description': 'Bulk'}
+            for index in range(20)
+        ]
+
+        res = client.post(reverse('task:task-bulk'), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        published = events.get_event_backend().published
+        self.assertEqual(len(published), 1)
+        self.assertEqual(
+            set(published[0]), {'user:%d' % self.user.id, events.ALL_TASKS}
+        )
+        self.assertEqual(
+            [message['task_id'] for message in published[0]['all']],
+            [task['task_id'] for task in res.data]
+        )
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests.utils import sample_task
+
+
+SUMMARY_URL = reverse('task:task-summary')
+BULK_URL = reverse('task:task-bulk')
+
+
+class TaskSummaryTests(TestCase):
+    """Test the cached task status summary"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            'Test',
+            'User'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@testing.com',
+            'password123',
+            'other',
+            'user'
+        )
+        sample_task(self.user, task_status='A')
+        sample_task(self.user, task_status='A')
+        sample_task(self.user, task_status='C')
+        sample_task(self.other_user, task_status='P')
+        self.client.force_authenticate(self.user)
+
+    def test_summary_for_user(self):
+        """Test the counts only include the user's own tasks"""
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 3)
+        self.assertEqual(
+            res.data['counts'], {'A': 2, 'P': 0, 'C': 1, 'D': 0}
+        )
+
+    def test_summary_cached(self):
+        """Test repeated summaries only look up the version of the tasks"""
+        self.client.get(SUMMARY_URL)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(SUMMARY_URL)
+        self.assertEqual(res.data['total'], 3)
+
+    def test_summary_invalidated_on_save_and_delete(self):
+        """Test creating and deleting tasks refreshes the summary"""
+        self.client.get(SUMMARY_URL)
+
+        task = sample_task(self.user, task_status='D')
+        res = self.client.get(SUMMARY_URL)
+        self.assertEqual(res.data['counts']['D'], 1)
+
+        task.delete()
+        res = self.client.get(SUMMARY_URL)
+        self.assertEqual(res.data['counts']['D'], 0)
+
+    def test_summary_invalidated_on_bulk_update(self):
+        """Test bulk writes, which send no model signals, refresh it too"""
+        self.client.get(SUMMARY_URL)
+        task_id = Task.objects.filter(user=self.user).first().task_id
+
+        self.client.patch(
+            BULK_URL, [{'task_id': task_id, 'task_status': 'P'}],
+            format='json'
+        )
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.data['counts']['P'], 1)
+
+    def test_reassignment_invalidates_previous_owner(self):
+        """Test moving a task to another user refreshes both summaries"""
+        self.client.get(SUMMARY_URL)
+
+        task = Task.objects.get(user=self.user, task_status='C')
+        task.user = self.other_user
+        task.save()
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.data['counts']['C'], 0)
+
+    def test_admin_summary(self):
+        """Test superusers get global counts or one user's counts"""
+        admin_user = get_user_model().objects.create_superuser(
+            'admin@testing.com',
+            'password123',
+            'admin',
+            'user'
+        )
+        self.client.force_authenticate(admin_user)
+
+        res = self.client.get(SUMMARY_URL)
+        self.assertEqual(res.data['total'], 4)
+
+        res = self.client.get(SUMMARY_URL, {'user': self.other_user.id})
+        self.assertEqual(res.data['counts']['P'], 1)
+        self.assertEqual(res.data['total'], 1)
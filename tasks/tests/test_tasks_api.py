@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Task
+from core.tests.utils import sample_task
 
 from tasks.serializers import TaskSerializer
 
@@ -22,19 +23,6 @@ def detail_url(task_id):
     return reverse('task:task-detail', args=[task_id])
 
 
-def sample_task(user, **params):
-    """Create and return a sample task"""
-    defaults = {
-        'task_id':'1',
-        'title':'Create a Django Rest API',
-        'description':'Django API for the user',
-        'task_status':'A',
-    }
-    defaults.update(params)
-
-    return Task.objects.create(user=user, **defaults)
-
-
 class PublicTaskApiTests(TestCase):
     """Test unauthenticated task API access"""
 
@@ -64,7 +52,6 @@ class PrivateRecipeApiTests(TestCase):
     def test_retrieve_tasks(self):
         """Test retrieving list of tasks"""
         payload = {
-            'task_id':'2',
             'title':'Create another Django Rest API',
             'description':'Django API for the server',
             'task_status':'A'
@@ -98,7 +85,6 @@ class PrivateRecipeApiTests(TestCase):
             'user'
         )
         payload = {
-            'task_id':'2',
             'title':'Create another Django Rest API',
             'description':'Django API for the server',
             'task_status':'A'
@@ -137,7 +123,6 @@ class PrivateRecipeApiTests(TestCase):
     def test_create_task(self):
         """Test creating task"""
         payload = {
-            'task_id': 2,
             'title':'Create another Django Rest API',
             'description':'Django API for the server',
             'task_status':'A'
@@ -229,3 +214,18 @@ class PrivateRecipeApiTests(TestCase):
         to_be_assigned_user_id = user2.id
         self.assertNotEqual(to_be_assigned_user_id, (res.data['user']))
 
+    def test_task_id_generated_by_database(self):
+        """Test a client supplied task_id is ignored on create"""
+        existing = sample_task(user=self.user)
+        payload = {
+            'task_id': existing.task_id,
+            'title':'Create another Django Rest API',
+            'description':'Django API for the server',
+        }
+
+        res = self.client.post(TASK_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(res.data['task_id'], existing.task_id)
+        self.assertEqual(Task.objects.count(), 2)
+
@@ -6,11 +6,15 @@ from tasks import views
 
 router = DefaultRouter()
 router.register('tasks', views.TaskViewSet)
+router.register('jobs', views.JobViewSet)
 
 
 app_name = 'task'
 
 urlpatterns = [
+    path(
+        'events/token/', views.EventTokenView.as_view(), name='events-token'
+    ),
     path('', include(router.urls))
 ]
 
@@ -1,44 +1,355 @@
-from django.http import request
-from rest_framework import viewsets, mixins
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import FileResponse, request, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core.models import Task
+from authentication.tokens import StreamToken
+from core.jobs import enqueue
+from core.models import Job, Task, TaskChange
+from core.throttling import ReadWriteBucketThrottle
 
 from tasks import serializers
+from tasks.cache import get_task_summary
+from tasks.changes import batch_changes, read_changes
+from tasks.conditional import ConditionalTaskMixin
+from tasks.deletion import delete_tasks
+from tasks.filters import (
+    FILTER_PARAMS,
+    expand_tasks,
+    filter_tasks,
+    only_requested_fields,
+    parse_sequence,
+    parse_user_id,
+    requested_expansions,
+    requested_fields,
+)
+from tasks.encoders import (
+    EXPORT_FIELDS,
+    EXPORT_FORMATS,
+    RowEncoder,
+    stream_export,
+)
+from tasks.pagination import TaskCursorPagination
+from tasks.renderers import ORJSONRenderer
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+ROW_ENCODER = RowEncoder()
+
+
+def get_row_encoder(params):
+    """Return the encoder of the fields requested with ``?fields=``"""
+    fields = requested_fields(params)
+    if fields is None:
+        return ROW_ENCODER
+    return RowEncoder.for_keys(fields)
+
+
+def list_task_data(queryset, request, paginator, serializer_class, context):
+    """Return the data of a task list, paginated if the client asked.
+
+    Shared by TaskViewSet and the async views. Lists with ``?expand=``
+    are rendered by the serializers, the others encoded from rows.
+    """
+    if requested_expansions(request.query_params):
+        page = paginator.paginate_queryset(queryset, request)
+        data = serializer_class(
+            queryset if page is None else page, many=True, context=context
+        ).data
+    else:
+        encoder = get_row_encoder(request.query_params)
+        # named rows, so the cursor paginator can read their task_id
+        queryset = queryset.values_list(*encoder.query_fields, named=True)
+        page = paginator.paginate_queryset(queryset, request)
+        data = encoder.encode(queryset if page is None else page)
+
+    if page is None:
+        return data
+    return paginator.get_paginated_response(data).data
+
+
+def get_task_serializer_class(user):
+    if user.is_superuser:
+        return serializers.AdminTaskSerializer
+    return serializers.TaskSerializer
+
+
+def get_task_queryset(queryset, params, user, action):
+    """Return the tasks of the user for an action, narrowed down by the
+    filter parameters when listing or exporting them"""
+    queryset = filter_tasks(
+        queryset, params if action in ('list', 'export') else {}, user
+    )
+    if action in ('list', 'retrieve'):
+        queryset = expand_tasks(queryset, params)
+    if action == 'retrieve':
+        queryset = only_requested_fields(queryset, params)
+    return queryset
+
+
+def save_tasks(serializer, user):
+    """Save tasks, assigning them to a regular user"""
+    if user.is_superuser:
+        serializer.save()
+    else:
+        serializer.save(user=user)
+
+
+class RowListMixin:
+    """List tasks from ``values_list`` rows instead of serialized models.
+
+    Building a model instance and running every serializer field for each
+    task dominates the cost of large lists, so list GETs fetch plain rows
+    and encode them with a RowEncoder. The output is the same as the one
+    of the task serializers, which still validate and render all writes.
+    With ``?fields=`` only the requested columns are selected. Lists with
+    ``?expand=`` are left to the serializers.
+    """
+
+    def get_row_encoder(self):
+        return get_row_encoder(self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        return Response(list_task_data(
+            self.filter_queryset(self.get_queryset()),
+            request,
+            self.paginator,
+            self.get_serializer_class(),
+            self.get_serializer_context()
+        ))
+
+
+class TaskViewSet(ConditionalTaskMixin, RowListMixin, viewsets.ModelViewSet):
     """Manage tasks in the database"""
-    queryset = Task.objects.all()
+    queryset = Task.objects.all().order_by('-task_id')
     permission_classes = (IsAuthenticated,)
+    pagination_class = TaskCursorPagination
+    renderer_classes = (ORJSONRenderer, BrowsableAPIRenderer)
+    throttle_classes = (ReadWriteBucketThrottle,)
+    throttle_scope = 'tasks'
 
     def get_serializer_class(self):
-        if self.request.user.is_superuser:
-            return serializers.AdminTaskSerializer
-        return serializers.TaskSerializer
+        return get_task_serializer_class(self.request.user)
 
     def get_queryset(self):
-        """Retrieve the tasks for the authenticated user"""
-        if self.request.user.is_superuser:
-            return self.queryset
-        return self.queryset.filter(user=self.request.user)
+        """Retrieve the tasks for the authenticated user, narrowed down by
+        the filter parameters when listing or exporting them"""
+        return get_task_queryset(
+            self.queryset,
+            self.request.query_params,
+            self.request.user,
+            self.action
+        )
+
+    def save_tasks(self, serializer):
+        """Save tasks, assigning them to a regular user"""
+        save_tasks(serializer, self.request.user)
 
     def perform_create(self, serializer):
         """Create a new task"""
-        if self.request.user.is_superuser:
-            serializer.save()
-        else:
-            serializer.save(user=self.request.user)
-    
+        # commits the task along with its change in the feed
+        with transaction.atomic():
+            self.save_tasks(serializer)
+
     def perform_update(self, serializer):
         """Update a existing task"""
-        if self.request.user.is_superuser:
-            serializer.save()
-        else:
-            serializer.save(user=self.request.user)
+        with transaction.atomic():
+            self.save_tasks(serializer)
+
+    def perform_destroy(self, instance):
+        """Delete a task"""
+        with transaction.atomic():
+            instance.delete()
 
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request):
+        """Create, update or delete a batch of tasks in one transaction"""
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
 
+        tasks = None
+        if request.method == 'PATCH':
+            get_task_id = serializers.BulkTaskListSerializer.get_task_id
+            task_ids = []
+            if isinstance(request.data, list):
+                task_ids = [get_task_id(item) for item in request.data]
+            tasks = self.get_queryset().filter(task_id__in=[
+                task_id for task_id in task_ids if task_id is not None
+            ])
 
+        serializer = self.get_serializer(
+            tasks,
+            data=request.data,
+            many=True,
+            partial=tasks is not None
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic(), batch_changes():
+            self.save_tasks(serializer)
 
+        if tasks is None:
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.data)
+
+    def bulk_destroy(self, request):
+        """Delete the requested tasks with a single filtered delete"""
+        serializer = serializers.BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task_ids = set(serializer.validated_data['task_ids'])
+
+        with transaction.atomic():
+            found = set(delete_tasks(
+                self.get_queryset().filter(task_id__in=task_ids)
+            ))
+
+        return Response({
+            'deleted': sorted(found),
+            'not_found': sorted(task_ids - found),
+        })
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Return the number of tasks per status, served from the cache"""
+        user_id = request.user.id
+        if request.user.is_superuser:
+            user_id = request.query_params.get('user')
+            if user_id is not None:
+                user_id = parse_user_id(user_id)
+
+        queryset = Task.objects.all()
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        return Response(get_task_summary(queryset, user_id))
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Return the changes to the tasks after ``?since=<seq>``.
+
+        Start from 0, then pass the returned ``next`` back as ``since``
+        until ``has_more`` is false. Pages hold at most ``page_size``
+        changes. The feed of every task, read by superusers without
+        ``?user=``, can skip a change committed late, see tasks.changes.
+        """
+        params = request.query_params
+        since = parse_sequence(params.get('since', '0'))
+        changes = TaskChange.objects.all()
+        if not request.user.is_superuser:
+            changes = changes.filter(user=request.user)
+        elif 'user' in params:
+            changes = changes.filter(user_id=parse_user_id(params['user']))
+
+        return Response(read_changes(
+            changes,
+            self.get_queryset(),
+            since,
+            self.paginator.get_page_size(request),
+            self.get_row_encoder()
+        ))
+
+    @action(detail=False, methods=['get', 'post'])
+    def export(self, request):
+        """Stream the tasks as NDJSON or CSV using a server-side cursor.
+
+        A POST exports them in the background instead, to a file that is
+        downloaded from the job once it succeeded.
+        """
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': [
+                'Choose one of: %s.' % ', '.join(sorted(EXPORT_FORMATS))
+            ]})
+
+        # validates the filters
+        queryset = self.get_queryset()
+        if request.method == 'POST':
+            params = {
+                name: request.query_params[name] for name in FILTER_PARAMS
+                if name in request.query_params
+            }
+            return job_accepted(enqueue(
+                'tasks.export', user=request.user, user_id=request.user.id,
+                params=params, output=export_format
+            ))
+
+        rows = queryset.values_list(*EXPORT_FIELDS).iterator(
+            chunk_size=settings.TASK_EXPORT_CHUNK_SIZE
+        )
+        chunks, content_type = stream_export(rows, export_format)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            'attachment; filename="tasks.%s"' % export_format
+        )
+        return response
+
+    @action(detail=False, methods=['post'])
+    def reassign(self, request):
+        """Move every task of a user to another in the background"""
+        if not request.user.is_superuser:
+            raise PermissionDenied()
+        serializer = serializers.ReassignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return job_accepted(enqueue(
+            'tasks.reassign',
+            user=request.user,
+            from_user=serializer.validated_data['from_user'].pk,
+            to_user=serializer.validated_data['to_user'].pk
+        ))
+
+
+def job_accepted(job):
+    """Answer a request handed to a background job"""
+    return Response(
+        serializers.JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': reverse('task:job-detail', args=[job.pk])}
+    )
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Report the status of background jobs"""
+    queryset = Job.objects.all().order_by('-id')
+    serializer_class = serializers.JobSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        """Retrieve the jobs of the authenticated user, or every job for
+        superusers"""
+        if self.request.user.is_superuser:
+            return self.queryset
+        return self.queryset.filter(user=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the file written by a job"""
+        job = self.get_object()
+        result = job.result or {}
+        if job.status != Job.succeeded or 'file' not in result:
+            raise NotFound()
+        return FileResponse(
+            default_storage.open(result['file']),
+            as_attachment=True,
+            filename=result['filename'],
+            content_type=result['content_type']
+        )
+
+
+class EventTokenView(APIView):
+    """Issue a token opening a task event stream, for the clients that
+    can't send the access token in a header, see tasks.streaming"""
+    permission_classes = (IsAuthenticated,)
 
+    def post(self, request):
+        token = StreamToken.for_access_token(request.auth)
+        return Response({
+            'token': str(token),
+            'expires_in': int(token.lifetime.total_seconds()),
+        })